@@ -0,0 +1,537 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import multiprocessing
+import os
+import pickle
+import re
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from bytecode_cache import BYTECODE_CACHE_DIR, file_hash
+from calibration import CALIBRATION_INTERVAL, calibrate
+from examples_local import examples
+from journal import JOURNAL, Journal
+from marker import FUNCTION_RUNTIME_LIMIT, MIN_TIMING_TIME, Marker
+from phases import format_phase_report
+from results_store import RESULTS_DB, ResultsStore
+from shared_inputs import SHARE_MIN_BYTES, SharedInputs, attach
+from timing_lane import TimingLane, parse_cpus
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from concurrent.futures import Future
+
+    from journal import JobKey
+    from marker import Results
+    from question import Question
+
+SOLUTION_PATTERN = re.compile(r"team_(.+)_question_(\d+)\.py")
+
+# Timing options of the cheap pass and the precise pass of tiered marking
+CHEAP_MIN_TIMING_TIME = 0.01
+PRECISE_TIMING_REPEATS = 7
+
+# Submissions re-timed by tiered marking: the fastest `TOP_K` of each question and
+# any within `WITHIN` of the fastest
+TOP_K = 3
+WITHIN = 0.1
+
+# Marker and questions used by a worker process, set up by `_init_worker`
+_worker_marker: Marker | None = None
+_worker_questions: dict[int, Question] = {}
+
+
+@dataclass(frozen=True)
+class Job:
+    """
+    Dataclass representing one submission to mark.
+
+    Attributes:
+        team: The team name.
+        question_number: The question the submission answers.
+        filepath: The code file that contains the solution.
+    """
+
+    team: str
+    question_number: int
+    filepath: Path
+
+    @functools.cached_property
+    def source_hash(self) -> str:
+        return file_hash(self.filepath)
+
+    @property
+    def key(self) -> JobKey:
+        """The team, question number, and source hash identifying the job."""
+        return self.team, self.question_number, self.source_hash
+
+
+def discover_jobs(folders: Iterable[str | os.PathLike]) -> list[Job]:
+    """
+    Find every solution file in some folders and their subfolders.
+
+    :param folders: The folders to search.
+    :return: A job for each `team_{team}_question_{n}.py` file, sorted by team and
+        question number.
+    """
+    jobs = [
+        Job(match.group(1), int(match.group(2)), filepath)
+        for folder in folders
+        for filepath in Path(folder).rglob("team_*_question_*.py")
+        if (match := SOLUTION_PATTERN.fullmatch(filepath.name))
+    ]
+    return sorted(jobs, key=lambda job: (job.team, job.question_number))
+
+
+def _portable(value: Any) -> Any:
+    """
+    Make a value safe to send back from a worker process.
+
+    Outputs and exceptions can hold references to the submission's own functions
+    (e.g. `FunctionTimedOut.timedOutFunction`), which cannot be pickled.
+
+    :param value: The value to send.
+    :return: The value, or a stand-in for it if it cannot be pickled.
+    """
+    try:
+        pickle.dumps(value)
+    except Exception:  # noqa: BLE001
+        if isinstance(value, BaseException):
+            return RuntimeError(f"{type(value).__name__}: {value}")
+        return repr(value)
+    return value
+
+
+def _portable_results(results: Results) -> Results:
+    for test_case_result in results.test_case_results:
+        test_case_result.output = _portable(test_case_result.output)
+        test_case_result.message = _portable(test_case_result.message)
+    return results
+
+
+def _load_worker(
+    marker_options: dict[str, Any], questions: list[Question] | None = None
+) -> None:
+    global _worker_marker, _worker_questions
+    _worker_marker = Marker(**marker_options)
+    _worker_questions = {
+        question.question_number: question
+        for question in (examples if questions is None else attach(questions))
+    }
+
+
+def _init_worker(
+    marker_options: dict[str, Any], questions: list[Question] | None = None
+) -> None:
+    """Set up a pool worker process, keeping it off the CPUs of its timing lane."""
+    _load_worker(marker_options, questions)
+    if _worker_marker.timing_lane is not None:
+        _worker_marker.timing_lane.reserve()
+
+
+def _mark_job(
+    job: Job, time_limit: float, speed_factor: float | None = None
+) -> Results:
+    question = _worker_questions[job.question_number]
+    if speed_factor is not None:
+        _worker_marker.speed_factor = speed_factor
+    return _portable_results(
+        _worker_marker.mark(question, job.filepath, time_limit=time_limit)
+    )
+
+
+def _mark_jobs(
+    jobs: list[Job],
+    *,
+    workers: int,
+    time_limit: float,
+    marker_options: dict[str, Any],
+    questions: list[Question] | None,
+    share_min_bytes: int,
+    calibrated: bool,
+    on_result: Callable[[Job, Results], None],
+) -> Iterator[Results]:
+    """Mark jobs, calling `on_result` as each finishes and yielding in order."""
+    calibration = calibrate() if calibrated else None
+    if workers == 1:
+        _load_worker(marker_options)
+        if questions is not None:
+            _worker_questions.update(
+                (question.question_number, question) for question in questions
+            )
+        for job in jobs:
+            if calibration is not None and calibration.is_stale:
+                calibration = calibrate()
+            speed_factor = None if calibration is None else calibration.speed_factor
+            results = _mark_job(job, time_limit, speed_factor)
+            on_result(job, results)
+            yield results
+        return
+
+    def report(future: Future[Results], job: Job) -> None:
+        if future.exception() is None:
+            on_result(job, future.result())
+
+    with SharedInputs(share_min_bytes) as shared_inputs:
+        shared_questions = None if questions is None else shared_inputs.share(questions)
+        with ProcessPoolExecutor(
+            workers,
+            initializer=_init_worker,
+            initargs=(marker_options, shared_questions),
+        ) as executor:
+            futures: deque[Future[Results]] = deque()
+            unfinished: set[Future[Results]] = set()
+            for job in jobs:
+                if calibration is not None:
+                    # Only keep a few jobs per worker submitted, so marking can
+                    # pause between jobs to recalibrate
+                    while len(unfinished) >= 2 * workers:
+                        _, unfinished = wait(unfinished, return_when=FIRST_COMPLETED)
+                        while futures and futures[0].done():
+                            yield futures.popleft().result()
+                    if calibration.is_stale:
+                        # Let the running jobs finish, so nothing else runs
+                        # alongside the calibration workloads
+                        wait(unfinished)
+                        unfinished.clear()
+                        calibration = calibrate()
+                # The speed factor comes with each job, as the pool outlives
+                # calibrations
+                speed_factor = None if calibration is None else calibration.speed_factor
+                future = executor.submit(_mark_job, job, time_limit, speed_factor)
+                # Report jobs as they finish, not when every job before them has
+                future.add_done_callback(functools.partial(report, job=job))
+                futures.append(future)
+                if calibration is not None:
+                    unfinished.add(future)
+            while futures:
+                yield futures.popleft().result()
+
+
+def mark_batch(
+    jobs: Iterable[Job],
+    *,
+    workers: int = 1,
+    time_limit: float = FUNCTION_RUNTIME_LIMIT,
+    marker_options: dict[str, Any] | None = None,
+    questions: list[Question] | None = None,
+    share_min_bytes: int = SHARE_MIN_BYTES,
+    journal: Journal | None = None,
+    calibrated: bool = False,
+) -> Iterator[tuple[Job, Results]]:
+    """
+    Mark many submissions, in parallel worker processes if `workers` > 1.
+
+    Explicitly given questions are sent to every worker once. Their numpy arrays
+    and DataFrames of at least `share_min_bytes` are placed in shared memory for
+    the duration of the batch instead, and workers mark against zero-copy,
+    copy-on-write views of them.
+
+    With a journal, every job's results are recorded in it as soon as the job
+    finishes, and jobs whose (team, question, source hash) is already in the
+    journal are not marked again, so an interrupted batch can be resumed.
+
+    :param jobs: The submissions to mark.
+    :param workers: The number of worker processes, or 1 to mark in this process
+        (default: 1)
+    :param time_limit: The time limit in seconds for each call (default: 30)
+    :param marker_options: Keyword arguments to create each worker's marker with
+        (default: None)
+    :param questions: The questions to mark against (default: the examples)
+    :param share_min_bytes: The size from which values are shared (default: 1 MiB)
+    :param journal: If given, the journal to resume from and record to
+        (default: None)
+    :param calibrated: Measure this machine's speed before marking, and again
+        between jobs whenever the measurement goes stale, to normalize runtimes
+        across machines (default: False)
+    :return: An iterator of each job and its results, in the order of `jobs`.
+    """
+    jobs = list(jobs)
+    resumed = (
+        {}
+        if journal is None
+        else {
+            job: journal.completed[job.key]
+            for job in jobs
+            if job.key in journal.completed
+        }
+    )
+
+    def on_result(job: Job, results: Results) -> None:
+        if journal is not None:
+            journal.record(job.key, results)
+
+    marked = _mark_jobs(
+        [job for job in jobs if job not in resumed],
+        workers=workers,
+        time_limit=time_limit,
+        marker_options=marker_options or {},
+        questions=questions,
+        share_min_bytes=share_min_bytes,
+        calibrated=calibrated,
+        on_result=on_result,
+    )
+    for job in jobs:
+        if job in resumed:
+            yield job, resumed[job]
+        else:
+            yield job, next(marked)
+
+
+def select_contenders(
+    marked: Iterable[tuple[Job, Results]],
+    *,
+    top_k: int = TOP_K,
+    within: float = WITHIN,
+) -> list[Job]:
+    """
+    Select the submissions that could place for each question.
+
+    :param marked: Each job and its results.
+    :param top_k: The number of fastest passing submissions per question to select
+        (default: 3)
+    :param within: Also select any passing submission whose runtime is within this
+        fraction of the fastest (default: 0.1)
+    :return: The selected jobs.
+    """
+    passed = defaultdict(list)
+    for job, results in marked:
+        if results.points > 0:
+            passed[job.question_number].append((results.runtime, job))
+
+    contenders = []
+    for submissions in passed.values():
+        submissions.sort(key=lambda submission: submission[0])
+        leader_runtime = submissions[0][0]
+        contenders.extend(
+            job
+            for rank, (runtime, job) in enumerate(submissions)
+            if rank < top_k or runtime <= leader_runtime * (1 + within)
+        )
+    return contenders
+
+
+def mark_tiered(
+    jobs: Iterable[Job],
+    *,
+    workers: int = 1,
+    time_limit: float = FUNCTION_RUNTIME_LIMIT,
+    marker_options: dict[str, Any] | None = None,
+    top_k: int = TOP_K,
+    within: float = WITHIN,
+    journal: Journal | None = None,
+    calibrated: bool = False,
+) -> tuple[list[tuple[Job, Results]], list[Job]]:
+    """
+    Mark submissions with a cheap timing pass, then re-time the contenders.
+
+    Every submission is first marked with a short timing run. Only the contenders
+    of each question are then re-marked with precise timing, so the timing budget
+    is spent where it decides the ranking. The cheap pass runs on `workers`
+    processes. The precise pass runs in this process alone once they have
+    finished, so no other marking competes with the contenders, and times their
+    calls on a timing lane: the one in `marker_options` if given, and otherwise,
+    where CPU affinity is supported, the last CPU this process may run on, so
+    they are timed one at a time on a pinned CPU.
+
+    :param jobs: The submissions to mark.
+    :param workers: The number of worker processes of the cheap pass (default: 1)
+    :param time_limit: The time limit in seconds for each call (default: 30)
+    :param marker_options: Keyword arguments to create the markers with, other than
+        their timing options (default: None)
+    :param top_k: The number of fastest submissions per question to re-time
+        (default: 3)
+    :param within: Also re-time submissions within this fraction of the fastest
+        (default: 0.1)
+    :param journal: If given, the journal the cheap pass resumes from and records
+        to (default: None)
+    :param calibrated: Measure this machine's speed during both passes, to
+        normalize runtimes across machines (default: False)
+    :return: A 2-tuple of each job and its final results, in the order of `jobs`,
+        and the jobs that were re-timed.
+    """
+    marker_options = marker_options or {}
+    marked = list(
+        mark_batch(
+            jobs,
+            workers=workers,
+            time_limit=time_limit,
+            marker_options={
+                **marker_options,
+                "min_timing_time": CHEAP_MIN_TIMING_TIME,
+                "timing_repeats": 1,
+            },
+            journal=journal,
+            calibrated=calibrated,
+        )
+    )
+
+    contenders = select_contenders(marked, top_k=top_k, within=within)
+    precise = dict(
+        mark_batch(
+            contenders,
+            time_limit=time_limit,
+            marker_options={
+                **marker_options,
+                "min_timing_time": MIN_TIMING_TIME,
+                "timing_repeats": PRECISE_TIMING_REPEATS,
+                "timing_lane": marker_options.get("timing_lane")
+                or TimingLane.last_cpu(),
+            },
+            calibrated=calibrated,
+        )
+    )
+    return [(job, precise.get(job, results)) for job, results in marked], contenders
+
+
+def main(arguments: list[str] | None = None) -> int:
+    # argparser
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "folders",
+        nargs="+",
+        help="Folders containing team_{team}_question_{n}.py files",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Worker processes"
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=FUNCTION_RUNTIME_LIMIT,
+        help="The time limit in seconds for each call",
+    )
+    parser.add_argument(
+        "--bytecode-cache",
+        default=BYTECODE_CACHE_DIR,
+        help="Folder of the compiled submission cache shared by all workers",
+    )
+    parser.add_argument(
+        "--db",
+        nargs="?",
+        const=RESULTS_DB,
+        help=f"Record the results in a SQLite results store (default: {RESULTS_DB})",
+    )
+    parser.add_argument("--label", default="", help="A label for the recorded run")
+    parser.add_argument(
+        "--journal",
+        default=JOURNAL,
+        help="Checkpoint file to resume an interrupted batch from; deleted once "
+        "the batch completes",
+    )
+    parser.add_argument(
+        "--discard-timed-output",
+        action="store_true",
+        help="Discard what solutions print during timed calls",
+    )
+    parser.add_argument(
+        "--timing-cpus",
+        type=parse_cpus,
+        help="CPUs (e.g. 2,3 or 4-7) reserved for timed calls, which are run on them "
+        "one at a time",
+    )
+    parser.add_argument(
+        "--check-noise",
+        action="store_true",
+        help="Flag runtimes measured while a worker was kept off the CPU",
+    )
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Measure this machine's speed, and again between jobs every "
+        f"{CALIBRATION_INTERVAL} s, to normalize runtimes across machines",
+    )
+    parser.add_argument(
+        "--fair-timing",
+        action="store_true",
+        help="Also time cold calls on freshly loaded modules, so caching between "
+        "calls does not count",
+    )
+    parser.add_argument(
+        "--tiered",
+        action="store_true",
+        help="Time every submission briefly, then re-time the fastest precisely",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=TOP_K,
+        help="The number of fastest submissions per question to re-time",
+    )
+    parser.add_argument(
+        "--within",
+        type=float,
+        default=WITHIN,
+        help="Also re-time submissions within this fraction of the fastest",
+    )
+    parser.add_argument(
+        "--phases",
+        action="store_true",
+        help="Report where marking time went across the batch",
+    )
+    args = parser.parse_args(arguments)
+
+    entries = []
+    journal = Journal(args.journal)
+    if journal.completed:
+        print(f"Resuming from {args.journal}: {len(journal.completed)} job(s) done")
+    options = {
+        "workers": args.workers,
+        "time_limit": args.time_limit,
+        "marker_options": {
+            "bytecode_cache_dir": args.bytecode_cache,
+            "discard_timed_output": args.discard_timed_output,
+            "timing_lane": (
+                None
+                if args.timing_cpus is None
+                else TimingLane(args.timing_cpus, multiprocessing.Lock())
+            ),
+            "check_noise": args.check_noise,
+            "fair_timing": args.fair_timing,
+        },
+        "journal": journal,
+        "calibrated": args.calibrate,
+    }
+    with journal:
+        if args.tiered:
+            marked, retimed = mark_tiered(
+                discover_jobs(args.folders),
+                top_k=args.top_k,
+                within=args.within,
+                **options,
+            )
+        else:
+            marked, retimed = mark_batch(discover_jobs(args.folders), **options), []
+        for job, results in marked:
+            entries.append((job.team, job.question_number, job.source_hash, results))
+            print(
+                f"{job.team:<20} question {job.question_number:>2}: "
+                f"{results.points:g} point(s), runtime {results.runtime:.3g} s"
+                + (f", cold {results.cold_runtime:.3g} s" if args.fair_timing else "")
+                + (" (re-timed)" if job in retimed else "")
+                + (
+                    " (noisy)"
+                    if any(result.noisy for result in results.test_case_results)
+                    else ""
+                )
+            )
+
+    if args.db is not None:
+        with ResultsStore(args.db) as store:
+            run_id = store.record_batch(entries, label=args.label)
+        print(f"\nRecorded run {run_id} in {args.db}")
+    journal.discard()
+
+    if args.phases and entries:
+        print()
+        print(format_phase_report(results for *_, results in entries))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
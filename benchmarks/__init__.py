@@ -0,0 +1,34 @@
+"""
+Benchmarks for the marking harness.
+
+Importing this package registers every benchmark in `BENCHMARKS`. Run the suite
+with `py -m benchmarks`, save a baseline with `--save`, and later runs report any
+benchmark that is slower than the baseline by more than `--threshold`.
+"""
+
+from benchmarks import engines, harness
+from benchmarks.runner import (
+    BENCHMARKS,
+    Benchmark,
+    Regression,
+    benchmark,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+    time_callable,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "Benchmark",
+    "Regression",
+    "benchmark",
+    "engines",
+    "find_regressions",
+    "harness",
+    "load_baseline",
+    "run_benchmarks",
+    "save_baseline",
+    "time_callable",
+]
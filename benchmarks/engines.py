@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import atexit
+import math
+import shutil
+import tempfile
+from itertools import pairwise
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from benchmarks.runner import benchmark
+from engines.question_6 import hours_between
+from engines.question_8 import PointIndex, count_within
+from engines.question_9 import reverse_digits
+from engines.question_10 import count_pairs, read_baskets
+from engines.question_12 import CorrelationAccumulator, accumulate
+from engines.question_13 import descend
+from engines.question_14 import accumulate as accumulate_normal_equations
+from engines.question_14 import least_squares
+from marker import Marker
+from references.question_6 import Solution as hours_between_times
+from references.question_9 import Solution as reverse_integer
+from references.question_10 import Solution as most_frequent_pair
+from references.question_12 import Solution as correlation
+from references.question_13 import Solution as gradient_descent
+from references.question_14 import Solution as regression
+from strategies import (
+    large_correlated,
+    large_descent,
+    large_points,
+    large_regression,
+    large_reversible_ints,
+    large_times,
+    large_transactions,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+SEED = 0
+# Queries answered per timed call of the batched benchmarks
+QUERIES = 1_000
+# Queries checked against the brute-force definition when a benchmark is set up
+VALIDATED_QUERIES = 20
+# The number of parts data is split into to accumulate separately
+WORKER_PARTS = 4
+# The maximum iterations of each gradient descent trajectory
+DESCENT_ITERATIONS = 500
+# Rows checked against the reference (the first two features, for regressions,
+# as the reference supports up to 2)
+VALIDATED_ROWS = 10_000
+
+_scratch_dir = Path(tempfile.mkdtemp(prefix="engine-benchmarks-"))
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+
+
+def _validate(name: str, expected: object, actual: object) -> None:
+    if not Marker._values_match(expected, actual):
+        msg = f"{name} disagrees with the reference: expected {expected}, got {actual}"
+        raise RuntimeError(msg)
+
+
+@benchmark(10_000, 1_000_000)
+def point_index_build(size: int) -> Callable[[], object]:
+    points, *_ = large_points(SEED, size, 0)
+    return lambda: PointIndex(points)
+
+
+@benchmark(10_000, 1_000_000)
+def point_index_queries(size: int) -> Callable[[], object]:
+    points, center_x, center_y, radius = large_points(SEED, size, QUERIES)
+    index = PointIndex(points)
+    _validate(
+        "PointIndex.count_many",
+        [
+            count_within(points, x, y, r)
+            for x, y, r in zip(
+                center_x[:VALIDATED_QUERIES],
+                center_y[:VALIDATED_QUERIES],
+                radius[:VALIDATED_QUERIES],
+                strict=True,
+            )
+        ],
+        index.count_many(
+            center_x[:VALIDATED_QUERIES],
+            center_y[:VALIDATED_QUERIES],
+            radius[:VALIDATED_QUERIES],
+        ).tolist(),
+    )
+    return lambda: index.count_many(center_x, center_y, radius)
+
+
+@benchmark(10_000, 1_000_000)
+def pair_counter(size: int) -> Callable[[], object]:
+    transactions = large_transactions(SEED, size)
+    _validate(
+        "count_pairs",
+        most_frequent_pair(transactions),
+        count_pairs(transactions).most_common(1)[0][0],
+    )
+    return lambda: count_pairs(transactions)
+
+
+@benchmark(10_000, 1_000_000)
+def pair_counter_from_file(size: int) -> Callable[[], object]:
+    filepath = _scratch_dir / f"baskets_{size}.csv"
+    with filepath.open("w", encoding="utf-8") as file:
+        file.writelines(
+            ",".join(transaction) + "\n"
+            for transaction in large_transactions(SEED, size)
+        )
+    return lambda: count_pairs(read_baskets(filepath))
+
+
+def _memory_mapped_correlated(size: int) -> tuple[np.ndarray, np.ndarray]:
+    x, y = large_correlated(SEED, size)
+    np.save(_scratch_dir / f"x_{size}.npy", x)
+    np.save(_scratch_dir / f"y_{size}.npy", y)
+    mapped_x = np.load(_scratch_dir / f"x_{size}.npy", mmap_mode="r")
+    mapped_y = np.load(_scratch_dir / f"y_{size}.npy", mmap_mode="r")
+    _validate(
+        "accumulate",
+        correlation(x.tolist(), y.tolist()),
+        accumulate(mapped_x, mapped_y).correlation,
+    )
+    return mapped_x, mapped_y
+
+
+@benchmark(10_000, 10_000_000)
+def correlation_stream(size: int) -> Callable[[], object]:
+    x, y = _memory_mapped_correlated(size)
+    return lambda: accumulate(x, y).correlation
+
+
+@benchmark(10_000, 10_000_000)
+def correlation_merge(size: int) -> Callable[[], object]:
+    x, y = _memory_mapped_correlated(size)
+    # As parallel workers would, accumulate each part separately and merge them
+    bounds = np.linspace(0, size, WORKER_PARTS + 1).astype(int)
+
+    def merged() -> float:
+        accumulator = CorrelationAccumulator()
+        for start, stop in pairwise(bounds):
+            accumulator = accumulator.merge(accumulate(x[start:stop], y[start:stop]))
+        return accumulator.correlation
+
+    _validate("CorrelationAccumulator.merge", accumulate(x, y).correlation, merged())
+    return merged
+
+
+@benchmark(10_000, 1_000_000)
+def least_squares_qr(size: int) -> Callable[[], object]:
+    X, y = large_regression(SEED, size)
+    _validate(
+        "least_squares",
+        regression(X[:VALIDATED_ROWS, :2].tolist(), y[:VALIDATED_ROWS].tolist()),
+        least_squares(X[:VALIDATED_ROWS, :2], y[:VALIDATED_ROWS]).tolist(),
+    )
+    return lambda: least_squares(X, y)
+
+
+@benchmark(10_000, 1_000_000)
+def normal_equations_stream(size: int) -> Callable[[], object]:
+    X, y = large_regression(SEED, size)
+    np.save(_scratch_dir / f"design_{size}.npy", X)
+    np.save(_scratch_dir / f"targets_{size}.npy", y)
+    mapped_X = np.load(_scratch_dir / f"design_{size}.npy", mmap_mode="r")
+    mapped_y = np.load(_scratch_dir / f"targets_{size}.npy", mmap_mode="r")
+    _validate(
+        "NormalEquations.solve",
+        least_squares(X, y).tolist(),
+        accumulate_normal_equations(mapped_X, mapped_y).solve().tolist(),
+    )
+    return lambda: accumulate_normal_equations(mapped_X, mapped_y).solve()
+
+
+def _descent_benchmark(
+    gradient_func: Callable[[float], float], size: int
+) -> Callable[[], object]:
+    _, x_0, lr = large_descent(SEED, size)
+    _validate(
+        "descend",
+        [
+            gradient_descent(gradient_func, x, rate, DESCENT_ITERATIONS)
+            for x, rate in zip(
+                x_0[:VALIDATED_QUERIES].tolist(),
+                lr[:VALIDATED_QUERIES].tolist(),
+                strict=True,
+            )
+        ],
+        descend(
+            gradient_func,
+            x_0[:VALIDATED_QUERIES],
+            lr[:VALIDATED_QUERIES],
+            DESCENT_ITERATIONS,
+        ).x.tolist(),
+    )
+    return lambda: descend(gradient_func, x_0, lr, DESCENT_ITERATIONS)
+
+
+@benchmark(1_000, 100_000)
+def multi_start_descent(size: int) -> Callable[[], object]:
+    gradient, _, _ = large_descent(SEED, size)
+    return _descent_benchmark(gradient, size)
+
+
+@benchmark(1_000, 10_000)
+def multi_start_descent_scalar_gradient(size: int) -> Callable[[], object]:
+    # `math.atan` only takes floats, so the gradient is called per trajectory
+    return _descent_benchmark(lambda x: math.atan(x - 3), size)
+
+
+@benchmark(10_000, 1_000_000)
+def bulk_hours_between(size: int) -> Callable[[], object]:
+    start, end = large_times(SEED, size)
+    _validate(
+        "hours_between",
+        [
+            hours_between_times(start_time, end_time)
+            for start_time, end_time in zip(
+                start[:VALIDATED_ROWS], end[:VALIDATED_ROWS], strict=True
+            )
+        ],
+        hours_between(start[:VALIDATED_ROWS], end[:VALIDATED_ROWS]).tolist(),
+    )
+    return lambda: hours_between(start, end)
+
+
+@benchmark(10_000, 1_000_000)
+def bulk_reverse_digits(size: int) -> Callable[[], object]:
+    x = large_reversible_ints(SEED, size)
+    _validate(
+        "reverse_digits",
+        [reverse_integer(value) for value in x[:VALIDATED_ROWS].tolist()],
+        reverse_digits(x[:VALIDATED_ROWS]).tolist(),
+    )
+    return lambda: reverse_digits(x)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import ast
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.runner import benchmark
+from bytecode_cache import BytecodeCache
+from func_timeout import func_timeout
+from marker import Marker
+from question import BonusConditions
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Number of times `set_recursion_depth` is entered per timed call
+RECURSION_ENTRIES_PER_CALL = 10
+
+marker = Marker()
+_scratch_dir = Path(tempfile.mkdtemp(prefix="marker-benchmarks-"))
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+
+
+def _generated_source(n_functions: int) -> str:
+    """Generate a solution file with `n_functions` helper functions."""
+    helpers = "\n\n".join(
+        f"def helper_{i}(values):\n"
+        f"    total = 0\n"
+        f"    for value in values:\n"
+        f"        if value % {i + 2} == 0:\n"
+        f"            total += value * {i}\n"
+        f"    return [total, *sorted(values)]\n"
+        for i in range(n_functions)
+    )
+    return f"import math\n\n{helpers}\n\ndef Solution(x):\n    return math.sqrt(x)\n"
+
+
+@benchmark(0, 10_000, 1_000_000)
+def func_timeout_roundtrip(size: int) -> Callable[[], object]:
+    values = range(size)
+    return lambda: func_timeout(30, sum, args=(values,))
+
+
+@benchmark(10, 1_000, 100_000)
+def values_match_float_list(size: int) -> Callable[[], object]:
+    expected = [float(i) for i in range(size)]
+    actual = [value + 1e-7 for value in expected]
+    return lambda: Marker._values_match(expected, actual)
+
+
+@benchmark(10, 1_000, 100_000)
+def values_match_nested_list(size: int) -> Callable[[], object]:
+    expected = [(i, [float(i), str(i)]) for i in range(size)]
+    actual = [(i, [float(i), str(i)]) for i in range(size)]
+    return lambda: Marker._values_match(expected, actual)
+
+
+@benchmark(10, 10_000, 1_000_000)
+def values_match_ndarray(size: int) -> Callable[[], object]:
+    expected = np.linspace(0, 1, size)
+    actual = expected.copy()
+    return lambda: Marker._values_match(expected, actual)
+
+
+@benchmark(10, 10_000, 1_000_000)
+def values_match_dataframe(size: int) -> Callable[[], object]:
+    expected = pd.DataFrame(
+        {"name": [f"name_{i}" for i in range(size)], "score": np.arange(size)}
+    )
+    actual = expected.copy()
+    return lambda: Marker._values_match(expected, actual)
+
+
+@benchmark(1, 100, 1_000)
+def import_module_from_file(size: int) -> Callable[[], object]:
+    filepath = _scratch_dir / f"import_{size}.py"
+    filepath.write_text(_generated_source(size), encoding="utf-8")
+
+    def import_module() -> object:
+        # Access an attribute so the lazily loaded module is executed
+        return Marker._import_module_from_file("solution", filepath).Solution
+
+    return import_module
+
+
+@benchmark(1, 100, 1_000)
+def import_module_from_bytecode_cache(size: int) -> Callable[[], object]:
+    filepath = _scratch_dir / f"cached_import_{size}.py"
+    filepath.write_text(_generated_source(size), encoding="utf-8")
+    cache = BytecodeCache(_scratch_dir / "bytecode_cache")
+
+    def import_module() -> object:
+        return Marker._import_module_from_file(
+            "solution", filepath, bytecode_cache=cache
+        ).Solution
+
+    return import_module
+
+
+@benchmark(1, 100, 1_000)
+def parse_syntax_tree(size: int) -> Callable[[], object]:
+    source = _generated_source(size)
+    return lambda: Marker._parse_syntax_tree("solution.py", source)
+
+
+@benchmark(1, 100, 1_000)
+def obeys_bonus_conditions(size: int) -> Callable[[], object]:
+    syntax_tree = ast.parse(_generated_source(size))
+    conditions = BonusConditions(
+        blacklisted_packages={"numpy", "pandas"},
+        blacklisted_keywords={"While"},
+        blacklisted_functions={"str", "int"},
+    )
+    return lambda: marker._obeys_bonus_conditions(syntax_tree, conditions)
+
+
+def _enter_recursion_depth_at(depth: int) -> None:
+    if depth > 0:
+        _enter_recursion_depth_at(depth - 1)
+        return
+    for _ in range(RECURSION_ENTRIES_PER_CALL):
+        with Marker.set_recursion_depth(100):
+            pass
+
+
+@benchmark(0, 50, 500)
+def set_recursion_depth(size: int) -> Callable[[], object]:
+    # `inspect.stack` cost grows with the depth of the stack it is called from
+    return lambda: _enter_recursion_depth_at(size)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import timeit
+from dataclasses import KW_ONLY, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Iterable
+
+BASELINE_PATH = Path(".benchmarks") / "baseline.json"
+REGRESSION_THRESHOLD = 0.2
+MIN_SAMPLE_TIME = 0.02
+REPEATS = 5
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    Dataclass representing a benchmark of one hot path at several sizes.
+
+    Attributes:
+        name: The name of the benchmark.
+        setup: Builds the zero-argument callable to time for a given size. Any
+            setup work done here is not timed.
+        sizes: The sizes to run the benchmark at.
+    """
+
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    _: KW_ONLY
+    sizes: tuple[int, ...] = (1,)
+
+    def keys(self) -> list[str]:
+        return [f"{self.name}[{size}]" for size in self.sizes]
+
+
+@dataclass
+class Regression:
+    """
+    Dataclass representing a benchmark that got slower than its baseline.
+
+    Attributes:
+        key: The benchmark name and size.
+        baseline: The baseline time per call in seconds.
+        current: The current time per call in seconds.
+    """
+
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.current / self.baseline - 1
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    *sizes: int,
+) -> Callable[[Callable[[int], Callable[[], object]]], Benchmark]:
+    """
+    Register a setup function as a benchmark, named after the function.
+
+    :param sizes: The sizes to run the benchmark at.
+    :return: A decorator registering the benchmark.
+    """
+
+    def register(setup: Callable[[int], Callable[[], object]]) -> Benchmark:
+        registered = Benchmark(setup.__name__, setup, sizes=sizes or (1,))
+        BENCHMARKS[registered.name] = registered
+        return registered
+
+    return register
+
+
+def time_callable(
+    function: Callable[[], object],
+    *,
+    repeats: int = REPEATS,
+    min_sample_time: float = MIN_SAMPLE_TIME,
+) -> float:
+    """
+    Time a callable, taking the fastest of several samples.
+
+    Like `timeit.Timer.autorange` the number of calls per sample grows in a
+    1, 2, 5 sequence, but only until a sample takes `min_sample_time` seconds, so
+    a full suite stays quick to run.
+
+    :param function: The callable to time.
+    :param repeats: The number of samples to take (default: 5)
+    :param min_sample_time: The minimum duration of each sample (default: 0.02)
+    :return: The best time per call in seconds.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            calls = number * multiplier
+            if timer.timeit(calls) >= min_sample_time:
+                return min(timer.repeat(repeats, calls)) / calls
+        number *= 10
+
+
+def run_benchmarks(
+    benchmarks: Iterable[Benchmark], *, repeats: int = REPEATS
+) -> dict[str, float]:
+    """
+    Run benchmarks at all of their sizes.
+
+    :param benchmarks: The benchmarks to run.
+    :param repeats: The number of samples per size (default: 5)
+    :return: The time per call in seconds keyed by `name[size]`.
+    """
+    timings = {}
+    for bench in benchmarks:
+        for size, key in zip(bench.sizes, bench.keys(), strict=True):
+            timings[key] = time_callable(bench.setup(size), repeats=repeats)
+    return timings
+
+
+def save_baseline(timings: dict[str, float], path: str | os.PathLike) -> None:
+    """
+    Save timings as a baseline, merging them into any existing baseline.
+
+    :param timings: The timings to save.
+    :param path: The baseline file.
+    """
+    path = Path(path)
+    baseline = load_baseline(path) if path.exists() else {}
+    baseline.update(timings)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {"python": platform.python_version(), "timings": baseline}, indent=2
+        ),
+        encoding="utf-8",
+    )
+
+
+def load_baseline(path: str | os.PathLike) -> dict[str, float]:
+    """
+    Load baseline timings.
+
+    :param path: The baseline file.
+    :return: The baseline time per call in seconds keyed by `name[size]`.
+    """
+    return json.loads(Path(path).read_text(encoding="utf-8"))["timings"]
+
+
+def find_regressions(
+    timings: dict[str, float],
+    baseline: dict[str, float],
+    *,
+    threshold: float = REGRESSION_THRESHOLD,
+) -> list[Regression]:
+    """
+    Find the benchmarks that are slower than their baseline by more than a threshold.
+
+    :param timings: The current timings.
+    :param baseline: The baseline timings.
+    :param threshold: The allowed relative slowdown (default: 0.2)
+    :return: The regressions, worst first.
+    """
+    regressions = [
+        Regression(key, baseline[key], current)
+        for key, current in timings.items()
+        if key in baseline and current > baseline[key] * (1 + threshold)
+    ]
+    return sorted(regressions, key=lambda regression: -regression.slowdown)
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def main(arguments: list[str] | None = None) -> int:
+    # argparser
+    parser = argparse.ArgumentParser(prog="benchmarks")
+    parser.add_argument(
+        "names", nargs="*", help="Benchmarks to run (default: all benchmarks)"
+    )
+    parser.add_argument(
+        "--baseline", default=BASELINE_PATH, help="The baseline file to compare to"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Save the timings as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="The relative slowdown reported as a regression",
+    )
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Samples per size")
+    args = parser.parse_args(arguments)
+
+    unknown = set(args.names) - BENCHMARKS.keys()
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    selected = [BENCHMARKS[name] for name in args.names or BENCHMARKS]
+
+    baseline = load_baseline(args.baseline) if Path(args.baseline).exists() else {}
+    timings = {}
+    for bench in selected:
+        bench_timings = run_benchmarks([bench], repeats=args.repeats)
+        for key, seconds in bench_timings.items():
+            change = f"{seconds / baseline[key] - 1:+.1%}" if key in baseline else "new"
+            print(f"{key:<45} {_format_seconds(seconds):>10}  {change}")
+        timings.update(bench_timings)
+
+    if args.save:
+        save_baseline(timings, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(timings, baseline, threshold=args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(
+                f"{regression.key:<45} {_format_seconds(regression.baseline):>10} -> "
+                f"{_format_seconds(regression.current)} ({regression.slowdown:+.1%})"
+            )
+        return 1
+    return 0
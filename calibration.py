@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+import time
+import timeit
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Seconds a calibration is considered current for
+CALIBRATION_INTERVAL = 600
+CALIBRATION_REPEATS = 10
+
+_rng = np.random.default_rng(0)
+_values = _rng.random(200_000)
+_frame = pd.DataFrame(
+    {"key": _rng.integers(0, 100, 50_000), "value": _rng.random(50_000)}
+)
+
+
+def _python_workload() -> object:
+    counts = {}
+    total = 0
+    for i in range(50_000):
+        total += i * i % 7
+        counts[i % 100] = counts.get(i % 100, 0) + 1
+    return total, "".join(str(i) for i in range(5_000))[::-1]
+
+
+def _numpy_workload() -> object:
+    return np.sort(_values).cumsum() @ _values
+
+
+def _pandas_workload() -> object:
+    return _frame.groupby("key")["value"].agg(["mean", "std"]).sort_values("mean")
+
+
+# Each workload and its runtime in seconds on the reference machine
+WORKLOADS = {
+    "python": (_python_workload, 0.0088),
+    "numpy": (_numpy_workload, 0.0034),
+    "pandas": (_pandas_workload, 0.0018),
+}
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """
+    Dataclass representing the speed of a machine relative to the reference machine.
+
+    Attributes:
+        speed_factor: How many times longer the workloads take than on the
+            reference machine (above 1 for slower machines).
+        timings: The runtime in seconds of each workload.
+        measured_at: The `time.monotonic` time the calibration was run at.
+    """
+
+    speed_factor: float
+    timings: dict[str, float] = field(default_factory=dict)
+    measured_at: float = 0
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.measured_at > CALIBRATION_INTERVAL
+
+
+def calibrate(repeats: int = CALIBRATION_REPEATS) -> Calibration:
+    """
+    Run the calibration workloads to measure the speed of this machine.
+
+    Each workload covers a kind of work submissions do: pure-Python loops, numpy
+    array operations, and pandas operations. The speed factor is the geometric mean
+    of their slowdowns relative to the reference machine, so dividing a runtime by
+    it estimates the runtime on the reference machine.
+
+    :param repeats: The number of times to time each workload, keeping the fastest
+        (default: 10)
+    :return: The calibration.
+    """
+    timings = {
+        name: min(timeit.repeat(workload, number=1, repeat=repeats))
+        for name, (workload, _) in WORKLOADS.items()
+    }
+    speed_factor = math.exp(
+        sum(
+            math.log(timings[name] / reference)
+            for name, (_, reference) in WORKLOADS.items()
+        )
+        / len(WORKLOADS)
+    )
+    return Calibration(speed_factor, timings, time.monotonic())
@@ -0,0 +1,531 @@
+"""
+Multi-node marking over TCP without an external broker.
+
+A coordinator shards (team, question) jobs to worker daemons. Each worker marks
+jobs with `Marker.mark` in its own process pool and streams results back. Workers
+can join and leave at any time. A worker that disconnects or misses heartbeats
+has its unfinished jobs resubmitted to the others. Jobs lost together are retried
+one at a time, so a submission that crashes workers is failed after
+`MAX_ATTEMPTS` losses without taking its neighbours down with it.
+
+Messages are tuples sent as frames: a 4-byte big-endian length, an HMAC-SHA256
+of the payload keyed with a secret shared by the coordinator and its workers, and
+the payload, the zlib-compressed pickle of the message. Since unpickling can run
+arbitrary code, frames are only unpickled once their HMAC checks out, and a peer
+sending any other frame is disconnected. The HMAC does not encrypt the frames,
+which include the submissions' source code, so use a private network to keep them
+confidential.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hmac
+import os
+import pickle
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from batch import Job, _init_worker, _mark_job, discover_jobs
+from calibration import calibrate
+from marker import FUNCTION_RUNTIME_LIMIT, BonusResult, Result, Results, TestCaseOutput
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Iterator
+
+    from calibration import Calibration
+
+DEFAULT_PORT = 8765
+# The environment variable the command line reads the shared secret from
+SECRET_VARIABLE = "MARKER_CLUSTER_SECRET"
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 5.0
+RECONNECT_DELAY = 1.0
+# Jobs whose worker is lost this many times while marking them alone (e.g.
+# because the submission keeps crashing workers) are given up on and fail
+MAX_ATTEMPTS = 3
+
+_FRAME_HEADER = struct.Struct(">I")
+_DIGEST = "sha256"
+_DIGEST_SIZE = 32
+
+
+async def _send(writer: asyncio.StreamWriter, message: tuple, secret: bytes) -> None:
+    payload = zlib.compress(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+    digest = hmac.digest(secret, payload, _DIGEST)
+    # One write per frame, so frames from concurrent tasks never interleave
+    writer.write(_FRAME_HEADER.pack(len(payload)) + digest + payload)
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader, secret: bytes) -> tuple:
+    """
+    Receive a message.
+
+    :raises ConnectionError: If the frame was not signed with the shared secret.
+    """
+    (length,) = _FRAME_HEADER.unpack(await reader.readexactly(_FRAME_HEADER.size))
+    digest = await reader.readexactly(_DIGEST_SIZE)
+    payload = await reader.readexactly(length)
+    if not hmac.compare_digest(digest, hmac.digest(secret, payload, _DIGEST)):
+        msg = "Received a frame not signed with the shared secret"
+        raise ConnectionError(msg)
+    return pickle.loads(zlib.decompress(payload))
+
+
+@dataclass
+class _WorkerConnection:
+    name: str
+    capacity: int
+    writer: asyncio.StreamWriter
+    in_flight: set[int] = field(default_factory=set)
+
+
+class Coordinator:
+    """
+    Shards marking jobs to worker daemons that connect over TCP.
+
+    Call `start` to begin listening, then iterate `results` to receive each job's
+    results as soon as a worker finishes it.
+    """
+
+    def __init__(
+        self,
+        jobs: Iterable[Job],
+        *,
+        secret: bytes,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        time_limit: float = FUNCTION_RUNTIME_LIMIT,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+    ) -> None:
+        """
+        Create a coordinator.
+
+        :param jobs: The submissions to mark.
+        :param secret: The secret shared with the workers, which signs every frame.
+        :param host: The address to listen on (default: 127.0.0.1)
+        :param port: The port to listen on, or 0 for any free port (default: 8765)
+        :param time_limit: The time limit in seconds for each call (default: 30)
+        :param heartbeat_timeout: Seconds of silence after which a worker is
+            considered lost and its jobs are resubmitted (default: 5)
+        """
+        self.jobs = list(jobs)
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.time_limit = time_limit
+        self.heartbeat_timeout = heartbeat_timeout
+        self._pending = deque(range(len(self.jobs)))
+        self._done: set[int] = set()
+        self._failures: dict[int, int] = {}
+        # Jobs lost alongside others, retried alone so a crash can be attributed
+        self._isolated: set[int] = set()
+        self._workers: list[_WorkerConnection] = []
+        self._handlers: set[asyncio.Task] = set()
+        self._results: queue.Queue[tuple[Job, Results] | None] = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._finished: asyncio.Event | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> tuple[str, int]:
+        """
+        Start listening for workers in a background thread.
+
+        :return: The address the coordinator is listening on.
+        """
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self._serve(),), daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        return self.host, self.port
+
+    def results(self) -> Iterator[tuple[Job, Results]]:
+        """
+        Receive results as workers finish jobs, until every job is done.
+
+        :return: An iterator of each job and its results, in completion order.
+        """
+        for _ in range(len(self.jobs)):
+            item = self._results.get()
+            if item is None:
+                break
+            yield item
+        self.stop()
+
+    def stop(self) -> None:
+        """Tell the connected workers the batch is over and stop listening."""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._finished.set)
+        self._thread.join()
+        self._thread = None
+
+    async def _serve(self) -> None:
+        self._finished = asyncio.Event()
+        if not self.jobs:
+            self._finished.set()
+        server = await asyncio.start_server(self._handle_worker, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await self._finished.wait()
+            for worker in list(self._workers):
+                with contextlib.suppress(ConnectionError):
+                    await _send(worker.writer, ("done",), self.secret)
+                worker.writer.close()
+            if self._handlers:
+                _, unfinished = await asyncio.wait(
+                    self._handlers, timeout=self.heartbeat_timeout
+                )
+                for handler in unfinished:
+                    handler.cancel()
+
+    def _complete(self, job_id: int, results: Results) -> None:
+        # A resubmitted job can finish twice, so keep the first result
+        if job_id in self._done:
+            return
+        self._done.add(job_id)
+        self._results.put((self.jobs[job_id], results))
+        if len(self._done) == len(self.jobs):
+            self._finished.set()
+
+    def _requeue(self, job_ids: set[int]) -> None:
+        """Resubmit the jobs of a lost worker, failing those lost too often."""
+        job_ids -= self._done
+        for job_id in job_ids:
+            if len(job_ids) > 1 and job_id not in self._isolated:
+                # Any one of these jobs may have brought the worker down
+                self._isolated.add(job_id)
+                self._pending.appendleft(job_id)
+                continue
+            self._failures[job_id] = self._failures.get(job_id, 0) + 1
+            if self._failures[job_id] < MAX_ATTEMPTS:
+                self._pending.appendleft(job_id)
+                continue
+            msg = f"Marking failed on {MAX_ATTEMPTS} workers"
+            test_case_output = TestCaseOutput(
+                Result.FAILED, message=RuntimeError(msg), exception=True
+            )
+            self._complete(job_id, Results([test_case_output], BonusResult.NA, 0, 0))
+
+    async def _dispatch(self) -> None:
+        """Send pending jobs to every worker with free capacity."""
+        for worker in list(self._workers):
+            while (
+                self._pending
+                and len(worker.in_flight) < worker.capacity
+                and not worker.in_flight & self._isolated
+            ):
+                job_id = self._pending[0]
+                if job_id in self._isolated and worker.in_flight:
+                    break
+                self._pending.popleft()
+                if job_id in self._done:
+                    continue
+                job = self.jobs[job_id]
+                worker.in_flight.add(job_id)
+                message = (
+                    "job",
+                    job_id,
+                    job.team,
+                    job.question_number,
+                    job.filepath.name,
+                    job.filepath.read_bytes(),
+                    self.time_limit,
+                )
+                try:
+                    await _send(worker.writer, message, self.secret)
+                except ConnectionError:
+                    break
+
+    async def _handle_worker(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        handler.add_done_callback(self._handlers.discard)
+        try:
+            _, name, capacity = await asyncio.wait_for(
+                _receive(reader, self.secret), self.heartbeat_timeout
+            )
+        except (TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+
+        worker = _WorkerConnection(name, capacity, writer)
+        self._workers.append(worker)
+        await self._dispatch()
+        try:
+            # Read until the worker goes away; once every job is done `_serve`
+            # sends "done" and closes the connection
+            while True:
+                message = await asyncio.wait_for(
+                    _receive(reader, self.secret), self.heartbeat_timeout
+                )
+                if message[0] == "result":
+                    _, job_id, results = message
+                    worker.in_flight.discard(job_id)
+                    self._complete(job_id, results)
+                    await self._dispatch()
+        except (TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            # The worker left or stopped sending heartbeats
+            pass
+        finally:
+            writer.close()
+            self._workers.remove(worker)
+            self._requeue(set(worker.in_flight))
+            worker.in_flight.clear()
+            await self._dispatch()
+
+
+class _Calibrator:
+    """
+    A worker's calibration, renewed between jobs once it is stale.
+
+    Jobs are run inside `job`, which gives the speed factor to mark them with. Once
+    the calibration is stale, `keep_current` holds back new jobs until the running
+    ones finish, so the calibration workloads run on an otherwise idle machine.
+    """
+
+    def __init__(self, calibration: Calibration) -> None:
+        self.calibration = calibration
+        self._running = 0
+        self._recalibrating = False
+        self._changed = asyncio.Condition()
+
+    @contextlib.asynccontextmanager
+    async def job(self) -> AsyncIterator[float]:
+        """Run a job, giving the speed factor to mark it with."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: not self._recalibrating)
+            self._running += 1
+        try:
+            yield self.calibration.speed_factor
+        finally:
+            async with self._changed:
+                self._running -= 1
+                self._changed.notify_all()
+
+    async def keep_current(self, interval: float) -> None:
+        """Check the calibration every `interval` seconds, renewing it when stale."""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.calibration.is_stale:
+                continue
+            async with self._changed:
+                self._recalibrating = True
+                try:
+                    await self._changed.wait_for(lambda: not self._running)
+                    # In a thread, so heartbeats keep going
+                    self.calibration = await asyncio.to_thread(calibrate)
+                finally:
+                    self._recalibrating = False
+                    self._changed.notify_all()
+
+
+async def _heartbeat(
+    writer: asyncio.StreamWriter, interval: float, secret: bytes
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await _send(writer, ("heartbeat",), secret)
+
+
+async def _run_job(
+    writer: asyncio.StreamWriter,
+    executor: ProcessPoolExecutor,
+    job_dir: Path,
+    message: tuple,
+    secret: bytes,
+    calibrator: _Calibrator,
+) -> None:
+    _, job_id, team, question_number, filename, source, time_limit = message
+    # Each job gets its own folder, so jobs with the same filename never clash
+    filepath = job_dir / str(job_id) / filename
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    filepath.write_bytes(source)
+    job = Job(team, question_number, filepath)
+    try:
+        # The speed factor comes with each job, as the pool outlives calibrations
+        async with calibrator.job() as speed_factor:
+            results = await asyncio.get_running_loop().run_in_executor(
+                executor, _mark_job, job, time_limit, speed_factor
+            )
+    except BrokenProcessPool:
+        # A submission killed a marking process: drop the connection so the
+        # coordinator resubmits this worker's jobs, and reconnect with a new pool
+        writer.close()
+        return
+    await _send(writer, ("result", job_id, results), secret)
+
+
+async def _serve_coordinator(
+    host: str,
+    port: int,
+    executor: ProcessPoolExecutor,
+    capacity: int,
+    heartbeat_interval: float,
+    secret: bytes,
+    calibrator: _Calibrator,
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    await _send(writer, ("hello", name, capacity), secret)
+    heartbeat = asyncio.create_task(_heartbeat(writer, heartbeat_interval, secret))
+    recalibration = asyncio.create_task(calibrator.keep_current(heartbeat_interval))
+    jobs = set()
+    with tempfile.TemporaryDirectory(prefix="marker-worker-") as job_dir:
+        try:
+            while True:
+                message = await _receive(reader, secret)
+                if message[0] == "done":
+                    break
+                task = asyncio.create_task(
+                    _run_job(
+                        writer, executor, Path(job_dir), message, secret, calibrator
+                    )
+                )
+                jobs.add(task)
+                task.add_done_callback(jobs.discard)
+        finally:
+            heartbeat.cancel()
+            recalibration.cancel()
+            for task in jobs:
+                task.cancel()
+            writer.close()
+
+
+def serve_worker(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    *,
+    secret: bytes,
+    capacity: int | None = None,
+    marker_options: dict[str, Any] | None = None,
+    heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    once: bool = False,
+) -> None:
+    """
+    Run a worker daemon that marks jobs sent by a coordinator.
+
+    The worker reconnects whenever it loses the coordinator, or when a batch ends,
+    so one daemon can serve many batches. It runs the calibration workloads at
+    startup, and again whenever the calibration goes stale, holding back new jobs
+    until the running ones finish, so no marking runs alongside them. Its results
+    carry the speed factor measured before they were marked, so runtimes from
+    different machines can be compared.
+
+    :param host: The coordinator's address (default: 127.0.0.1)
+    :param port: The coordinator's port (default: 8765)
+    :param secret: The secret shared with the coordinator, which signs every frame.
+    :param capacity: The number of jobs to mark at once (default: the number of
+        CPUs)
+    :param marker_options: Keyword arguments to create the marker with
+        (default: None)
+    :param heartbeat_interval: Seconds between heartbeats (default: 1)
+    :param once: Stop after serving one batch (default: False)
+    """
+    capacity = capacity or os.cpu_count() or 1
+    calibration = calibrate()
+    while True:
+        if calibration.is_stale:
+            calibration = calibrate()
+        # A new calibrator for each connection, as each runs its own event loop
+        calibrator = _Calibrator(calibration)
+        with ProcessPoolExecutor(
+            capacity, initializer=_init_worker, initargs=(marker_options or {},)
+        ) as executor:
+            try:
+                asyncio.run(
+                    _serve_coordinator(
+                        host,
+                        port,
+                        executor,
+                        capacity,
+                        heartbeat_interval,
+                        secret,
+                        calibrator,
+                    )
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if once:
+                    raise
+            else:
+                if once:
+                    return
+        calibration = calibrator.calibration
+        time.sleep(RECONNECT_DELAY)
+
+
+def main(arguments: list[str] | None = None) -> int:
+    # argparser
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="role", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinator", help="Shard a batch")
+    coordinator_parser.add_argument(
+        "folders",
+        nargs="+",
+        help="Folders containing team_{team}_question_{n}.py files",
+    )
+    coordinator_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="The address to listen on, e.g. 0.0.0.0 to accept workers on other "
+        "machines",
+    )
+    coordinator_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coordinator_parser.add_argument(
+        "--time-limit", type=float, default=FUNCTION_RUNTIME_LIMIT
+    )
+
+    worker_parser = subparsers.add_parser("worker", help="Mark jobs for a coordinator")
+    worker_parser.add_argument("--host", default="127.0.0.1")
+    worker_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    worker_parser.add_argument("--capacity", type=int, default=None)
+    args = parser.parse_args(arguments)
+
+    secret = os.environ.get(SECRET_VARIABLE, "").encode()
+    if not secret:
+        parser.error(f"set {SECRET_VARIABLE} to a secret shared by every node")
+
+    if args.role == "worker":
+        serve_worker(args.host, args.port, secret=secret, capacity=args.capacity)
+        return 0
+
+    coordinator = Coordinator(
+        discover_jobs(args.folders),
+        secret=secret,
+        host=args.host,
+        port=args.port,
+        time_limit=args.time_limit,
+    )
+    host, port = coordinator.start()
+    print(f"Coordinating {len(coordinator.jobs)} jobs on {host}:{port}")
+    for job, results in coordinator.results():
+        print(
+            f"{job.team:<20} question {job.question_number:>2}: "
+            f"{results.points:g} point(s), runtime {results.runtime:.3g} s "
+            f"(normalized {results.normalized_runtime:.3g} s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,340 @@
+"""
+A/B comparison of the speed of two solutions to a question.
+
+Both solutions are timed on the same inputs: the question's test cases and,
+optionally, large generated inputs. Timed samples of the two alternate in ABBA
+order, so drift in machine speed over the comparison (thermal throttling,
+background load) affects both equally. Each round gives a pair of samples, and
+the speedup of B over A is the geometric mean of the paired ratios, tested for
+significance with a Wilcoxon signed-rank test.
+"""
+
+from __future__ import annotations
+
+import copy
+import gc
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from func_timeout import func_timeout
+from marker import FUNCTION_RUNTIME_LIMIT, Marker
+from strategies import STRATEGIES
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable
+
+    from question import Question
+
+ROUNDS = 20
+# Each sample times enough calls to take at least this many seconds
+MIN_SAMPLE_TIME = 0.01
+# A speedup is significant if its p-value is below this
+SIGNIFICANCE_LEVEL = 0.05
+GENERATED_SIZE = 1000
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """
+    Dataclass representing how two solutions compare on one input.
+
+    Attributes:
+        label: Which input was compared, e.g. "Test 1" or "Generated 3".
+        runtime_a: The median runtime of a call of solution A in seconds.
+        runtime_b: The median runtime of a call of solution B in seconds.
+        speedup: How many times faster B is than A (below 1 if B is slower).
+        p_value: The probability of a speedup at least this far from 1 if the two
+            were equally fast.
+        outputs_match: Whether both solutions gave the right output (for test cases)
+            or the same output (for generated inputs).
+    """
+
+    label: str
+    runtime_a: float
+    runtime_b: float
+    speedup: float
+    p_value: float
+    outputs_match: bool
+
+    @property
+    def significant(self) -> bool:
+        return self.p_value < SIGNIFICANCE_LEVEL
+
+    def __str__(self) -> str:
+        verdict = "significant" if self.significant else "not significant"
+        mismatch = "" if self.outputs_match else ", OUTPUTS DIFFER"
+        return (
+            f"{self.label}: A {self.runtime_a:.3g} s, B {self.runtime_b:.3g} s, "
+            f"B is {self.speedup:.3g}x as fast (p = {self.p_value:.2g}, "
+            f"{verdict}{mismatch})"
+        )
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def wilcoxon_signed_rank(differences: list[float]) -> float:
+    """
+    Test whether paired differences are centred on zero.
+
+    Uses the normal approximation of the signed-rank statistic with tied ranks
+    averaged, which is accurate from around 10 pairs.
+
+    :param differences: The paired differences.
+    :return: The two-sided p-value.
+    """
+    nonzero = sorted((abs(d), d > 0) for d in differences if d != 0)
+    n = len(nonzero)
+    if n == 0:
+        return 1.0
+
+    # Rank the absolute differences, averaging the ranks of ties
+    positive_rank_sum = 0.0
+    tie_correction = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and nonzero[j + 1][0] == nonzero[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        positive_rank_sum += rank * sum(positive for _, positive in nonzero[i : j + 1])
+        tie_correction += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    mean = n * (n + 1) / 4
+    variance = n * (n + 1) * (2 * n + 1) / 24 - tie_correction / 48
+    if variance <= 0:
+        return 1.0
+    z = (positive_rank_sum - mean) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+class SolutionError(Exception):
+    """
+    Exception raised when a compared solution fails on an input.
+
+    Its cause is the exception the solution raised.
+
+    Attributes:
+        solution: Which solution failed, "A" or "B".
+        label: Which input it failed on, e.g. "Test 1" or "Generated 3".
+        input_args: The arguments it was called with.
+        input_kwargs: The keyword arguments it was called with.
+    """
+
+    def __init__(
+        self, solution: str, label: str, input_args: tuple, input_kwargs: dict
+    ) -> None:
+        super().__init__(f"Solution {solution} failed on {label}")
+        self.solution = solution
+        self.label = label
+        self.input_args = input_args
+        self.input_kwargs = input_kwargs
+
+
+def _sample(
+    function: Callable, args: tuple, kwargs: dict, number: int, time_limit: float
+) -> float:
+    """
+    Time `number` calls, returning the mean runtime of a call.
+
+    Every call gets its own copy of the input, made before timing starts, so a
+    function that modifies its input is timed on the input that was checked.
+    """
+    inputs = [copy.deepcopy((args, kwargs)) for _ in range(number)]
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for call_args, call_kwargs in inputs:
+            func_timeout(time_limit, function, args=call_args, kwargs=call_kwargs)
+        return (time.perf_counter() - start) / number
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _calls_per_sample(
+    function: Callable, args: tuple, kwargs: dict, time_limit: float
+) -> int:
+    number = 1
+    while True:
+        for multiple in 1, 2, 5:
+            if (
+                _sample(function, args, kwargs, number * multiple, time_limit)
+                * number
+                * multiple
+                >= MIN_SAMPLE_TIME
+            ):
+                return number * multiple
+        number *= 10
+
+
+def compare_on_input(
+    label: str,
+    function_a: Callable,
+    function_b: Callable,
+    args: tuple,
+    kwargs: dict,
+    *,
+    outputs_match: bool,
+    rounds: int = ROUNDS,
+    time_limit: float = FUNCTION_RUNTIME_LIMIT,
+) -> Comparison:
+    """
+    Compare the speed of two functions on one input with interleaved timing.
+
+    :param label: Which input is compared.
+    :param function_a: The baseline function.
+    :param function_b: The function compared against it.
+    :param args: The arguments to pass into the functions.
+    :param kwargs: The keyword arguments to pass in.
+    :param outputs_match: Whether the functions' outputs were correct.
+    :param rounds: The number of pairs of samples (default: 20)
+    :param time_limit: The time limit in seconds for each call (default: 30)
+    :return: The comparison.
+    :raises SolutionError: If either function raises an exception or times out.
+    """
+    functions = {"A": function_a, "B": function_b}
+
+    def timed(solution: str, measure: Callable[..., _T], *measure_args: Any) -> _T:
+        try:
+            return measure(functions[solution], args, kwargs, *measure_args)
+        except Exception as exc:
+            raise SolutionError(solution, label, args, kwargs) from exc
+
+    # Both take the same number of calls per sample, enough for the faster one
+    number = max(
+        timed("A", _calls_per_sample, time_limit),
+        timed("B", _calls_per_sample, time_limit),
+    )
+    samples_a, samples_b = [], []
+    for i in range(rounds):
+        # ABBA order, so a linear drift cancels out over every two rounds
+        order = (("A", samples_a), ("B", samples_b))
+        for solution, samples in order if i % 2 == 0 else reversed(order):
+            samples.append(timed(solution, _sample, number, time_limit))
+
+    log_ratios = [math.log(a / b) for a, b in zip(samples_a, samples_b, strict=True)]
+    return Comparison(
+        label,
+        _median(samples_a),
+        _median(samples_b),
+        math.exp(sum(log_ratios) / len(log_ratios)),
+        wilcoxon_signed_rank(log_ratios),
+        outputs_match,
+    )
+
+
+def _generated_inputs(
+    question_number: int, count: int, size: int, seed: int
+) -> list[tuple]:
+    strategy = STRATEGIES[question_number]
+    inputs = []
+    index = 0
+    # Skip the occasional invalid input, but do not loop forever on a bad size
+    while len(inputs) < count and index < count * 10:
+        args = strategy.example(seed, index, size)
+        if strategy.is_valid(args):
+            inputs.append(args)
+        index += 1
+    return inputs
+
+
+def compare(
+    question: Question,
+    filepath_a: str | os.PathLike,
+    filepath_b: str | os.PathLike,
+    *,
+    rounds: int = ROUNDS,
+    generated: int = 0,
+    generated_size: int = GENERATED_SIZE,
+    seed: int = 0,
+    time_limit: float = FUNCTION_RUNTIME_LIMIT,
+) -> list[Comparison]:
+    """
+    Compare the speed of two solutions to a question.
+
+    :param question: The question both files solve.
+    :param filepath_a: The baseline solution file.
+    :param filepath_b: The solution file compared against it.
+    :param rounds: The number of pairs of samples per input (default: 20)
+    :param generated: The number of generated inputs to also compare on
+        (default: 0)
+    :param generated_size: The size hint of generated inputs (default: 1000)
+    :param seed: The seed of the generated inputs (default: 0)
+    :param time_limit: The time limit in seconds for each call (default: 30)
+    :return: A comparison per test case, then per generated input.
+    :raises SolutionError: If either solution raises an exception or times out.
+    """
+    function_a = Marker._import_module_from_file("solution_a", filepath_a).Solution
+    function_b = Marker._import_module_from_file("solution_b", filepath_b).Solution
+
+    def outputs(label: str, args: tuple, kwargs: dict) -> tuple[Any, Any]:
+        results = []
+        for solution, function in ("A", function_a), ("B", function_b):
+            try:
+                # Copy the input, in case a solution modifies it
+                results.append(
+                    func_timeout(
+                        time_limit,
+                        function,
+                        copy.deepcopy(args),
+                        copy.deepcopy(kwargs),
+                    )
+                )
+            except Exception as exc:
+                raise SolutionError(solution, label, args, kwargs) from exc
+        return tuple(results)
+
+    comparisons = []
+    with Marker.set_recursion_depth(100):
+        for i, test_case in enumerate(question.test_cases, start=1):
+            args, kwargs = test_case.input_args, test_case.input_kwargs
+            output_a, output_b = outputs(f"Test {i}", args, kwargs)
+            outputs_match = Marker._values_match(
+                test_case.expected_output, output_a
+            ) and Marker._values_match(test_case.expected_output, output_b)
+            comparisons.append(
+                compare_on_input(
+                    f"Test {i}",
+                    function_a,
+                    function_b,
+                    args,
+                    kwargs,
+                    outputs_match=outputs_match,
+                    rounds=rounds,
+                    time_limit=time_limit,
+                )
+            )
+
+        for i, args in enumerate(
+            _generated_inputs(
+                question.question_number, generated, generated_size, seed
+            ),
+            start=1,
+        ):
+            output_a, output_b = outputs(f"Generated {i}", args, {})
+            comparisons.append(
+                compare_on_input(
+                    f"Generated {i}",
+                    function_a,
+                    function_b,
+                    args,
+                    {},
+                    outputs_match=Marker._values_match(output_a, output_b),
+                    rounds=rounds,
+                    time_limit=time_limit,
+                )
+            )
+    return comparisons
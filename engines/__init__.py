@@ -0,0 +1,11 @@
+"""
+Reference engines for scaled-up variants of the questions.
+
+The `references` solutions follow each question's signature and are written for
+the size of the marked test cases. The `question_N` modules here solve the same
+questions on inputs many orders of magnitude larger, converting inputs to numpy
+arrays once and answering batches of queries or streams of chunks. Each also has
+a `Solution` with the question's signature, so it can be marked like any other
+solution, and the benchmarks in `benchmarks.engines` check it against the
+reference on large generated inputs.
+"""
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def concatenated_ranges(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """
+    Concatenate ranges of integers without a Python loop.
+
+    :param starts: The first integer of each range.
+    :param stops: The integer after the last of each range.
+    :return: `np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])`
+    """
+    lengths = stops - starts
+    # Each range is offset from the running position of its first element
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(int(lengths.sum()))
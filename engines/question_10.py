@@ -0,0 +1,164 @@
+"""
+Streaming frequent-pair counting for question 10.
+
+`PairCounter` interns item names to integer ids and counts the pairs of each chunk
+of transactions with numpy: the items of each transaction are sorted by name and
+deduplicated, every pair is encoded as one 64-bit integer, and the chunk's counts
+are merged into a sparse table of pair codes by hashing, so only the pairs new to
+the table need sorting. Only the table and the names are kept between chunks, so
+transactions can be streamed from a file.
+
+Pairs with equal counts are ranked by where they first occur, as
+`Counter.most_common` ranks them in the reference.
+"""
+
+from __future__ import annotations
+
+from itertools import chain, islice
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from engines.arrays import concatenated_ranges
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Iterator
+
+CHUNK_SIZE = 100_000
+_ID_BITS = 32
+
+
+class PairCounter:
+    """
+    Counts of the pairs of items bought together, built up chunk by chunk.
+
+    Attributes:
+        transactions: The number of transactions counted.
+    """
+
+    def __init__(self) -> None:
+        self.transactions = 0
+        self._ids: dict[str, int] = {}
+        self._names = np.empty(0, dtype=object)
+        # Pair codes, with their counts and the position they first occur at
+        self._codes = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._first_seen = np.empty(0, dtype=np.int64)
+        self._pairs_seen = 0
+
+    def update(self, transactions: Iterable[list[str]]) -> None:
+        """
+        Count the pairs of a chunk of transactions.
+
+        :param transactions: The transactions, each a list of item names.
+        """
+        transactions = list(transactions)
+        lengths = list(map(len, transactions))
+        self.transactions += len(transactions)
+        # Hash the chunk's names in C, so only its distinct names are interned in
+        # Python
+        local_ids, local_names = pd.factorize(
+            np.fromiter(chain.from_iterable(transactions), dtype=object)
+        )
+        if not len(local_ids):
+            return
+        ids = self._ids
+        items = np.array(
+            [ids.setdefault(name, len(ids)) for name in local_names], dtype=np.int64
+        )[local_ids]
+        if len(self._names) < len(ids):
+            self._names = np.array(list(ids), dtype=object)
+
+        # Sort each transaction's items by name, then drop repeated items
+        ranks = np.empty(len(ids), dtype=np.int64)
+        ranks[np.argsort(self._names)] = np.arange(len(ids))
+        owners = np.repeat(np.arange(len(lengths)), lengths)
+        order = np.argsort(owners * len(ids) + ranks[items])
+        items, owners = items[order], owners[order]
+        unique = np.ones(len(items), dtype=bool)
+        unique[1:] = (items[1:] != items[:-1]) | (owners[1:] != owners[:-1])
+        items, owners = items[unique], owners[unique]
+
+        # Pair each item with every later item of its transaction, in the order
+        # `itertools.combinations` yields them
+        ends = np.searchsorted(owners, owners, side="right")
+        partners = concatenated_ranges(np.arange(len(items)) + 1, ends)
+        firsts = np.repeat(np.arange(len(items)), ends - np.arange(len(items)) - 1)
+        codes = (items[firsts] << _ID_BITS) | items[partners]
+        self._merge(codes)
+
+    def _merge(self, codes: np.ndarray) -> None:
+        # Count the pairs already in the table by hashing, without sorting the chunk
+        slots = pd.Index(self._codes).get_indexer(codes)
+        known = slots >= 0
+        self._counts += np.bincount(slots[known], minlength=len(self._codes))
+
+        # Only the pairs new to the table need sorting, to find their first
+        # occurrences
+        new = np.flatnonzero(~known)
+        new_codes, first_index, new_counts = np.unique(
+            codes[new], return_index=True, return_counts=True
+        )
+        self._codes = np.concatenate([self._codes, new_codes])
+        self._counts = np.concatenate([self._counts, new_counts])
+        self._first_seen = np.concatenate(
+            [self._first_seen, new[first_index] + self._pairs_seen]
+        )
+        self._pairs_seen += len(codes)
+
+    def most_common(self, k: int | None = None) -> list[tuple[tuple[str, str], int]]:
+        """
+        Get the most common pairs, like `Counter.most_common`.
+
+        :param k: The number of pairs (default: all pairs)
+        :return: The pairs, each in alphabetical order, with their counts, most
+            common first and ties in the order the pairs first occur.
+        """
+        order = np.lexsort((self._first_seen, -self._counts))[:k]
+        codes = self._codes[order]
+        firsts = self._names[codes >> _ID_BITS]
+        seconds = self._names[codes & ((1 << _ID_BITS) - 1)]
+        return [
+            ((first, second), int(count))
+            for first, second, count in zip(
+                firsts, seconds, self._counts[order], strict=True
+            )
+        ]
+
+
+def count_pairs(
+    transactions: Iterable[list[str]], *, chunk_size: int = CHUNK_SIZE
+) -> PairCounter:
+    """
+    Count the pairs of a stream of transactions, a chunk at a time.
+
+    :param transactions: The transactions, each a list of item names.
+    :param chunk_size: The number of transactions per chunk (default: 100000)
+    :return: The pair counts.
+    """
+    counter = PairCounter()
+    transactions = iter(transactions)
+    while chunk := list(islice(transactions, chunk_size)):
+        counter.update(chunk)
+    return counter
+
+
+def read_baskets(filepath: str | os.PathLike) -> Iterator[list[str]]:
+    """
+    Stream the transactions of a basket file.
+
+    :param filepath: A file with one transaction per line, its items separated by
+        commas.
+    :return: An iterator of the transactions.
+    """
+    with Path(filepath).open(encoding="utf-8") as file:
+        for line in file:
+            yield line.rstrip("\n").split(",") if line.strip() else []
+
+
+def Solution(transactions: list[list[str]]) -> tuple[str, str]:
+    (pair, _), *_ = count_pairs(transactions).most_common(1)
+    return pair
@@ -0,0 +1,166 @@
+"""
+Chunked one-pass correlation for question 12.
+
+`CorrelationAccumulator` holds the count, means, and sums of squared deviations of
+the values seen so far. Each chunk's statistics are computed with numpy around the
+chunk's own means and merged in with the pairwise update of Chan et al., the
+chunked form of Welford's algorithm, so the inputs are read once and never held
+in memory whole, and the result is as stable as the reference's two-pass
+computation even when the means dwarf the spread. Accumulators of separate parts
+of the data can be merged in any order, e.g. after computing them in parallel
+workers.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from numpy.typing import ArrayLike
+
+CHUNK_SIZE = 1 << 16
+
+
+@dataclass(frozen=True)
+class CorrelationAccumulator:
+    """
+    Dataclass representing the running statistics of pairs of values.
+
+    Attributes:
+        count: The number of pairs.
+        mean_x: The mean of the x values.
+        mean_y: The mean of the y values.
+        sum_squares_x: The sum of squared deviations of the x values from their mean.
+        sum_squares_y: The sum of squared deviations of the y values from their mean.
+        sum_products: The sum of products of the deviations of each pair.
+    """
+
+    count: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    sum_squares_x: float = 0.0
+    sum_squares_y: float = 0.0
+    sum_products: float = 0.0
+
+    @classmethod
+    def of(cls, x: ArrayLike, y: ArrayLike) -> CorrelationAccumulator:
+        """
+        Compute the statistics of a chunk of pairs.
+
+        :param x: The x values of the chunk.
+        :param y: The y values of the chunk, as many as there are x values.
+        :return: The chunk's accumulator.
+        :raises ValueError: If `x` and `y` have different lengths.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) != len(y):
+            msg = f"Chunks of x and y have different lengths ({len(x)} and {len(y)})"
+            raise ValueError(msg)
+        if not len(x):
+            return cls()
+        mean_x, mean_y = x.mean(), y.mean()
+        deviations_x, deviations_y = x - mean_x, y - mean_y
+        return cls(
+            len(x),
+            float(mean_x),
+            float(mean_y),
+            float(deviations_x @ deviations_x),
+            float(deviations_y @ deviations_y),
+            float(deviations_x @ deviations_y),
+        )
+
+    def merge(self, other: CorrelationAccumulator) -> CorrelationAccumulator:
+        """
+        Combine the statistics of two disjoint sets of pairs.
+
+        :param other: The other accumulator.
+        :return: The accumulator of both sets of pairs.
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.count * other.count / count
+        return CorrelationAccumulator(
+            count,
+            self.mean_x + delta_x * other.count / count,
+            self.mean_y + delta_y * other.count / count,
+            self.sum_squares_x + other.sum_squares_x + delta_x * delta_x * weight,
+            self.sum_squares_y + other.sum_squares_y + delta_y * delta_y * weight,
+            self.sum_products + other.sum_products + delta_x * delta_y * weight,
+        )
+
+    def update(self, x: ArrayLike, y: ArrayLike) -> CorrelationAccumulator:
+        """
+        Add a chunk of pairs.
+
+        :param x: The x values of the chunk.
+        :param y: The y values of the chunk.
+        :return: The accumulator including the chunk.
+        """
+        return self.merge(CorrelationAccumulator.of(x, y))
+
+    @property
+    def correlation(self) -> float:
+        """
+        The Pearson correlation of the pairs.
+
+        :raises ZeroDivisionError: If either set of values has no spread, like the
+            reference.
+        """
+        if not self.count:
+            msg = "The correlation of no values is undefined"
+            raise ZeroDivisionError(msg)
+        return self.sum_products / math.sqrt(self.sum_squares_x * self.sum_squares_y)
+
+
+def _chunks(values: Iterable[float], chunk_size: int) -> Iterator[np.ndarray]:
+    # Slice sequences and arrays (including memory-mapped ones) without copying
+    # them whole, and read other iterables a chunk at a time
+    if isinstance(values, np.ndarray | Sequence):
+        for start in range(0, len(values), chunk_size):
+            yield np.asarray(values[start : start + chunk_size], dtype=np.float64)
+        return
+    values = iter(values)
+    while len(chunk := np.fromiter(islice(values, chunk_size), dtype=np.float64)):
+        yield chunk
+
+
+def accumulate(
+    x: Iterable[float], y: Iterable[float], *, chunk_size: int = CHUNK_SIZE
+) -> CorrelationAccumulator | None:
+    """
+    Accumulate the statistics of pairs of values, a chunk at a time.
+
+    :param x: The x values, as an array, a sequence, or any iterable.
+    :param y: The y values, likewise.
+    :param chunk_size: The number of pairs per chunk (default: 65536)
+    :return: The accumulator, or None if `x` and `y` have different lengths.
+    """
+    accumulator = CorrelationAccumulator()
+    chunks_x, chunks_y = _chunks(x, chunk_size), _chunks(y, chunk_size)
+    for chunk_x in chunks_x:
+        chunk_y = next(chunks_y, np.empty(0))
+        if len(chunk_x) != len(chunk_y):
+            return None
+        accumulator = accumulator.update(chunk_x, chunk_y)
+    if next(chunks_y, None) is not None:
+        return None
+    return accumulator
+
+
+def Solution(x: list[float], y: list[float]) -> float | None:
+    accumulator = accumulate(x, y)
+    return None if accumulator is None else accumulator.correlation
@@ -0,0 +1,130 @@
+"""
+Multi-start gradient descent for question 13.
+
+`descend` advances many trajectories, one per pair of starting point and learning
+rate, together as numpy arrays. The gradient function is called once per
+iteration on the positions of every trajectory still moving if, given the starting
+points as an array, it gives the same gradients as it does for each one alone,
+and on each position in turn if it does not. A trajectory stops once an iteration
+moves it by no more than the tolerance. With the default tolerance of zero it only
+stops at a fixed point, where further iterations would not change it, so every
+trajectory ends exactly where the reference's loop would.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from numpy.typing import ArrayLike
+
+
+@dataclass(frozen=True)
+class Descent:
+    """
+    Dataclass representing the outcome of multi-start gradient descent.
+
+    Attributes:
+        x: The final position of each trajectory.
+        iterations: The number of iterations each trajectory took.
+        converged: Whether each trajectory stopped early on converging.
+    """
+
+    x: np.ndarray
+    iterations: np.ndarray
+    converged: np.ndarray
+
+
+def _batched(
+    gradient_func: Callable[[float], float], probe: np.ndarray
+) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Get a version of a gradient function that takes an array of positions.
+
+    :param gradient_func: The gradient function.
+    :param probe: Positions to check the gradient function accepts arrays with.
+    :return: The gradient function itself if it gives the same gradients for the
+        probe as an array as for each of its positions, and otherwise a wrapper
+        calling it per position.
+    """
+    elementwise = np.frompyfunc(gradient_func, 1, 1)
+
+    def per_position(x: np.ndarray) -> np.ndarray:
+        return elementwise(x).astype(np.float64)
+
+    expected = per_position(probe)
+    try:
+        gradients = np.asarray(gradient_func(probe), dtype=np.float64)
+    except Exception:  # noqa: BLE001
+        return per_position
+    # A function that accepts an array but combines its elements (e.g. `sum(x)` or
+    # `x - x.mean()`) gives the wrong shape or different gradients
+    if gradients.shape == probe.shape and np.array_equal(
+        gradients, expected, equal_nan=True
+    ):
+        return gradient_func
+    return per_position
+
+
+def descend(
+    gradient_func: Callable[[float], float],
+    x_0: ArrayLike,
+    lr: ArrayLike,
+    n_iters: int,
+    *,
+    tolerance: float = 0.0,
+) -> Descent:
+    """
+    Run gradient descent from many starting points and learning rates at once.
+
+    :param gradient_func: The gradient of the function to minimize, taking a float
+        or, ideally, an array of floats.
+    :param x_0: The starting points, broadcast against `lr`.
+    :param lr: The learning rates, broadcast against `x_0`.
+    :param n_iters: The maximum number of iterations.
+    :param tolerance: A trajectory stops once an iteration moves it by no more than
+        this (default: 0.0)
+    :return: The final positions, iterations taken, and convergence of every
+        trajectory, in the broadcast shape of `x_0` and `lr`.
+    """
+    x_0, lr = np.broadcast_arrays(
+        np.asarray(x_0, dtype=np.float64), np.asarray(lr, dtype=np.float64)
+    )
+    shape = x_0.shape
+    x = x_0.flatten()
+    lr = lr.flatten()
+    iterations = np.zeros(len(x), dtype=np.int64)
+    converged = np.zeros(len(x), dtype=bool)
+    gradient = _batched(gradient_func, x) if len(x) and n_iters > 0 else None
+
+    # Positions of the trajectories still moving
+    active = np.arange(len(x))
+    for _ in range(n_iters):
+        if not len(active):
+            break
+        current = x[active]
+        updated = current - lr[active] * gradient(current)
+        x[active] = updated
+        iterations[active] += 1
+        # NaN never compares as converged, like a trajectory that diverged
+        done = np.abs(updated - current) <= tolerance
+        converged[active[done]] = True
+        active = active[~done]
+
+    return Descent(
+        x.reshape(shape), iterations.reshape(shape), converged.reshape(shape)
+    )
+
+
+def Solution(
+    gradient_func: Callable[[float], float],
+    x_0: float,
+    lr: float,
+    n_iters: int,
+) -> float:
+    return float(descend(gradient_func, x_0, lr, n_iters).x)
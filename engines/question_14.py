@@ -0,0 +1,205 @@
+"""
+Least-squares regression with an intercept for question 14.
+
+`least_squares` converts the inputs to a contiguous float64 design matrix once and
+solves it by QR decomposition, which avoids squaring the condition number as the
+normal equations do, falling back to `np.linalg.lstsq` for rank-deficient designs.
+
+`NormalEquations` instead accumulates XᵀX and Xᵀy over chunks of rows, so data
+bigger than memory can be streamed from memory-mapped arrays. Sums are taken
+around a shift, the means of the first chunk, which keeps the intercept column from
+dominating them and the system well conditioned. Accumulators of separate parts of
+the data can be merged, e.g. after computing them in parallel workers.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from numpy.typing import ArrayLike
+
+    colvector = list[float]
+    matrix = list[list[float]]
+
+CHUNK_SIZE = 1 << 16
+
+
+def _augmented(X: ArrayLike, y: ArrayLike) -> np.ndarray:
+    """
+    Get the matrix `[1, X, y]`, with an intercept column and the targets last.
+
+    It is built once, as float64 in column-major order, the order LAPACK works in,
+    so numpy does not copy it again.
+
+    :raises ValueError: If `X` and `y` have different numbers of rows.
+    """
+    # A 1-D X is a single feature
+    X = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+    y = np.asarray(y, dtype=np.float64)
+    if len(X) != len(y):
+        msg = f"X and y have different numbers of rows ({len(X)} and {len(y)})"
+        raise ValueError(msg)
+    augmented = np.empty((len(X), X.shape[1] + 2), order="F")
+    augmented[:, 0] = 1
+    augmented[:, 1:-1] = X
+    augmented[:, -1] = y
+    return augmented
+
+
+def least_squares(X: ArrayLike, y: ArrayLike) -> np.ndarray:
+    """
+    Fit a linear regression with an intercept by least squares.
+
+    :param X: The features, as an array of shape (n, p) or a list of rows.
+    :param y: The targets.
+    :return: The intercept followed by the coefficient of each feature.
+    :raises ValueError: If `X` and `y` have different numbers of rows.
+    """
+    augmented = _augmented(X, y)
+    design, y = augmented[:, :-1], augmented[:, -1]
+    if len(design) <= design.shape[1]:
+        # Without a row to spare, the R factor of `[design, y]` has no row for the
+        # residual, and is not square
+        return np.linalg.lstsq(design, y, rcond=None)[0]
+    # The R factor of `[design, y]` holds the R factor of the design and, in its
+    # last column, Qᵀy, so Q itself is never formed
+    r = np.linalg.qr(augmented, mode="r")
+    diagonal = np.abs(np.diag(r)[:-1])
+    if diagonal.min() <= diagonal.max() * len(design) * np.finfo(np.float64).eps:
+        return np.linalg.lstsq(design, y, rcond=None)[0]
+    return np.linalg.solve(r[:-1, :-1], r[:-1, -1])
+
+
+@dataclass(frozen=True)
+class NormalEquations:
+    """
+    Dataclass representing accumulated normal equations of a linear regression.
+
+    Attributes:
+        shift: The values subtracted from the features and the target, the
+            target's last.
+        gram: The sums of products of every pair of `[1, *(x - shift[:-1]),
+            y - shift[-1]]` over the rows, so `gram[0, 0]` is the number of rows.
+    """
+
+    shift: np.ndarray
+    gram: np.ndarray
+
+    @classmethod
+    def of(cls, X: ArrayLike, y: ArrayLike) -> NormalEquations:
+        """
+        Accumulate a chunk of rows, shifted by their means.
+
+        :param X: The features of the chunk, as an array of shape (n, p).
+        :param y: The targets of the chunk.
+        :return: The chunk's normal equations.
+        :raises ValueError: If `X` and `y` have different numbers of rows.
+        """
+        augmented = _augmented(X, y)
+        shift = augmented[:, 1:].mean(axis=0)
+        augmented[:, 1:] -= shift
+        return cls(shift, augmented.T @ augmented)
+
+    def shifted(self, shift: np.ndarray) -> NormalEquations:
+        """
+        Get the same normal equations taken around another shift.
+
+        :param shift: The new shift.
+        :return: The equivalent normal equations.
+        """
+        # Each shifted row is `transform @ row`, so the sums of products transform
+        # by congruence
+        transform = np.eye(len(self.gram))
+        transform[1:, 0] = self.shift - shift
+        return NormalEquations(shift, transform @ self.gram @ transform.T)
+
+    def merge(self, other: NormalEquations) -> NormalEquations:
+        """
+        Combine the normal equations of two disjoint sets of rows.
+
+        :param other: The other normal equations.
+        :return: The normal equations of both sets of rows, around this shift.
+        """
+        if not other.gram[0, 0]:
+            return self
+        if not self.gram[0, 0]:
+            return other
+        return NormalEquations(self.shift, self.gram + other.shifted(self.shift).gram)
+
+    def update(self, X: ArrayLike, y: ArrayLike) -> NormalEquations:
+        """
+        Add a chunk of rows.
+
+        :param X: The features of the chunk, as an array of shape (n, p).
+        :param y: The targets of the chunk.
+        :return: The normal equations including the chunk.
+        """
+        return self.merge(NormalEquations.of(X, y))
+
+    def solve(self) -> np.ndarray:
+        """
+        Solve the normal equations.
+
+        :return: The intercept followed by the coefficient of each feature.
+        """
+        xtx = self.gram[:-1, :-1]
+        xty = self.gram[:-1, -1]
+        coefficients = np.linalg.lstsq(xtx, xty, rcond=None)[0]
+        # Undo the shift, which only moves the intercept
+        coefficients[0] += self.shift[-1] - coefficients[1:] @ self.shift[:-1]
+        return coefficients
+
+
+def _chunks(values: Iterable, chunk_size: int) -> Iterator[np.ndarray]:
+    # Slice sequences and arrays (including memory-mapped ones) without copying
+    # them whole, and read other iterables a chunk at a time
+    if isinstance(values, np.ndarray | Sequence):
+        for start in range(0, len(values), chunk_size):
+            yield np.asarray(values[start : start + chunk_size], dtype=np.float64)
+        return
+    values = iter(values)
+    while chunk := list(islice(values, chunk_size)):
+        yield np.asarray(chunk, dtype=np.float64)
+
+
+def accumulate(
+    X: Iterable,
+    y: Iterable[float],
+    *,
+    chunk_size: int = CHUNK_SIZE,
+) -> NormalEquations:
+    """
+    Accumulate the normal equations of a regression, a chunk of rows at a time.
+
+    :param X: The features, as an array of shape (n, p), a sequence of rows, or any
+        iterable of rows.
+    :param y: The targets, as an array, a sequence, or any iterable.
+    :param chunk_size: The number of rows per chunk (default: 65536)
+    :return: The normal equations.
+    :raises ValueError: If `X` and `y` have different numbers of rows, or there
+        are none.
+    """
+    chunks_y = _chunks(y, chunk_size)
+    equations = None
+    for chunk_x in _chunks(X, chunk_size):
+        chunk = NormalEquations.of(chunk_x, next(chunks_y, np.empty(0)))
+        equations = chunk if equations is None else equations.merge(chunk)
+    if next(chunks_y, None) is not None:
+        msg = "X has fewer rows than y"
+        raise ValueError(msg)
+    if equations is None:
+        msg = "A regression needs at least one row"
+        raise ValueError(msg)
+    return equations
+
+
+def Solution(X: matrix, y: colvector) -> colvector:
+    return least_squares(X, y).tolist()
@@ -0,0 +1,49 @@
+"""
+Bulk hours between 12-hour times for question 6.
+
+`hours_between` takes arrays of start and end times. Every time is one of a few
+dozen distinct strings, so the times are factorized by hashing in C and only the
+distinct strings are parsed, with pandas string operations, before their hours are
+gathered for every time.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+
+def to_24_hour(times: ArrayLike) -> np.ndarray:
+    """
+    Convert 12-hour times like "3:00 PM" to hours of the day.
+
+    :param times: The times.
+    :return: The hour of the day, from 0 to 23, of each time.
+    :raises ValueError: If a time is malformed.
+    """
+    codes, distinct = pd.factorize(np.asarray(times, dtype=object).ravel())
+    distinct = pd.Series(distinct, dtype=object)
+    hours = distinct.str.split(":", n=1).str[0].astype(np.int64) % 12
+    hours += np.where(distinct.str.split().str[-1] == "PM", 12, 0)
+    return hours.to_numpy()[codes].reshape(np.shape(times))
+
+
+def hours_between(start: ArrayLike, end: ArrayLike) -> np.ndarray:
+    """
+    Get the number of hours between pairs of 12-hour times.
+
+    :param start: The start times.
+    :param end: The end times, as many as there are start times.
+    :return: The hours from each start time to its end time.
+    :raises ValueError: If a time is malformed.
+    """
+    return to_24_hour(end) - to_24_hour(start)
+
+
+def Solution(start: str, end: str) -> int:
+    return int(hours_between([start], [end])[0])
@@ -0,0 +1,51 @@
+"""
+Bulk digit reversal for question 9.
+
+`reverse_digits` reverses the digits of a whole array of integers with numpy
+arithmetic, a digit per pass over the array, and masks to zero the inputs and
+results outside the signed 32-bit range as the reference does.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+INT32_MIN = -(2**31)
+INT32_MAX = 2**31 - 1
+# The most digits of a 32-bit integer
+MAX_DIGITS = 10
+
+
+def reverse_digits(x: ArrayLike) -> np.ndarray:
+    """
+    Reverse the digits of integers, keeping their signs.
+
+    :param x: The integers, of any size.
+    :return: The reversed integers, or 0 where an integer or its reversal does not
+        fit in a signed 32-bit integer.
+    """
+    x = np.asarray(x)
+    # Compare before converting, so integers too big for int64 are masked too
+    in_range = (x >= INT32_MIN) & (x <= INT32_MAX)
+    x = np.where(in_range, x, 0).astype(np.int64)
+
+    remaining = np.abs(x)
+    reversed_x = np.zeros_like(remaining)
+    for _ in range(MAX_DIGITS):
+        # Integers with fewer digits are finished, and must not be shifted again
+        unfinished = remaining > 0
+        remaining, digits = np.divmod(remaining, 10)
+        reversed_x = np.where(unfinished, reversed_x * 10 + digits, reversed_x)
+    reversed_x *= np.sign(x)
+    return np.where(
+        (reversed_x >= INT32_MIN) & (reversed_x <= INT32_MAX), reversed_x, 0
+    )
+
+
+def Solution(x: int) -> int:
+    return int(reverse_digits(x))
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import KW_ONLY, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from func_timeout import FunctionTimedOut, func_timeout
+from marker import Marker
+from strategies import STRATEGIES
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from strategies import Strategy
+
+REFERENCE_FOLDER = "references"
+FUZZ_CALL_TIME_LIMIT = 2
+MAX_SHRINK_ATTEMPTS = 500
+CHUNK_SIZE = 250
+
+# Solution functions loaded once per worker process by `_init_worker`
+_worker_functions: tuple[Callable, Callable] | None = None
+
+
+def reference_path(question_number: int) -> Path:
+    """
+    Get the path of the reference solution for a question.
+
+    :param question_number: The question number.
+    :return: The path to the reference solution file.
+    """
+    return Path(REFERENCE_FOLDER) / f"question_{question_number}.py"
+
+
+@dataclass
+class Counterexample:
+    """
+    Dataclass representing an input on which a submission disagrees with the
+    reference solution.
+
+    Attributes:
+        index: The index of the generated input within the run.
+        input_args: The generated input.
+        shrunk_args: The simplest input found that still disagrees.
+        expected_output: The reference output on `shrunk_args`.
+        output: The submission's output (or exception) on `shrunk_args`.
+    """
+
+    index: int
+    input_args: tuple
+    _: KW_ONLY
+    shrunk_args: tuple
+    expected_output: Any
+    output: Any
+
+
+@dataclass
+class FuzzReport:
+    """
+    Dataclass representing the outcome of differential fuzzing.
+
+    Attributes:
+        question_number: The question that was fuzzed.
+        seed: The seed the inputs were generated from.
+        cases_run: The number of generated inputs that were run.
+        failing_indices: The indices of every input that disagreed.
+        counterexamples: Shrunk counterexamples for the first failing inputs.
+        timed_out_index: The index of the input the submission first timed out on,
+            after which no more inputs were run, or None if it never timed out.
+    """
+
+    question_number: int
+    seed: int
+    cases_run: int
+    failing_indices: list[int] = field(default_factory=list)
+    counterexamples: list[Counterexample] = field(default_factory=list)
+    timed_out_index: int | None = None
+
+    @property
+    def passed(self) -> bool:
+        return not self.failing_indices
+
+
+def _call(function: Callable, args: tuple, time_limit: float) -> tuple[bool, Any]:
+    """
+    Call a function, capturing any exception as its output.
+
+    :return: A 2-tuple of whether the call raised and the output or exception.
+    """
+    try:
+        return False, func_timeout(time_limit, function, args=copy.deepcopy(args))
+    except Exception as exc:  # noqa: BLE001
+        return True, exc
+
+
+def _disagrees(
+    submission: Callable, reference: Callable, args: tuple, time_limit: float
+) -> tuple[bool, Any, Any]:
+    """
+    Run the submission and reference on one input and compare their outputs.
+
+    :return: A 3-tuple of whether they disagree, the reference output, and the
+        submission output.
+    """
+    reference_raised, expected = _call(reference, args, time_limit)
+    if reference_raised:
+        msg = f"Reference solution raised on input {args!r}"
+        raise RuntimeError(msg) from expected
+    raised, output = _call(submission, args, time_limit)
+    return raised or not Marker._values_match(expected, output), expected, output
+
+
+def _load_functions(
+    question_number: int, filepath: str | os.PathLike
+) -> tuple[Callable, Callable]:
+    submission = Marker._import_module_from_file("solution", filepath)
+    reference = Marker._import_module_from_file(
+        "reference", reference_path(question_number)
+    )
+    return submission.Solution, reference.Solution
+
+
+def _init_worker(question_number: int, filepath: str | os.PathLike) -> None:
+    global _worker_functions
+    _worker_functions = _load_functions(question_number, filepath)
+
+
+def _run_chunk(
+    question_number: int, seed: int, start: int, stop: int, time_limit: float
+) -> tuple[list[int], int | None]:
+    """
+    Run the inputs with indices in `[start, stop)` in a worker process.
+
+    Inputs are regenerated from the seed in the worker rather than pickled across.
+    The chunk stops at the first input the submission times out on, since a
+    submission that hangs on one input often hangs on every input.
+
+    :return: A 2-tuple of the indices of the inputs that disagreed, and the index
+        of the input the submission timed out on, or None.
+    """
+    submission, reference = _worker_functions
+    strategy = STRATEGIES[question_number]
+    failing_indices = []
+    with Marker.set_recursion_depth(100):
+        for index in range(start, stop):
+            disagrees, _, output = _disagrees(
+                submission, reference, strategy.example(seed, index), time_limit
+            )
+            if disagrees:
+                failing_indices.append(index)
+            if isinstance(output, FunctionTimedOut):
+                return failing_indices, index
+    return failing_indices, None
+
+
+def _shrink(
+    strategy: Strategy,
+    submission: Callable,
+    reference: Callable,
+    args: tuple,
+    time_limit: float,
+) -> tuple[tuple, Any, Any]:
+    """
+    Greedily shrink a failing input while it keeps failing.
+
+    Shrinking stops at the first call that times out.
+
+    :return: A 3-tuple of the shrunk input, the reference output, and the
+        submission output.
+    """
+    _, expected, output = _disagrees(submission, reference, args, time_limit)
+    if isinstance(output, FunctionTimedOut):
+        return args, expected, output
+    attempts = 0
+    shrunk = True
+    while shrunk and attempts < MAX_SHRINK_ATTEMPTS:
+        shrunk = False
+        for candidate in strategy.shrink(args):
+            attempts += 1
+            if attempts >= MAX_SHRINK_ATTEMPTS:
+                break
+            if not strategy.is_valid(candidate):
+                continue
+            disagrees, candidate_expected, candidate_output = _disagrees(
+                submission, reference, candidate, time_limit
+            )
+            if isinstance(candidate_output, FunctionTimedOut):
+                return args, expected, output
+            if disagrees:
+                args, expected, output = candidate, candidate_expected, candidate_output
+                shrunk = True
+                break
+    return args, expected, output
+
+
+def fuzz(
+    question_number: int,
+    filepath: str | os.PathLike,
+    *,
+    cases: int = 1000,
+    seed: int = 0,
+    workers: int | None = None,
+    max_counterexamples: int = 3,
+    time_limit: float = FUZZ_CALL_TIME_LIMIT,
+) -> FuzzReport:
+    """
+    Differentially test a submission against the reference solution.
+
+    Random inputs are generated from the question's seeded strategy, and the
+    submission and reference are run on each of them in parallel worker processes.
+    Outputs are compared with `Marker._values_match` and the first failing inputs
+    are shrunk to simpler counterexamples.
+
+    Fuzzing stops at the first input the submission times out on, so a submission
+    that hangs costs at most a time limit per worker rather than one per input.
+    Only the chunks of inputs up to the one with the first timeout count, so the
+    report does not depend on the number of workers.
+
+    :param question_number: The question to fuzz.
+    :param filepath: The code file that contains the solution to the question.
+    :param cases: The number of inputs to generate (default: 1000)
+    :param seed: The seed to generate inputs from (default: 0)
+    :param workers: The number of worker processes, or 1 to run in this process
+        (default: the number of CPUs)
+    :param max_counterexamples: The number of failing inputs to shrink (default: 3)
+    :param time_limit: The time limit in seconds for each call (default: 2)
+    :return: The fuzzing report.
+    """
+    strategy = STRATEGIES[question_number]
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        (question_number, seed, start, min(start + CHUNK_SIZE, cases), time_limit)
+        for start in range(0, cases, CHUNK_SIZE)
+    ]
+
+    report = FuzzReport(question_number, seed, 0)
+
+    def collect(outcomes: Iterable[tuple[list[int], int | None]]) -> None:
+        for (failing_indices, timed_out_index), (_, _, start, stop, _) in zip(
+            outcomes, chunks, strict=False
+        ):
+            report.failing_indices.extend(failing_indices)
+            if timed_out_index is not None:
+                report.cases_run += timed_out_index + 1 - start
+                report.timed_out_index = timed_out_index
+                return
+            report.cases_run += stop - start
+
+    if workers == 1:
+        _init_worker(question_number, filepath)
+        collect(_run_chunk(*chunk) for chunk in chunks)
+    else:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(question_number, filepath)
+        ) as executor:
+            futures = [executor.submit(_run_chunk, *chunk) for chunk in chunks]
+            collect(future.result() for future in futures)
+            # After a timeout the remaining chunks are not needed
+            executor.shutdown(cancel_futures=True)
+
+    submission, reference = _load_functions(question_number, filepath)
+    with Marker.set_recursion_depth(100):
+        for index in report.failing_indices[:max_counterexamples]:
+            input_args = strategy.example(seed, index)
+            shrunk_args, expected, output = _shrink(
+                strategy, submission, reference, input_args, time_limit
+            )
+            report.counterexamples.append(
+                Counterexample(
+                    index,
+                    input_args,
+                    shrunk_args=shrunk_args,
+                    expected_output=expected,
+                    output=output,
+                )
+            )
+    return report
+
+
+def main(arguments: list[str] | None = None) -> int:
+    from test_solution import find_solution_file, green_print, red_print
+
+    # argparser
+    parser = argparse.ArgumentParser()
+    parser.add_argument("question", type=int, help="The question to fuzz")
+    parser.add_argument(
+        "filepath", nargs="?", help="The solution file (default: found in solutions)"
+    )
+    parser.add_argument("--cases", type=int, default=1000, help="Inputs to generate")
+    parser.add_argument("--seed", type=int, default=0, help="The random seed")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args(arguments)
+
+    filepath = args.filepath or find_solution_file(args.question)
+    report = fuzz(
+        args.question, filepath, cases=args.cases, seed=args.seed, workers=args.workers
+    )
+
+    if report.passed:
+        green_print(f"All {report.cases_run} generated inputs matched the reference")
+        return 0
+
+    red_print(
+        f"{len(report.failing_indices)} of {report.cases_run} generated inputs "
+        f"disagreed with the reference (seed {report.seed})"
+    )
+    if report.timed_out_index is not None:
+        print(f"Stopped after input #{report.timed_out_index} timed out")
+    for counterexample in report.counterexamples:
+        print(f"\nInput #{counterexample.index}: {counterexample.input_args!r}")
+        print(f"Shrunk input: {counterexample.shrunk_args!r}")
+        print(f"Expected output: {counterexample.expected_output!r}")
+        print(f"Received output: {counterexample.output!r}")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    from types import TracebackType
+    from typing import Self
+
+    from marker import Results
+
+JOURNAL = ".batch_journal"
+
+# Records are the pickle of a (key, results) pair prefixed by its length
+_RECORD_HEADER = struct.Struct(">I")
+
+JobKey = tuple[str, int, str]
+
+
+class Journal:
+    """
+    Append-only journal of the results of completed marking jobs.
+
+    Each record is flushed and fsynced as soon as it is written, so the results of
+    every job that finished before a crash survive it. Opening an existing journal
+    loads its records into `completed`, keyed by (team, question number, source
+    hash), so a restarted batch can skip those jobs. A record torn by a crash
+    mid-write is dropped.
+    """
+
+    def __init__(self, path: str | os.PathLike = JOURNAL) -> None:
+        self.path = Path(path)
+        self.completed: dict[JobKey, Results] = {}
+        self._lock = threading.Lock()
+        self._file = self._recover()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _recover(self) -> BinaryIO:
+        """Open the journal, loading its complete records and dropping the rest."""
+        file = self.path.open("a+b")
+        file.seek(0)
+        data = file.read()
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            (length,) = _RECORD_HEADER.unpack_from(data, offset)
+            end = offset + _RECORD_HEADER.size + length
+            if end > len(data):
+                break
+            try:
+                key, results = pickle.loads(data[offset + _RECORD_HEADER.size : end])
+            except Exception:  # noqa: BLE001
+                break
+            self.completed[key] = results
+            offset = end
+        if offset < len(data):
+            file.truncate(offset)
+        return file
+
+    def record(self, key: JobKey, results: Results) -> None:
+        """
+        Durably record the results of a job.
+
+        Safe to call from several threads.
+
+        :param key: The team, question number, and source hash of the job.
+        :param results: The job's results.
+        """
+        payload = pickle.dumps((key, results))
+        with self._lock:
+            self._file.write(_RECORD_HEADER.pack(len(payload)) + payload)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.completed[key] = results
+
+    def close(self) -> None:
+        self._file.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal, once the batch it records is complete."""
+        self.close()
+        self.path.unlink(missing_ok=True)
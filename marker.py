@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import ast
 import contextlib
+import cProfile
+import functools
+import gc
 import importlib
 import inspect
 import sys
+import time
 import timeit
-from dataclasses import KW_ONLY, dataclass
+from dataclasses import KW_ONLY, dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -14,16 +18,38 @@ from typing import TYPE_CHECKING, Any
 import numpy as np
 import pandas as pd
 
-from func_timeout import func_timeout
+from bytecode_cache import BytecodeCache, CachedSourceLoader
+from func_timeout import FunctionTimedOut, func_timeout
+from output_capture import OUTPUT_LIMIT, RingBuffer, redirect_output
+from phases import (
+    AUTORANGE,
+    BONUS_ANALYSIS,
+    COMPARE,
+    FIRST_CALL,
+    IMPORT,
+    RECURSION_LIMIT,
+    TEARDOWN,
+    PhaseTimer,
+)
+from profiling import Profiler, SamplingProfiler, summarize_stacks, write_profile
+from timing_lane import MIN_CPU_SHARE
 
 if TYPE_CHECKING:
     import os
     from collections.abc import Callable, Generator
 
     from question import BonusConditions, Question, TestCase
+    from timing_lane import TimingLane
 
 FUNCTION_RUNTIME_LIMIT = 30
 FLOAT_DIFF_TOLERANCE = 1e-5
+# Timed calls are repeated until they take at least this many seconds in total
+MIN_TIMING_TIME = 0.2
+# The number of calls on freshly loaded modules that cold runtimes are the best of
+COLD_REPEATS = 5
+# Seconds between samples of the stack of a call that may time out. This is at
+# least the default switch interval, so sampling does not change it.
+TIMEOUT_SAMPLING_INTERVAL = 0.1
 
 
 class Result(Enum):
@@ -66,6 +92,17 @@ class TestCaseOutput:
         message: Output message.
         runtime: The runtime of the test case.
         exception: Boolean flag for if an exception was raised.
+        profile: Path of the saved profile of the timed calls, without the
+            `.pstats` or `.collapsed` suffix (empty if not profiled).
+        stdout: The tail of what the solution printed to standard output.
+        stderr: The tail of what the solution printed to standard error.
+        noisy: Whether the process was kept off the CPU for much of the timing,
+            so the runtime is unreliable (only checked if the marker checks noise).
+        cold_runtime: The runtime of a call on a freshly loaded module, which
+            cannot reuse anything cached by earlier calls (only measured if the
+            marker uses fair timing).
+        hot_frames: Where a call that timed out spent its time, from stack
+            samples taken while it ran (empty if it did not time out).
     """
 
     result: Result
@@ -74,6 +111,12 @@ class TestCaseOutput:
     message: Any = ""
     runtime: float | str = ""
     exception: bool = False
+    profile: str = ""
+    stdout: str = ""
+    stderr: str = ""
+    noisy: bool = False
+    cold_runtime: float | str = ""
+    hot_frames: str = ""
 
 
 @dataclass
@@ -86,17 +129,89 @@ class Results:
         bonus_results: Whether any bonus conditions were met.
         points: The number of points scored.
         runtime: The total runtime if all test cases passed and zero otherwise.
+        phases: The wall-clock nanoseconds the marker spent in each phase of
+            marking, keyed by the phase names in `phases`.
+        speed_factor: The speed of the machine that marked the submission relative
+            to the reference machine, from `calibration.calibrate`.
+        cold_runtime: The total cold runtime if all test cases passed and fair
+            timing was used, and zero otherwise.
     """
 
     test_case_results: list[TestCaseOutput]
     bonus_result: BonusResult
     points: float
     runtime: float
+    _: KW_ONLY
+    phases: dict[str, int] = field(default_factory=dict)
+    speed_factor: float = 1.0
+    cold_runtime: float = 0
+
+    @property
+    def normalized_runtime(self) -> float:
+        """The runtime scaled to the reference machine."""
+        return self.runtime / self.speed_factor
 
 
 class Marker:
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self,
+        *,
+        profile_dir: str | os.PathLike | None = None,
+        profiler: Profiler | str = Profiler.SAMPLING,
+        bytecode_cache_dir: str | os.PathLike | None = None,
+        output_limit: int = OUTPUT_LIMIT,
+        discard_timed_output: bool = False,
+        min_timing_time: float = MIN_TIMING_TIME,
+        timing_repeats: int = 1,
+        timing_lane: TimingLane | None = None,
+        check_noise: bool = False,
+        speed_factor: float = 1.0,
+        fair_timing: bool = False,
+        sample_timeouts: bool = True,
+    ) -> None:
+        """
+        Create a marker.
+
+        :param profile_dir: If given, the folder to save a profile of the timed calls
+            of every passing test case to (default: None)
+        :param profiler: The profiler to use when `profile_dir` is given
+            (default: Profiler.SAMPLING)
+        :param bytecode_cache_dir: If given, the folder of a bytecode cache shared by
+            all markers, so unchanged submissions are not recompiled (default: None)
+        :param output_limit: The number of trailing characters of the solution's
+            standard output and error kept per test case (default: 2000)
+        :param discard_timed_output: Discard output during timed calls instead of
+            keeping its tail (default: False)
+        :param min_timing_time: The minimum total seconds of calls each runtime is
+            measured over (default: 0.2)
+        :param timing_repeats: The number of times to repeat the measurement, keeping
+            the fastest (default: 1)
+        :param timing_lane: If given, the reserved CPUs to time calls on
+            (default: None)
+        :param check_noise: Flag runtimes measured while the process was kept off
+            the CPU, by comparing them with the process time (default: False)
+        :param speed_factor: The speed of this machine relative to the reference
+            machine, recorded in results to normalize their runtimes (default: 1)
+        :param fair_timing: Also time cold calls, each on a freshly loaded copy of the
+            solution's module, so submissions that cache results between calls (e.g.
+            with `functools.lru_cache`) cannot time as a lookup (default: False)
+        :param sample_timeouts: Sample the stack of each first call, to report
+            where calls that time out were spinning (default: True)
+        """
+        self.profile_dir = None if profile_dir is None else Path(profile_dir)
+        self.profiler = Profiler(profiler)
+        self.bytecode_cache = (
+            None if bytecode_cache_dir is None else BytecodeCache(bytecode_cache_dir)
+        )
+        self.output_limit = output_limit
+        self.discard_timed_output = discard_timed_output
+        self.min_timing_time = min_timing_time
+        self.timing_repeats = timing_repeats
+        self.timing_lane = timing_lane
+        self.check_noise = check_noise
+        self.speed_factor = speed_factor
+        self.fair_timing = fair_timing
+        self.sample_timeouts = sample_timeouts
 
     @staticmethod
     def _values_match(expected: Any, actual: Any) -> bool:  # noqa: ANN401, C901, PLR0911
@@ -281,14 +396,26 @@ class Marker:
         return True
 
     @staticmethod
-    def _import_module_from_file(name: str, filepath: str | os.PathLike) -> None:
+    def _import_module_from_file(
+        name: str,
+        filepath: str | os.PathLike,
+        *,
+        bytecode_cache: BytecodeCache | None = None,
+    ) -> None:
         """
         Import a file as a module.
 
         :param name: Name of the module to import as.
         :param filepath: Path to the file.
+        :param bytecode_cache: If given, the cache to load the compiled module from
+            (default: None)
         """
-        spec = importlib.util.spec_from_file_location(name, filepath)
+        loader = (
+            None
+            if bytecode_cache is None
+            else CachedSourceLoader(name, str(filepath), bytecode_cache)
+        )
+        spec = importlib.util.spec_from_file_location(name, filepath, loader=loader)
         spec.loader = importlib.util.LazyLoader(spec.loader)
         module = importlib.util.module_from_spec(spec)
         # NOTE: the use of LazyLoader means any syntax error will not be raised until
@@ -296,12 +423,144 @@ class Marker:
         spec.loader.exec_module(module)
         return module
 
+    @staticmethod
+    def _profiled(
+        function: Callable, profiler: cProfile.Profile | SamplingProfiler
+    ) -> Callable:
+        """
+        Wrap a function so every call is profiled on the thread it runs on.
+
+        :param function: The function to profile.
+        :param profiler: The profiler to enable around each call.
+        :return: The wrapped function.
+        """
+
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            profiler.enable()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.disable()
+
+        return profiled
+
+    @staticmethod
+    def _autorange(timer: timeit.Timer, min_time: float) -> tuple[int, float]:
+        """
+        Find how many calls it takes to run for at least some time.
+
+        Like `timeit.Timer.autorange`, which always uses 0.2 seconds, the number of
+        calls goes up in the sequence 1, 2, 5, 10, 20, 50, ...
+
+        :param timer: The timer of the calls.
+        :param min_time: The minimum total time in seconds.
+        :return: A 2-tuple of the number of calls and the time they took.
+        """
+        i = 1
+        while True:
+            for j in 1, 2, 5:
+                number = i * j
+                timing = timer.timeit(number)
+                if timing >= min_time:
+                    return number, timing
+            i *= 10
+
+    def _time(
+        self,
+        function: Callable,
+        args: tuple,
+        kwargs: dict,
+        *,
+        time_limit: float = FUNCTION_RUNTIME_LIMIT,
+        profile_path: Path | None = None,
+    ) -> tuple[float, str, bool]:
+        """
+        Time a function, optionally profiling the timed calls.
+
+        :param function: The function to time.
+        :param args: The arguments to pass into the function.
+        :param kwargs: The keyword arguments to pass in.
+        :param time_limit: The time limit in seconds for each call (default: 30)
+        :param profile_path: If given, where to save the profile (default: None)
+        :return: A 3-tuple of the mean runtime of a call in seconds, the path the
+            profile was saved to (empty if no profile was saved), and whether the
+            measurement was noisy.
+        """
+        if profile_path is None:
+            timer = timeit.Timer(
+                lambda: func_timeout(time_limit, function, args=args, kwargs=kwargs)
+            )
+            start_cpu = time.process_time()
+            start = time.perf_counter()
+            number, timing = self._autorange(timer, self.min_timing_time)
+            timings = [timing, *timer.repeat(self.timing_repeats - 1, number)]
+            cpu_time = time.process_time() - start_cpu
+            cpu_share = cpu_time / (time.perf_counter() - start)
+            noisy = self.check_noise and cpu_share < MIN_CPU_SHARE
+            return min(timings) / number, "", noisy
+
+        if self.profiler == Profiler.CPROFILE:
+            profiler = cProfile.Profile()
+        else:
+            profiler = SamplingProfiler()
+            profiler.start()
+        try:
+            runtime, _, noisy = self._time(
+                self._profiled(function, profiler),
+                args,
+                kwargs,
+                time_limit=time_limit,
+            )
+        finally:
+            if isinstance(profiler, SamplingProfiler):
+                profiler.stop()
+        saved = write_profile(profiler, profile_path)
+        return runtime, str(profile_path) if saved else "", noisy
+
+    @staticmethod
+    def _time_cold(
+        load_function: Callable[[], Callable],
+        args: tuple,
+        kwargs: dict,
+        *,
+        time_limit: float = FUNCTION_RUNTIME_LIMIT,
+    ) -> float:
+        """
+        Time calls of a function that has never been called before.
+
+        Every call is on a newly loaded copy of the function, so nothing it cached
+        at module level or in decorators during earlier calls is reused. Loading is
+        not timed. Like `timeit`, the garbage collector is off during the calls.
+
+        :param load_function: Loads a fresh copy of the function.
+        :param args: The arguments to pass into the function.
+        :param kwargs: The keyword arguments to pass in.
+        :param time_limit: The time limit in seconds for each call (default: 30)
+        :return: The fastest runtime of a call in seconds.
+        """
+        timings = []
+        gc_enabled = gc.isenabled()
+        for _ in range(COLD_REPEATS):
+            function = load_function()
+            gc.disable()
+            start = time.perf_counter()
+            try:
+                func_timeout(time_limit, function, args=args, kwargs=kwargs)
+            finally:
+                timings.append(time.perf_counter() - start)
+                if gc_enabled:
+                    gc.enable()
+        return min(timings)
+
     def _mark_test_case(
         self,
         function: Callable,
         test_case: TestCase,
         *,
         time_limit: float = FUNCTION_RUNTIME_LIMIT,
+        profile_path: Path | None = None,
+        phases: PhaseTimer | None = None,
+        load_function: Callable[[], Callable] | None = None,
     ) -> TestCaseOutput:
         """
         Mark a function on a test case.
@@ -310,27 +569,116 @@ class Marker:
         :param test_case: The test case to test the function on.
         :param time_limit: The time limit in seconds for the function
             to finish running (default: 30)
+        :param profile_path: If given, where to save a profile of the timed calls,
+            without a suffix (default: None)
+        :param phases: If given, records the time spent in each phase (default: None)
+        :param load_function: If given, loads fresh copies of the function to time
+            cold calls of (default: None)
         :return: The output of the test case.
         """
         args = test_case.input_args
         kwargs = test_case.input_kwargs
+        phases = phases or PhaseTimer()
+        # Keep solutions' prints off the terminal, where they would slow every call
+        stdout = RingBuffer(self.output_limit)
+        stderr = RingBuffer(self.output_limit)
+
+        # Note when the function returns, so the time func_timeout then spends
+        # tearing down its thread can be told apart from the call itself
+        returned_at = []
+        sampler = (
+            SamplingProfiler(TIMEOUT_SAMPLING_INTERVAL)
+            if self.sample_timeouts
+            else None
+        )
 
+        @functools.wraps(function)
+        def first_call(*args: Any, **kwargs: Any) -> Any:
+            # Sample from the thread func_timeout runs the call on, below this frame
+            if sampler is not None:
+                sampler.enable()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                returned_at.append(time.perf_counter_ns())
+                if sampler is not None:
+                    sampler.disable()
+
+        start = time.perf_counter_ns()
         try:
-            output = func_timeout(time_limit, function, args=args, kwargs=kwargs)
+            with redirect_output(stdout, stderr), sampler or contextlib.nullcontext():
+                output = func_timeout(time_limit, first_call, args=args, kwargs=kwargs)
         except Exception as exc:  # noqa: BLE001
-            return TestCaseOutput(Result.FAILED, message=exc, exception=True)
+            return TestCaseOutput(
+                Result.FAILED,
+                message=exc,
+                exception=True,
+                stdout=stdout.tail(),
+                stderr=stderr.tail(),
+                hot_frames=(
+                    summarize_stacks(sampler.samples)
+                    if sampler is not None and isinstance(exc, FunctionTimedOut)
+                    else ""
+                ),
+            )
+        finally:
+            end = time.perf_counter_ns()
+            returned = returned_at[0] if returned_at else end
+            phases.add(FIRST_CALL, returned - start)
+            phases.add(TEARDOWN, end - returned)
 
-        if self._values_match(test_case.expected_output, output):
-            # record time only if passed
-            iterations, timing = timeit.Timer(
-                lambda: func_timeout(time_limit, function, args=args, kwargs=kwargs)
-            ).autorange()
+        with phases.phase(COMPARE):
+            matched = self._values_match(test_case.expected_output, output)
 
-            runtime = timing / iterations
-            return TestCaseOutput(Result.PASSED, output=output, runtime=runtime)
+        if matched:
+            # record time only if passed
+            if self.discard_timed_output:
+                timed_stdout, timed_stderr = RingBuffer(0), RingBuffer(0)
+            else:
+                timed_stdout, timed_stderr = stdout, stderr
+            lane = (
+                contextlib.nullcontext()
+                if self.timing_lane is None
+                else self.timing_lane.timing()
+            )
+            with (
+                phases.phase(AUTORANGE),
+                redirect_output(timed_stdout, timed_stderr),
+                lane,
+            ):
+                runtime, profile, noisy = self._time(
+                    function,
+                    args,
+                    kwargs,
+                    time_limit=time_limit,
+                    profile_path=profile_path,
+                )
+                cold_runtime = (
+                    ""
+                    if load_function is None
+                    else self._time_cold(
+                        load_function, args, kwargs, time_limit=time_limit
+                    )
+                )
+            return TestCaseOutput(
+                Result.PASSED,
+                output=output,
+                runtime=runtime,
+                profile=profile,
+                stdout=stdout.tail(),
+                stderr=stderr.tail(),
+                noisy=noisy,
+                cold_runtime=cold_runtime,
+            )
 
         # Test case failed
-        return TestCaseOutput(Result.FAILED, output=output, message="Test case failed")
+        return TestCaseOutput(
+            Result.FAILED,
+            output=output,
+            message="Test case failed",
+            stdout=stdout.tail(),
+            stderr=stderr.tail(),
+        )
 
     def mark(
         self,
@@ -353,21 +701,45 @@ class Marker:
             to finish running (default: 30)
         :return: A 4-tuple of a list of test case outputs, the bonus conditions
             output, the number of points, and the runtime (if all tests pass).
+            The time spent in each phase of marking is recorded in `phases`.
         """
+        phases = PhaseTimer()
+        start = time.perf_counter_ns()
         with self.set_recursion_depth(100):
-            solution = self._import_module_from_file("solution", filepath)
+            phases.add(RECURSION_LIMIT, time.perf_counter_ns() - start)
+            with phases.phase(IMPORT):
+                solution = self._import_module_from_file(
+                    "solution", filepath, bytecode_cache=self.bytecode_cache
+                )
 
             try:
-                func = solution.Solution
+                # The module is lazily loaded, so it is executed here
+                with phases.phase(IMPORT):
+                    func = solution.Solution
             except Exception as exc:  # noqa: BLE001
                 test_case_results = [
                     TestCaseOutput(Result.FAILED, message=exc, exception=True)
                     for test_case in question.test_cases
                 ]
             else:
+                load_function = None
+                if self.fair_timing:
+
+                    def load_function() -> Callable:
+                        return self._import_module_from_file(
+                            "solution", filepath, bytecode_cache=self.bytecode_cache
+                        ).Solution
+
                 test_case_results = [
-                    self._mark_test_case(func, test_case, time_limit=time_limit)
-                    for test_case in question.test_cases
+                    self._mark_test_case(
+                        func,
+                        test_case,
+                        time_limit=time_limit,
+                        profile_path=self._profile_path(filepath, i),
+                        phases=phases,
+                        load_function=load_function,
+                    )
+                    for i, test_case in enumerate(question.test_cases, start=1)
                 ]
 
             runtime = sum(
@@ -376,27 +748,50 @@ class Marker:
                 if result.result != Result.FAILED
             )
 
+            details = {"phases": phases.phases, "speed_factor": self.speed_factor}
             # Award zero points if any test case failed
             if any(
                 test_result.result == Result.FAILED for test_result in test_case_results
             ):
-                return Results(test_case_results, BonusResult.NA, 0, 0)
+                return Results(test_case_results, BonusResult.NA, 0, 0, **details)
+            details["cold_runtime"] = sum(
+                result.cold_runtime or 0 for result in test_case_results
+            )
             # Award one point if no additional bonus conditions
             if question.bonus is None:
-                return Results(test_case_results, BonusResult.NA, 1, runtime)
+                return Results(test_case_results, BonusResult.NA, 1, runtime, **details)
             # Award one point plus bonus if bonus conditions met
-            syntax_tree = self._parse_syntax_tree(
-                filepath, Path(filepath).read_text(encoding="utf-8")
-            )
-            if self._obeys_bonus_conditions(syntax_tree, question.bonus.conditions):
+            with phases.phase(BONUS_ANALYSIS):
+                syntax_tree = self._parse_syntax_tree(
+                    filepath, Path(filepath).read_text(encoding="utf-8")
+                )
+                obeys_bonus_conditions = self._obeys_bonus_conditions(
+                    syntax_tree, question.bonus.conditions
+                )
+            if obeys_bonus_conditions:
                 return Results(
                     test_case_results,
                     BonusResult.PASSED,
                     1 + question.bonus.bonus_points,
                     runtime,
+                    **details,
                 )
             # Award one point if bonus conditions not met
-            return Results(test_case_results, BonusResult.FAILED, 1, runtime)
+            return Results(test_case_results, BonusResult.FAILED, 1, runtime, **details)
+
+    def _profile_path(
+        self, filepath: str | os.PathLike, test_number: int
+    ) -> Path | None:
+        """
+        Get where to save the profile of a test case, if profiling is enabled.
+
+        :param filepath: The code file being marked.
+        :param test_number: The test case number, starting at 1.
+        :return: The path without a suffix, or None if profiling is disabled.
+        """
+        if self.profile_dir is None:
+            return None
+        return self.profile_dir / f"{Path(filepath).stem}_test_{test_number}"
 
     @staticmethod
     @contextlib.contextmanager
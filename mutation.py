@@ -0,0 +1,352 @@
+"""
+Mutation testing of the test cases of each question.
+
+Mutants of a question's reference solution are generated by small edits to its
+syntax tree: swapping an operator, changing a number by one, negating a condition,
+or dropping a branch. A mutant is killed if any of the question's test cases fails
+on it. The fraction of mutants killed estimates how well the test cases pin down
+the solution, so a low kill rate shows where they need more or larger cases.
+
+Some mutants behave exactly like the reference and can never be killed, so the
+surviving mutants are listed for a person to check.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from examples_local import examples
+from func_timeout import func_timeout
+from fuzz import reference_path
+from marker import Marker
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from question import Question, TestCase
+
+MUTATION_CALL_TIME_LIMIT = 2
+
+# Test cases of each question being scored, set up by `_init_worker`. They are
+# inherited by worker processes rather than sent with each mutant, since test cases
+# can hold values that cannot be pickled, such as lambdas.
+_worker_test_cases: list[list[TestCase]] = []
+
+_SYMBOLS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.Pow: "**",
+    ast.And: "and",
+    ast.Or: "or",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.In: "in",
+    ast.NotIn: "not in",
+    ast.Is: "is",
+    ast.IsNot: "is not",
+}
+_OPERATOR_SWAPS = {
+    ast.Add: ast.Sub,
+    ast.Sub: ast.Add,
+    ast.Mult: ast.Div,
+    ast.Div: ast.Mult,
+    ast.FloorDiv: ast.Div,
+    ast.Mod: ast.FloorDiv,
+    ast.Pow: ast.Mult,
+    ast.And: ast.Or,
+    ast.Or: ast.And,
+}
+# Boundary swaps, which catch off-by-one errors, and negations
+_COMPARISON_SWAPS = {
+    ast.Lt: ast.LtE,
+    ast.LtE: ast.Lt,
+    ast.Gt: ast.GtE,
+    ast.GtE: ast.Gt,
+    ast.Eq: ast.NotEq,
+    ast.NotEq: ast.Eq,
+    ast.In: ast.NotIn,
+    ast.NotIn: ast.In,
+    ast.Is: ast.IsNot,
+    ast.IsNot: ast.Is,
+}
+
+
+@dataclass(frozen=True)
+class Mutant:
+    """
+    Dataclass representing a mutant of a reference solution.
+
+    Attributes:
+        line: The line of the reference solution that was mutated.
+        column: The column of the mutated node within the line.
+        description: What was changed, e.g. "`<` -> `<=`".
+        source: The mutant's code.
+    """
+
+    line: int
+    column: int
+    description: str
+    source: str = field(repr=False)
+
+
+@dataclass
+class MutationReport:
+    """
+    Dataclass representing the outcome of mutation testing a question.
+
+    Attributes:
+        question_number: The question whose test cases were scored.
+        mutants: Every distinct mutant of the reference solution.
+        survivors: The mutants that passed every test case.
+    """
+
+    question_number: int
+    mutants: list[Mutant] = field(default_factory=list)
+    survivors: list[Mutant] = field(default_factory=list)
+
+    @property
+    def killed(self) -> int:
+        return len(self.mutants) - len(self.survivors)
+
+    @property
+    def kill_rate(self) -> float:
+        return self.killed / len(self.mutants) if self.mutants else 1.0
+
+
+def _swap_operator(node: ast.AST) -> Iterator[str]:
+    original = node.op
+    replacement = _OPERATOR_SWAPS.get(type(original))
+    if replacement is not None:
+        node.op = replacement()
+        yield f"`{_SYMBOLS[type(original)]}` -> `{_SYMBOLS[replacement]}`"
+        node.op = original
+
+
+def _node_mutations(node: ast.AST) -> Iterator[str]:
+    """
+    Mutate a node in place, one mutation at a time.
+
+    Each mutation is applied while its description is yielded, and undone when the
+    generator is resumed.
+    """
+    if isinstance(node, ast.BinOp | ast.AugAssign | ast.BoolOp):
+        yield from _swap_operator(node)
+
+    elif isinstance(node, ast.Compare):
+        for i, original in enumerate(node.ops):
+            replacement = _COMPARISON_SWAPS[type(original)]
+            node.ops[i] = replacement()
+            yield f"`{_SYMBOLS[type(original)]}` -> `{_SYMBOLS[replacement]}`"
+            node.ops[i] = original
+
+    elif (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, int | float)
+        and not isinstance(node.value, bool)
+    ):
+        original = node.value
+        for replacement in original + 1, original - 1:
+            node.value = replacement
+            yield f"`{original!r}` -> `{replacement!r}`"
+        node.value = original
+
+    if isinstance(node, ast.If | ast.While):
+        test = node.test
+        node.test = ast.UnaryOp(ast.Not(), test)
+        yield "negated condition"
+        node.test = test
+
+    if isinstance(node, ast.If):
+        body = node.body
+        node.body = [ast.Pass()]
+        yield "dropped if branch"
+        node.body = body
+        if node.orelse:
+            orelse = node.orelse
+            node.orelse = []
+            yield "dropped else branch"
+            node.orelse = orelse
+
+
+def _annotations(syntax_tree: ast.AST) -> set[int]:
+    """Get the ids of nodes inside annotations, which do not affect behaviour."""
+    annotations = set()
+    for node in ast.walk(syntax_tree):
+        for annotation in (
+            getattr(node, "annotation", None),
+            getattr(node, "returns", None),
+        ):
+            if isinstance(annotation, ast.AST):
+                annotations.update(id(child) for child in ast.walk(annotation))
+    return annotations
+
+
+def generate_mutants(code: str, filename: str = "<reference>") -> list[Mutant]:
+    """
+    Generate the mutants of a solution.
+
+    Mutants whose code is the same as the solution's or another mutant's are
+    dropped.
+
+    :param code: The solution's code.
+    :param filename: Filename that the code is from (default: "<reference>")
+    :return: The distinct mutants, in the order their mutations appear.
+    :raises SyntaxError: If there is a syntax error in the code string.
+    """
+    syntax_tree = Marker._parse_syntax_tree(filename, code)
+    annotations = _annotations(syntax_tree)
+    seen = {ast.unparse(syntax_tree)}
+    mutants = []
+    for node in ast.walk(syntax_tree):
+        if id(node) in annotations:
+            continue
+        for description in _node_mutations(node):
+            source = ast.unparse(syntax_tree)
+            if source not in seen:
+                seen.add(source)
+                mutants.append(
+                    Mutant(node.lineno, node.col_offset, description, source)
+                )
+    return mutants
+
+
+def _init_worker(test_cases: list[list[TestCase]]) -> None:
+    """Set up a worker process with the test cases of each question."""
+    global _worker_test_cases
+    _worker_test_cases = test_cases
+
+
+def _is_killed(question_index: int, source: str, time_limit: float) -> bool:
+    """
+    Run a mutant on every test case of a question in a worker process.
+
+    :param question_index: The position of the question in the worker's test cases.
+    :return: Whether any test case failed, raised, or timed out.
+    """
+    namespace = {"__name__": "mutant"}
+    try:
+        exec(compile(source, "<mutant>", "exec"), namespace)  # noqa: S102
+        function = namespace["Solution"]
+    except Exception:  # noqa: BLE001
+        return True
+
+    with Marker.set_recursion_depth(100):
+        for test_case in _worker_test_cases[question_index]:
+            try:
+                output = func_timeout(
+                    time_limit,
+                    function,
+                    args=copy.deepcopy(test_case.input_args),
+                    kwargs=copy.deepcopy(test_case.input_kwargs),
+                )
+            except Exception:  # noqa: BLE001
+                return True
+            if not Marker._values_match(test_case.expected_output, output):
+                return True
+    return False
+
+
+def mutation_test(
+    questions: list[Question],
+    *,
+    workers: int | None = None,
+    time_limit: float = MUTATION_CALL_TIME_LIMIT,
+) -> list[MutationReport]:
+    """
+    Score the test cases of questions by the mutants of their references they kill.
+
+    The mutants of every question are run on the question's own test cases, in
+    parallel worker processes.
+
+    :param questions: The questions to score, with the test cases to score.
+    :param workers: The number of worker processes, or 1 to run in this process
+        (default: the number of CPUs)
+    :param time_limit: The time limit in seconds for each call (default: 2)
+    :return: A report per question.
+    """
+    reports = []
+    for question in questions:
+        filepath = reference_path(question.question_number)
+        reports.append(
+            MutationReport(
+                question.question_number,
+                generate_mutants(filepath.read_text(encoding="utf-8"), str(filepath)),
+            )
+        )
+    test_cases = [question.test_cases for question in questions]
+    runs = [
+        (question_index, mutant.source, time_limit)
+        for question_index, report in enumerate(reports)
+        for mutant in report.mutants
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(test_cases)
+        killed = [_is_killed(*run) for run in runs]
+    else:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(test_cases,)
+        ) as executor:
+            killed = list(executor.map(_is_killed, *zip(*runs, strict=True)))
+
+    outcomes = iter(killed)
+    for report in reports:
+        report.survivors = [mutant for mutant in report.mutants if not next(outcomes)]
+    return reports
+
+
+def main(arguments: list[str] | None = None) -> int:
+    # argparser
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "questions",
+        type=int,
+        nargs="*",
+        help="The questions to score (default: all questions)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=MUTATION_CALL_TIME_LIMIT,
+        help="The time limit in seconds for each call",
+    )
+    args = parser.parse_args(arguments)
+
+    questions = (
+        [examples[question_number] for question_number in args.questions]
+        if args.questions
+        else examples
+    )
+    reports = mutation_test(questions, workers=args.workers, time_limit=args.time_limit)
+    for question, report in zip(questions, reports, strict=True):
+        print(
+            f"Question {report.question_number:>2}: {report.killed} of "
+            f"{len(report.mutants)} mutants killed ({report.kill_rate:.0%}) by "
+            f"{len(question.test_cases)} test cases"
+        )
+        for mutant in report.survivors:
+            print(
+                f"    Survived: line {mutant.line} column {mutant.column}, "
+                f"{mutant.description}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import contextlib
+import io
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+# The number of trailing characters of each stream kept per test case
+OUTPUT_LIMIT = 2000
+
+
+class RingBuffer(io.TextIOBase):
+    """
+    Text stream that keeps only the last `max_chars` characters written to it.
+
+    Writes are appended as chunks, and chunks are dropped or cut short from the
+    front once they fall outside the limit, so the buffer never holds more than
+    `max_chars` characters, however much a solution prints or however much it
+    prints at once. A limit of zero discards everything.
+    """
+
+    def __init__(self, max_chars: int = OUTPUT_LIMIT) -> None:
+        super().__init__()
+        self.max_chars = max_chars
+        self.written = 0
+        self._chunks: deque[str] = deque()
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        length = len(text)
+        self.written += length
+        if not self.max_chars or not length:
+            return length
+        if length >= self.max_chars:
+            # The write alone fills the buffer
+            self._chunks.clear()
+            self._chunks.append(text[-self.max_chars :])
+            self._size = self.max_chars
+            return length
+        self._chunks.append(text)
+        self._size += length
+        while self._size - len(self._chunks[0]) >= self.max_chars:
+            self._size -= len(self._chunks.popleft())
+        if self._size > self.max_chars:
+            self._chunks[0] = self._chunks[0][self._size - self.max_chars :]
+            self._size = self.max_chars
+        return length
+
+    @property
+    def truncated(self) -> bool:
+        """Whether more was written than is kept."""
+        return self.written > self.max_chars
+
+    def getvalue(self) -> str:
+        """
+        Get the kept tail of the output.
+
+        :return: The last `max_chars` characters written.
+        """
+        return "".join(self._chunks)
+
+    def tail(self) -> str:
+        """
+        Get the kept tail of the output, noting how much was cut off.
+
+        :return: The tail, prefixed with the number of characters dropped if the
+            output was truncated.
+        """
+        if not self.truncated:
+            return self.getvalue()
+        dropped = self.written - len(self.getvalue())
+        return f"[... {dropped} characters truncated]\n{self.getvalue()}"
+
+
+@contextlib.contextmanager
+def redirect_output(
+    stdout: io.TextIOBase, stderr: io.TextIOBase
+) -> Generator[None, None, None]:
+    """
+    Redirect `sys.stdout` and `sys.stderr` while marked code runs.
+
+    The streams are swapped process-wide, so output from the thread `func_timeout`
+    runs the solution on is redirected too.
+
+    :param stdout: The stream to write standard output to.
+    :param stderr: The stream to write standard error to.
+    """
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        yield
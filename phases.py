@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+    from marker import Results
+
+# The phases of marking a submission, in the order they happen
+RECURSION_LIMIT = "recursion_limit"
+IMPORT = "import"
+FIRST_CALL = "first_call"
+TEARDOWN = "teardown"
+COMPARE = "compare"
+AUTORANGE = "autorange"
+BONUS_ANALYSIS = "bonus_analysis"
+PHASES = (
+    RECURSION_LIMIT,
+    IMPORT,
+    FIRST_CALL,
+    TEARDOWN,
+    COMPARE,
+    AUTORANGE,
+    BONUS_ANALYSIS,
+)
+
+
+class PhaseTimer:
+    """
+    Accumulates wall-clock nanoseconds spent in each phase of marking.
+
+    Attributes:
+        phases: The nanoseconds spent in each phase, in the order first entered.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, int] = {}
+
+    def add(self, phase: str, nanoseconds: int) -> None:
+        """
+        Add time to a phase.
+
+        :param phase: The phase name.
+        :param nanoseconds: The time to add.
+        """
+        self.phases[phase] = self.phases.get(phase, 0) + nanoseconds
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Generator[None, None, None]:
+        """
+        Time the body of a `with` block as a phase.
+
+        :param phase: The phase name.
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter_ns() - start)
+
+
+def aggregate_phases(results: Iterable[Results]) -> dict[str, int]:
+    """
+    Sum the phase breakdowns of many results.
+
+    :param results: The results to aggregate.
+    :return: The total nanoseconds spent in each phase.
+    """
+    totals = PhaseTimer()
+    for result in results:
+        for phase, nanoseconds in result.phases.items():
+            totals.add(phase, nanoseconds)
+    return totals.phases
+
+
+def format_phase_report(results: Iterable[Results]) -> str:
+    """
+    Format a table of where marking time went across many results.
+
+    :param results: The results to report on.
+    :return: The report, with phases sorted from most to least time spent.
+    """
+    results = list(results)
+    totals = aggregate_phases(results)
+    grand_total = sum(totals.values()) or 1
+    lines = [
+        f"{'Phase':<16}{'Total (s)':>12}{'Mean (ms)':>12}{'Share':>9}",
+    ]
+    for phase, nanoseconds in sorted(totals.items(), key=lambda item: -item[1]):
+        lines.append(
+            f"{phase:<16}{nanoseconds / 1e9:>12.3f}"
+            f"{nanoseconds / 1e6 / len(results):>12.3f}"
+            f"{nanoseconds / grand_total:>9.1%}"
+        )
+    lines.append(
+        f"{'total':<16}{grand_total / 1e9:>12.3f}"
+        f"{grand_total / 1e6 / max(len(results), 1):>12.3f}{1:>9.1%}"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+import threading
+from collections import Counter
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import os
+    from types import CodeType, FrameType, TracebackType
+    from typing import Self
+
+# A function as identified by cProfile and pstats: (filename, line number, name)
+FunctionKey = tuple[str, int, str]
+
+SAMPLING_INTERVAL = 0.001
+
+
+class Profiler(Enum):
+    """
+    Enum for the kind of profiler used to profile timed calls.
+
+    Attributes:
+        CPROFILE: Deterministic profiling with `cProfile`. Every call is traced, so
+            recorded runtimes are inflated.
+        SAMPLING: Periodic stack sampling, which has a much lower overhead.
+    """
+
+    CPROFILE: str = "cprofile"
+    SAMPLING: str = "sampling"
+
+
+def _function_key(code: CodeType) -> FunctionKey:
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _label(key: FunctionKey) -> str:
+    filename, line, name = key
+    if filename == "~":  # Built-in functions
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+class SamplingProfiler:
+    """
+    Profiler that periodically samples the stacks of the threads it is enabled in.
+
+    It mirrors the `enable`/`disable` interface of `cProfile.Profile`: calling
+    `enable` from a thread starts sampling that thread below the calling frame,
+    so it can wrap calls made on the worker threads of `func_timeout`. Samples are
+    taken by a background thread, started with `start` and stopped with `stop`.
+
+    While sampling, the interpreter's thread switch interval is lowered so the
+    sampling thread gets the GIL mid-call. Otherwise it would only run once the
+    sampled thread blocks, and short calls would never be sampled.
+
+    It can also be used as a context manager that starts and stops sampling.
+    """
+
+    def __init__(self, interval: float = SAMPLING_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: Counter[tuple[FunctionKey, ...]] = Counter()
+        self.stats: dict = {}
+        self._roots: dict[int, FrameType] = {}
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._switch_interval = sys.getswitchinterval()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the background sampling thread."""
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 20))
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sampling thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+
+    def enable(self) -> None:
+        """Start sampling the calling thread, below the calling frame."""
+        self._roots[threading.get_ident()] = sys._getframe(1)
+
+    def disable(self) -> None:
+        """Stop sampling the calling thread."""
+        self._roots.pop(threading.get_ident(), None)
+
+    def sample(self) -> None:
+        """Record the current stack of every enabled thread."""
+        frames = sys._current_frames()
+        for ident, root in list(self._roots.items()):
+            stack = []
+            frame = frames.get(ident)
+            while frame is not None and frame is not root:
+                stack.append(_function_key(frame.f_code))
+                frame = frame.f_back
+            if frame is root and stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def create_stats(self) -> None:
+        """
+        Build `pstats`-compatible statistics from the samples.
+
+        Sample counts stand in for call counts and times are estimated as the
+        number of samples multiplied by the sampling interval.
+        """
+        stats: dict[FunctionKey, list] = {}
+        for stack, count in self.samples.items():
+            elapsed = count * self.interval
+            for depth, key in enumerate(stack):
+                entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+                is_leaf = depth == len(stack) - 1
+                is_outermost = key not in stack[:depth]
+                entry[0] += count
+                entry[1] += count
+                entry[2] += elapsed if is_leaf else 0.0
+                entry[3] += elapsed if is_outermost else 0.0
+                if depth:
+                    caller = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += count
+                    caller[1] += count
+                    caller[2] += elapsed if is_leaf else 0.0
+                    caller[3] += elapsed if is_outermost else 0.0
+        self.stats = {
+            key: (
+                cc,
+                nc,
+                tt,
+                ct,
+                {caller: tuple(edge) for caller, edge in edges.items()},
+            )
+            for key, (cc, nc, tt, ct, edges) in stats.items()
+        }
+
+    def collapsed(self) -> Counter[tuple[FunctionKey, ...]]:
+        """
+        Get the sampled stacks.
+
+        :return: The number of samples of each stack, outermost frame first.
+        """
+        return Counter(self.samples)
+
+
+def _collapse_call_graph(stats: dict) -> Counter[tuple[FunctionKey, ...]]:
+    """
+    Estimate stacks from a deterministic profile's caller/callee graph.
+
+    A profile only records one level of callers, so the time of a function is
+    split between its callers in proportion to their share of its cumulative time.
+
+    :param stats: The `pstats` statistics.
+    :return: The estimated microseconds spent in each stack.
+    """
+    callees: dict[FunctionKey, dict[FunctionKey, float]] = {}
+    for key, (*_, callers) in stats.items():
+        for caller, (*_, cumulative) in callers.items():
+            callees.setdefault(caller, {})[key] = cumulative
+
+    stacks: Counter[tuple[FunctionKey, ...]] = Counter()
+
+    def walk(stack: tuple[FunctionKey, ...], share: float) -> None:
+        key = stack[-1]
+        _, _, own_time, cumulative, _ = stats[key]
+        if cumulative <= 0:
+            return
+        fraction = min(share / cumulative, 1.0)
+        stacks[stack] += round(own_time * fraction * 1e6)
+        for callee, edge_time in callees.get(key, {}).items():
+            if callee not in stack:
+                walk((*stack, callee), edge_time * fraction)
+
+    for key, (_, _, _, cumulative, callers) in stats.items():
+        if not callers:
+            walk((key,), cumulative)
+    return +stacks
+
+
+def write_profile(
+    profiler: cProfile.Profile | SamplingProfiler, path: str | os.PathLike
+) -> bool:
+    """
+    Save a profile as `<path>.pstats` and `<path>.collapsed`.
+
+    The collapsed file has one `outer;inner;leaf weight` line per stack, the input
+    format of flame graph tools. Weights are sample counts for a sampling profile
+    and estimated microseconds for a deterministic one.
+
+    :param profiler: The profiler to save.
+    :param path: The path to save to, without a suffix.
+    :return: Whether a profile was saved, which it is not if nothing was sampled.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(profiler, SamplingProfiler):
+        stacks = profiler.collapsed()
+        if not stacks:
+            # Calls too short to be sampled leave nothing to save
+            return False
+        stats = pstats.Stats(profiler)
+    else:
+        stats = pstats.Stats(profiler)
+        stacks = _collapse_call_graph(stats.stats)
+    stats.dump_stats(path.with_name(f"{path.name}.pstats"))
+
+    lines = [
+        f"{';'.join(_label(key) for key in stack)} {weight}"
+        for stack, weight in sorted(stacks.items())
+    ]
+    path.with_name(f"{path.name}.collapsed").write_text(
+        "\n".join(lines) + "\n", encoding="utf-8"
+    )
+    return True
+
+
+def summarize_stacks(
+    samples: Counter[tuple[FunctionKey, ...]], *, limit: int = 5, depth: int = 4
+) -> str:
+    """
+    Summarize where sampled code spent its time, hottest stack first.
+
+    :param samples: The number of samples of each stack, outermost frame first.
+    :param limit: The number of stacks to list (default: 5)
+    :param depth: The number of innermost frames shown per stack (default: 4)
+    :return: One line per stack with its share of the samples, innermost frame
+        first, or an empty string if nothing was sampled.
+    """
+    total = sum(samples.values())
+    lines = []
+    for stack, count in samples.most_common(limit):
+        frames = " <- ".join(_label(key) for key in reversed(stack[-depth:]))
+        ellipsis = " <- ..." if len(stack) > depth else ""
+        lines.append(f"{count / total:4.0%} {frames}{ellipsis}")
+    return "\n".join(lines)
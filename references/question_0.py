@@ -0,0 +1,2 @@
+def Solution(input_string: str) -> str:
+    return input_string[::-1]
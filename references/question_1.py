@@ -0,0 +1,2 @@
+def Solution(password: str) -> bool:
+    return len(password) >= 8 and len(set(password)) >= 6
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from collections import Counter
+from itertools import combinations
+
+
+def Solution(transactions: list[list[str]]) -> tuple[str, str]:
+    pair_counts = Counter(
+        pair
+        for transaction in transactions
+        for pair in combinations(sorted(set(transaction)), 2)
+    )
+    (pair, _), *_ = pair_counts.most_common(1)
+    return pair
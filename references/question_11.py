@@ -0,0 +1,7 @@
+def Solution(n: int) -> int:
+    if n < 0:
+        return -1
+    previous, current = 0, 1
+    for _ in range(n):
+        previous, current = current, previous + current
+    return previous
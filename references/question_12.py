@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import math
+
+
+def Solution(x: list[float], y: list[float]) -> float | None:
+    if len(x) != len(y):
+        return None
+    n = len(x)
+    mean_x = sum(x) / n
+    mean_y = sum(y) / n
+    covariance = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
+    variance_x = sum((xi - mean_x) ** 2 for xi in x)
+    variance_y = sum((yi - mean_y) ** 2 for yi in y)
+    return covariance / math.sqrt(variance_x * variance_y)
@@ -0,0 +1,13 @@
+from collections.abc import Callable
+
+
+def Solution(
+    gradient_func: Callable[[float], float],
+    x_0: float,
+    lr: float,
+    n_iters: int,
+) -> float:
+    x = x_0
+    for _ in range(n_iters):
+        x = x - lr * gradient_func(x)
+    return x
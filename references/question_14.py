@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+colvector = list[float]
+matrix = list[list[float]]
+
+
+def _invert(m: matrix) -> matrix:
+    """Invert a 2x2 or 3x3 matrix using the adjugate formula."""
+    if len(m) == 2:
+        (a, b), (c, d) = m
+        det = a * d - b * c
+        return [[d / det, -b / det], [-c / det, a / det]]
+
+    (a, b, c), (d, e, f), (g, h, i) = m
+    cofactors = [
+        [e * i - f * h, -(d * i - f * g), d * h - e * g],
+        [-(b * i - c * h), a * i - c * g, -(a * h - b * g)],
+        [b * f - c * e, -(a * f - c * d), a * e - b * d],
+    ]
+    det = a * cofactors[0][0] + b * cofactors[0][1] + c * cofactors[0][2]
+    return [[cofactors[col][row] / det for col in range(3)] for row in range(3)]
+
+
+def Solution(X: matrix, y: colvector) -> colvector:
+    design = [[1.0, *row] for row in X]
+    p = len(design[0])
+    xtx = [[sum(row[i] * row[j] for row in design) for j in range(p)] for i in range(p)]
+    xty = [sum(row[i] * yi for row, yi in zip(design, y)) for i in range(p)]
+    inverse = _invert(xtx)
+    return [sum(inverse[i][j] * xty[j] for j in range(p)) for i in range(p)]
@@ -0,0 +1,7 @@
+def Solution(password: str) -> bool:
+    return (
+        len(password) >= 10
+        and any(char.isupper() for char in password)
+        and any(char.islower() for char in password)
+        and any(char.isdigit() for char in password)
+    )
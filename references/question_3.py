@@ -0,0 +1,5 @@
+import numpy as np
+
+
+def Solution(celsius_temps: np.ndarray) -> np.ndarray:
+    return celsius_temps * 9 / 5 + 32
@@ -0,0 +1,9 @@
+import pandas as pd
+
+
+def Solution(students: pd.DataFrame, test_results: pd.DataFrame) -> pd.DataFrame:
+    merged = test_results.merge(students, left_on="studentid", right_on="id")
+    top_three = merged.sort_values("score", ascending=False).head(3)
+    return top_three[["fname", "lname", "score"]].rename(
+        columns={"fname": "first_name", "lname": "last_name"}
+    )
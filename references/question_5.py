@@ -0,0 +1,9 @@
+def Solution(objects: int) -> int:
+    # Each arrangement is a divisor `rows` of `objects` with rows <= objects / rows
+    arrangements = 0
+    rows = 1
+    while rows * rows <= objects:
+        if objects % rows == 0:
+            arrangements += 1
+        rows += 1
+    return arrangements
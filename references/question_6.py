@@ -0,0 +1,8 @@
+def _to_24_hour(time: str) -> int:
+    clock, period = time.split()
+    hour = int(clock.split(":")[0]) % 12
+    return hour + 12 if period == "PM" else hour
+
+
+def Solution(start: str, end: str) -> int:
+    return _to_24_hour(end) - _to_24_hour(start)
@@ -0,0 +1,7 @@
+def Solution(input_int: int) -> int:
+    factorial = 1
+    n = 1
+    while factorial < input_int:
+        n += 1
+        factorial *= n
+    return factorial == input_int
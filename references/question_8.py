@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+xy_coord = tuple[float, float]
+
+
+def Solution(
+    points: list[xy_coord],
+    center_x: float,
+    center_y: float,
+    radius: float,
+) -> int:
+    radius_squared = radius * radius
+    return sum(
+        (x - center_x) ** 2 + (y - center_y) ** 2 <= radius_squared for x, y in points
+    )
@@ -0,0 +1,18 @@
+INT32_MIN = -(2**31)
+INT32_MAX = 2**31 - 1
+
+
+def Solution(x: int) -> int:
+    # Both the input and the reversed value must fit in a signed 32-bit integer
+    if not INT32_MIN <= x <= INT32_MAX:
+        return 0
+    sign = -1 if x < 0 else 1
+    remaining = abs(x)
+    reversed_x = 0
+    while remaining:
+        remaining, digit = divmod(remaining, 10)
+        reversed_x = reversed_x * 10 + digit
+    reversed_x *= sign
+    if not INT32_MIN <= reversed_x <= INT32_MAX:
+        return 0
+    return reversed_x
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable
+    from types import TracebackType
+    from typing import Self
+
+    from marker import Results, TestCaseOutput
+
+RESULTS_DB = "results.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    team TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    source_hash TEXT NOT NULL,
+    points REAL NOT NULL,
+    bonus_result TEXT NOT NULL,
+    runtime REAL NOT NULL,
+    speed_factor REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_by_key
+    ON submissions (team, question, source_hash, run_id);
+CREATE INDEX IF NOT EXISTS submissions_by_question
+    ON submissions (question, team);
+CREATE TABLE IF NOT EXISTS test_case_results (
+    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+    test_number INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    runtime REAL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (submission_id, test_number)
+) WITHOUT ROWID;
+"""
+
+# The most recent submission of each team for each question
+_LATEST = """
+SELECT s.team, s.question, s.source_hash, s.run_id, s.points, s.bonus_result,
+    s.runtime, s.speed_factor
+FROM submissions AS s
+WHERE s.id = (
+    SELECT MAX(latest.id) FROM submissions AS latest
+    WHERE latest.team = s.team AND latest.question = s.question
+)
+"""
+
+
+@dataclass(frozen=True)
+class SubmissionRecord:
+    """
+    Dataclass representing a stored marking result of a submission.
+
+    Attributes:
+        team: The team name.
+        question_number: The question number.
+        source_hash: The hash of the submission's source code.
+        run_id: The run the submission was marked in.
+        points: The number of points scored.
+        bonus_result: The value of the `BonusResult`.
+        runtime: The total runtime if all test cases passed and zero otherwise.
+        speed_factor: The speed of the machine that marked the submission relative
+            to the reference machine.
+    """
+
+    team: str
+    question_number: int
+    source_hash: str
+    run_id: int
+    points: float
+    bonus_result: str
+    runtime: float
+    speed_factor: float = 1.0
+
+    @property
+    def normalized_runtime(self) -> float:
+        """The runtime scaled to the reference machine."""
+        return self.runtime / self.speed_factor
+
+
+def _message(test_case_result: TestCaseOutput) -> str:
+    message = test_case_result.message
+    if isinstance(message, BaseException):
+        return f"{type(message).__name__}: {message}"
+    return str(message)
+
+
+class ResultsStore:
+    """
+    Persistent store of marking results backed by SQLite.
+
+    Every call to `record_batch` is one run, written in a single transaction with
+    bulk inserts. Submissions are indexed by (team, question, source hash, run).
+    The database uses write-ahead logging so readers do not block a batch being
+    recorded.
+    """
+
+    def __init__(self, path: str | os.PathLike = RESULTS_DB) -> None:
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def record_batch(
+        self,
+        entries: Iterable[tuple[str, int, str, Results]],
+        *,
+        label: str = "",
+    ) -> int:
+        """
+        Record the results of a batch as a new run.
+
+        :param entries: 4-tuples of the team, question number, source hash, and
+            results of each submission.
+        :param label: A label for the run (default: "")
+        :return: The id of the new run.
+        """
+        entries = list(entries)
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute(
+                "INSERT INTO runs (started_at, label) VALUES (?, ?)",
+                (datetime.now(UTC).isoformat(), label),
+            )
+            run_id = cursor.lastrowid
+            # Allocate ids up front so submissions and their test cases can both be
+            # inserted with executemany; the immediate transaction holds the lock
+            (first_id,) = cursor.execute(
+                "SELECT COALESCE(MAX(id), 0) + 1 FROM submissions"
+            ).fetchone()
+            cursor.executemany(
+                "INSERT INTO submissions (id, run_id, team, question, source_hash, "
+                "points, bonus_result, runtime, speed_factor) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        first_id + i,
+                        run_id,
+                        team,
+                        question_number,
+                        source_hash,
+                        results.points,
+                        results.bonus_result.value,
+                        results.runtime,
+                        results.speed_factor,
+                    )
+                    for i, (team, question_number, source_hash, results) in enumerate(
+                        entries
+                    )
+                ),
+            )
+            cursor.executemany(
+                "INSERT INTO test_case_results (submission_id, test_number, result, "
+                "runtime, message) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        first_id + i,
+                        test_number,
+                        test_case_result.result.value,
+                        test_case_result.runtime or None,
+                        _message(test_case_result),
+                    )
+                    for i, (*_, results) in enumerate(entries)
+                    for test_number, test_case_result in enumerate(
+                        results.test_case_results, start=1
+                    )
+                ),
+            )
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        return run_id
+
+    def latest_results(
+        self, question_number: int | None = None
+    ) -> list[SubmissionRecord]:
+        """
+        Get the most recent result of each team for each question.
+
+        :param question_number: If given, only get results for this question
+            (default: None)
+        :return: The results, sorted by question number and team.
+        """
+        query = _LATEST
+        parameters: tuple = ()
+        if question_number is not None:
+            query += " AND s.question = ?"
+            parameters = (question_number,)
+        rows = self.connection.execute(
+            query + " ORDER BY s.question, s.team", parameters
+        )
+        return [SubmissionRecord(*row) for row in rows]
+
+    def runtime_history(
+        self, team: str, question_number: int
+    ) -> list[tuple[int, str, str, float, float, float]]:
+        """
+        Get every recorded result of a team for a question.
+
+        :param team: The team name.
+        :param question_number: The question number.
+        :return: 6-tuples of the run id, run start time, source hash, points,
+            runtime, and runtime normalized to the reference machine, oldest first.
+        """
+        return self.connection.execute(
+            "SELECT s.run_id, r.started_at, s.source_hash, s.points, s.runtime, "
+            "s.runtime / s.speed_factor "
+            "FROM submissions AS s JOIN runs AS r ON r.id = s.run_id "
+            "WHERE s.team = ? AND s.question = ? ORDER BY s.id",
+            (team, question_number),
+        ).fetchall()
+
+    def pass_rates(self) -> dict[int, float]:
+        """
+        Get the fraction of teams whose latest submission passed, per question.
+
+        :return: The pass rate keyed by question number.
+        """
+        rows = self.connection.execute(
+            f"SELECT question, AVG(points > 0) FROM ({_LATEST}) "
+            "GROUP BY question ORDER BY question"
+        )
+        return dict(rows.fetchall())
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import dataclasses
+import mmap
+import os
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from types import TracebackType
+    from typing import Self
+
+    from question import Question, TestCase
+
+# Values smaller than this are cheaper to pickle than to share
+SHARE_MIN_BYTES = 1 << 20
+
+# Private mappings of the segments attached by this process, kept open while views
+# of them are in use
+_attached_segments: dict[str, mmap.mmap] = {}
+
+
+def _map_private(name: str) -> mmap.mmap:
+    """
+    Map a shared memory segment copy-on-write.
+
+    Pages are shared with the segment until this process writes to them, so writes
+    stay private to this process and never reach the segment or other processes.
+    """
+    segment = shared_memory.SharedMemory(name)
+    try:
+        if os.name == "nt":
+            return mmap.mmap(-1, segment.size, tagname=name, access=mmap.ACCESS_COPY)
+        return mmap.mmap(segment._fd, segment.size, access=mmap.ACCESS_COPY)
+    finally:
+        segment.close()
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """
+    Dataclass representing a numpy array placed in a shared memory segment.
+
+    Attributes:
+        segment: The name of the shared memory segment.
+        shape: The shape of the array.
+        dtype: The dtype string of the array.
+    """
+
+    segment: str
+    shape: tuple[int, ...]
+    dtype: str
+
+    def attach(self) -> np.ndarray:
+        """
+        Get a writable view of the array without copying it.
+
+        Like an array received any other way, it can be modified in place, but the
+        changes are private to this process.
+
+        :return: The array backed by a copy-on-write mapping of the segment.
+        """
+        if self.segment not in _attached_segments:
+            _attached_segments[self.segment] = _map_private(self.segment)
+        return np.ndarray(
+            self.shape, self.dtype, buffer=_attached_segments[self.segment]
+        )
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """
+    Dataclass representing a pandas DataFrame with its numeric columns shared.
+
+    Attributes:
+        columns: Each column's name and values, either shared or pickled as-is.
+        index: The index of the frame.
+    """
+
+    columns: tuple[tuple[Any, SharedArray | np.ndarray], ...]
+    index: pd.Index
+
+    def attach(self) -> pd.DataFrame:
+        """
+        Rebuild the frame on top of writable views of its shared columns.
+
+        :return: The DataFrame.
+        """
+        return pd.DataFrame(
+            {
+                name: values.attach() if isinstance(values, SharedArray) else values
+                for name, values in self.columns
+            },
+            index=self.index,
+            copy=False,
+        )
+
+
+class SharedInputs:
+    """
+    Owns the shared memory segments holding the large values of some questions.
+
+    Use it as a context manager around a batch: `share` publishes the large numpy
+    arrays and DataFrames of every test case once, and the segments are unlinked
+    when the batch ends. Worker processes call `attach` on the shared questions
+    they receive to get zero-copy views, which they can modify without affecting
+    each other.
+    """
+
+    def __init__(self, min_bytes: int = SHARE_MIN_BYTES) -> None:
+        self.min_bytes = min_bytes
+        self._segments: list[shared_memory.SharedMemory] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release and unlink every segment."""
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
+
+    def _share_array(self, array: np.ndarray) -> SharedArray:
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments.append(segment)
+        np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+        return SharedArray(segment.name, array.shape, array.dtype.str)
+
+    def _share_value(self, value: Any) -> Any:
+        if (
+            isinstance(value, np.ndarray)
+            and value.dtype != object
+            and value.nbytes >= self.min_bytes
+        ):
+            return self._share_array(value)
+
+        if (
+            isinstance(value, pd.DataFrame)
+            and value.memory_usage(index=False).sum() >= self.min_bytes
+        ):
+            columns = []
+            for name, column in value.items():
+                values = column.to_numpy()
+                if values.dtype.kind in "biufcmM":
+                    columns.append((name, self._share_array(values)))
+                else:
+                    columns.append((name, column.array))
+            return SharedFrame(tuple(columns), value.index)
+
+        return value
+
+    def _share_test_case(self, test_case: TestCase) -> TestCase:
+        return dataclasses.replace(
+            test_case,
+            input_args=tuple(self._share_value(arg) for arg in test_case.input_args),
+            input_kwargs={
+                key: self._share_value(value)
+                for key, value in test_case.input_kwargs.items()
+            },
+            expected_output=self._share_value(test_case.expected_output),
+        )
+
+    def share(self, questions: list[Question]) -> list[Question]:
+        """
+        Place the large values of questions' test cases in shared memory.
+
+        :param questions: The questions to share.
+        :return: Copies of the questions with large values replaced by handles.
+        """
+        return [
+            dataclasses.replace(
+                question,
+                test_cases=[
+                    self._share_test_case(test_case)
+                    for test_case in question.test_cases
+                ],
+            )
+            for question in questions
+        ]
+
+
+def _attach_value(value: Any) -> Any:
+    if isinstance(value, SharedArray | SharedFrame):
+        return value.attach()
+    return value
+
+
+def attach(questions: list[Question]) -> list[Question]:
+    """
+    Replace the shared values of questions with views of their segments.
+
+    :param questions: Questions returned by `SharedInputs.share`.
+    :return: The questions with their values restored.
+    """
+    return [
+        dataclasses.replace(
+            question,
+            test_cases=[
+                dataclasses.replace(
+                    test_case,
+                    input_args=tuple(
+                        _attach_value(arg) for arg in test_case.input_args
+                    ),
+                    input_kwargs={
+                        key: _attach_value(value)
+                        for key, value in test_case.input_kwargs.items()
+                    },
+                    expected_output=_attach_value(test_case.expected_output),
+                )
+                for test_case in question.test_cases
+            ],
+        )
+        for question in questions
+    ]
@@ -0,0 +1,382 @@
+"""
+Near-duplicate detection across submissions from their syntax trees.
+
+Each submission's syntax tree is normalized so renaming variables, changing
+literals, or editing comments and docstrings does not hide a copy. Every subtree
+of at least `MIN_SUBTREE_SIZE` nodes is hashed into a shingle, and the set of
+shingles is summarized by a MinHash signature whose agreement with another
+signature estimates the Jaccard similarity of their shingle sets. Locality
+sensitive hashing buckets signatures by bands, so only submissions sharing a
+bucket are compared, which takes roughly linear time in the number of
+submissions instead of comparing every pair.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import builtins
+import hashlib
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from batch import discover_jobs
+from bytecode_cache import source_hash
+from marker import Marker
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from batch import Job
+
+FINGERPRINT_CACHE_DIR = ".fingerprint_cache"
+# Bump when fingerprints change, so stale cache entries are not reused
+FINGERPRINT_VERSION = 1
+
+MIN_SUBTREE_SIZE = 3
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+THRESHOLD = 0.8
+# Submissions with fewer shingles are too short for similarity to mean copying
+MIN_SHINGLES = 10
+
+# The MinHash permutations, (a * x + b) mod p of 32-bit shingles, chosen so every
+# step fits in 64 bits
+_PRIME = (1 << 32) + 15
+_rng = np.random.default_rng(0)
+_A = _rng.integers(1, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+
+_BUILTIN_NAMES = frozenset(dir(builtins))
+# Fields that do not affect what code does
+_IGNORED_FIELDS = frozenset({"ctx", "type_comment", "kind"})
+
+
+def _imported_names(syntax_tree: ast.AST) -> set[str]:
+    names = set()
+    for node in ast.walk(syntax_tree):
+        if isinstance(node, ast.Import | ast.ImportFrom):
+            names.update(
+                alias.asname or alias.name.split(".")[0] for alias in node.names
+            )
+    return names
+
+
+def _literal_bucket(value: object) -> str:
+    """Replace a literal with its kind, so changing a constant hides nothing."""
+    if isinstance(value, bool) or value is None or value is Ellipsis:
+        return repr(value)
+    if isinstance(value, int):
+        return repr(value) if -1 <= value <= 2 else "int"
+    return type(value).__name__
+
+
+def _is_docstring(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Constant)
+        and isinstance(node.value.value, str)
+    )
+
+
+class _Shingler:
+    """Hashes every subtree of a normalized syntax tree."""
+
+    def __init__(self, kept_names: set[str]) -> None:
+        self.kept_names = kept_names
+        self.shingles: set[int] = set()
+
+    def _name(self, name: str) -> str:
+        # Library and builtin names are kept, everything the team named is not
+        return name if name in self.kept_names else "_"
+
+    def _field(self, node: ast.AST, field: str, value: object) -> str:
+        if isinstance(node, ast.Constant) and field == "value":
+            return _literal_bucket(value)
+        if isinstance(node, ast.Name) and field == "id":
+            return self._name(value)
+        if (
+            isinstance(node, ast.arg)
+            and field == "arg"
+            or isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef)
+            and field == "name"
+        ):
+            return "_"
+        return repr(value)
+
+    def visit(self, node: ast.AST) -> tuple[str, int]:
+        """
+        Hash a subtree, recording the hash as a shingle if the subtree is big enough.
+
+        :param node: The root of the subtree.
+        :return: A 2-tuple of the subtree's hash and its number of nodes.
+        """
+        parts = [type(node).__name__]
+        size = 1
+        for field, value in ast.iter_fields(node):
+            if field in _IGNORED_FIELDS:
+                continue
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, ast.AST):
+                    if _is_docstring(item):
+                        continue
+                    digest, subtree_size = self.visit(item)
+                    parts.append(digest)
+                    size += subtree_size
+                else:
+                    parts.append(self._field(node, field, item))
+        digest = hashlib.blake2b("\0".join(parts).encode(), digest_size=4).hexdigest()
+        if size >= MIN_SUBTREE_SIZE:
+            self.shingles.add(int(digest, 16))
+        return digest, size
+
+
+def shingles(syntax_tree: ast.AST) -> set[int]:
+    """
+    Get the normalized subtree hashes of a syntax tree.
+
+    :param syntax_tree: The syntax tree of a submission.
+    :return: The 32-bit hashes of every subtree of at least `MIN_SUBTREE_SIZE`
+        nodes.
+    """
+    shingler = _Shingler(_BUILTIN_NAMES | _imported_names(syntax_tree))
+    shingler.visit(syntax_tree)
+    return shingler.shingles
+
+
+def minhash(shingle_set: set[int]) -> np.ndarray:
+    """
+    Summarize a set of shingles as a MinHash signature.
+
+    :param shingle_set: The shingles.
+    :return: The minimum of each permutation over the shingles.
+    """
+    if not shingle_set:
+        return np.full(NUM_PERMUTATIONS, _PRIME, dtype=np.uint64)
+    values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    hashed = (np.outer(_A, values) + _B[:, None]) % np.uint64(_PRIME)
+    return hashed.min(axis=1)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Dataclass representing the fingerprint of a submission.
+
+    Attributes:
+        signature: The MinHash signature of the submission's shingles.
+        size: The number of distinct shingles.
+    """
+
+    signature: np.ndarray
+    size: int
+
+    def similarity(self, other: Fingerprint) -> float:
+        """
+        Estimate the Jaccard similarity of two submissions' shingles.
+
+        :param other: The other fingerprint.
+        :return: The fraction of agreeing signature values.
+        """
+        return float(np.mean(self.signature == other.signature))
+
+
+class FingerprintCache:
+    """
+    Cache of fingerprints keyed by the hash of the submission's source.
+
+    Entries are the signature followed by the shingle count, in
+    `<digest>.v<version>.bin`, so unchanged submissions are not parsed again.
+    """
+
+    def __init__(self, directory: str | os.PathLike = FINGERPRINT_CACHE_DIR) -> None:
+        self.directory = Path(directory)
+
+    def path_for(self, digest: str) -> Path:
+        return self.directory / f"{digest}.v{FINGERPRINT_VERSION}.bin"
+
+    def get(self, filepath: str | os.PathLike) -> Fingerprint:
+        """
+        Get the fingerprint of a submission, computing and caching it on a miss.
+
+        :param filepath: The submission's code file.
+        :return: The fingerprint.
+        :raises SyntaxError: If the submission has a syntax error.
+        """
+        source = Path(filepath).read_bytes()
+        path = self.path_for(source_hash(source))
+        try:
+            data = np.frombuffer(path.read_bytes(), dtype=np.uint64)
+        except OSError:
+            pass
+        else:
+            if data.size == NUM_PERMUTATIONS + 1:
+                return Fingerprint(data[:-1], int(data[-1]))
+
+        fingerprint = compute_fingerprint(filepath, source.decode("utf-8"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(
+            np.append(fingerprint.signature, np.uint64(fingerprint.size)).tobytes()
+        )
+        return fingerprint
+
+
+def compute_fingerprint(filename: str | os.PathLike, code: str) -> Fingerprint:
+    """
+    Fingerprint a submission.
+
+    :param filename: Filename that the code is from.
+    :param code: The code string.
+    :return: The fingerprint.
+    :raises SyntaxError: If there is a syntax error in the code string.
+    """
+    shingle_set = shingles(Marker._parse_syntax_tree(filename, code))
+    return Fingerprint(minhash(shingle_set), len(shingle_set))
+
+
+@dataclass(frozen=True)
+class Cluster:
+    """
+    Dataclass representing a group of near-duplicate submissions to one question.
+
+    Attributes:
+        question_number: The question the submissions answer.
+        jobs: The submissions.
+        similarity: The highest estimated similarity between two of them.
+    """
+
+    question_number: int
+    jobs: tuple[Job, ...]
+    similarity: float
+
+
+def _find(parents: dict[Job, Job], job: Job) -> Job:
+    while parents[job] is not job:
+        parents[job] = parents[parents[job]]
+        job = parents[job]
+    return job
+
+
+def _question_clusters(
+    question_number: int,
+    fingerprints: dict[Job, Fingerprint],
+    threshold: float,
+) -> list[Cluster]:
+    # Submissions whose signatures agree on every row of a band share a bucket
+    buckets = defaultdict(list)
+    for job, fingerprint in fingerprints.items():
+        for band in range(BANDS):
+            rows = fingerprint.signature[band * ROWS : (band + 1) * ROWS]
+            buckets[band, rows.tobytes()].append(job)
+
+    parents = {job: job for job in fingerprints}
+    best = {}
+    compared = set()
+    for bucket in buckets.values():
+        for i, job in enumerate(bucket):
+            for other in bucket[i + 1 :]:
+                if (job, other) in compared:
+                    continue
+                compared.add((job, other))
+                similarity = fingerprints[job].similarity(fingerprints[other])
+                if similarity < threshold:
+                    continue
+                root, other_root = _find(parents, job), _find(parents, other)
+                parents[other_root] = root
+                best[root] = max(similarity, best.pop(root, 0), best.pop(other_root, 0))
+
+    members = defaultdict(list)
+    for job in fingerprints:
+        members[_find(parents, job)].append(job)
+    return [
+        Cluster(question_number, tuple(jobs), best[root])
+        for root, jobs in members.items()
+        if len(jobs) > 1
+    ]
+
+
+def find_clusters(
+    jobs: Iterable[Job],
+    *,
+    threshold: float = THRESHOLD,
+    min_shingles: int = MIN_SHINGLES,
+    cache: FingerprintCache | None = None,
+) -> list[Cluster]:
+    """
+    Find groups of near-duplicate submissions to the same question.
+
+    :param jobs: The submissions to compare.
+    :param threshold: The estimated similarity from which two submissions are
+        near-duplicates (default: 0.8)
+    :param min_shingles: Submissions with fewer shingles are ignored (default: 10)
+    :param cache: If given, the cache to get fingerprints from (default: None)
+    :return: The clusters, most similar first.
+    """
+    by_question = defaultdict(dict)
+    for job in jobs:
+        try:
+            fingerprint = (
+                compute_fingerprint(
+                    job.filepath, job.filepath.read_text(encoding="utf-8")
+                )
+                if cache is None
+                else cache.get(job.filepath)
+            )
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+        if fingerprint.size >= min_shingles:
+            by_question[job.question_number][job] = fingerprint
+
+    clusters = [
+        cluster
+        for question_number, fingerprints in by_question.items()
+        for cluster in _question_clusters(question_number, fingerprints, threshold)
+    ]
+    return sorted(clusters, key=lambda cluster: -cluster.similarity)
+
+
+def main(arguments: list[str] | None = None) -> int:
+    # argparser
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "folders",
+        nargs="+",
+        help="Folders containing team_{team}_question_{n}.py files",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="The estimated similarity from which submissions are reported",
+    )
+    parser.add_argument(
+        "--cache",
+        default=FINGERPRINT_CACHE_DIR,
+        help="Folder of the fingerprint cache",
+    )
+    args = parser.parse_args(arguments)
+
+    clusters = find_clusters(
+        discover_jobs(args.folders),
+        threshold=args.threshold,
+        cache=FingerprintCache(args.cache),
+    )
+    for cluster in clusters:
+        teams = ", ".join(sorted(job.team for job in cluster.jobs))
+        print(
+            f"Question {cluster.question_number:>2}: {teams} "
+            f"(similarity {cluster.similarity:.0%})"
+        )
+    if not clusters:
+        print("No near-duplicate submissions found")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
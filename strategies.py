@@ -0,0 +1,564 @@
+from __future__ import annotations
+
+import math
+import random
+import string
+from collections import Counter
+from dataclasses import KW_ONLY, dataclass
+from itertools import combinations
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+DEFAULT_SIZE = 10
+INT32_MIN = -(2**31)
+INT32_MAX = 2**31 - 1
+
+_FIRST_NAMES = ("Demarcus", "Jeff", "Jacob", "Joe", "Ada", "Grace", "Linus", "Mia")
+_LAST_NAMES = ("Rabiot", "Chang", "Danlon", "Flagstaff", "Lovelace", "Hopper", "Ng")
+_ITEMS = ("Bread", "Eggs", "Milk", "Cereal", "Wine", "Cheese", "Apples", "Butter")
+
+
+def seeded_rng(seed: int, index: int) -> random.Random:
+    """
+    Create the random number generator for one generated input.
+
+    Every input is derived from its own generator so that any single input can be
+    regenerated from `(seed, index)` without replaying the inputs before it.
+
+    :param seed: The seed of the whole run.
+    :param index: The index of the input within the run.
+    :return: A seeded random number generator.
+    """
+    return random.Random((seed << 32) | index)
+
+
+def _always_valid(args: tuple) -> bool:
+    return True
+
+
+def shrink_value(value: Any) -> Iterator[Any]:
+    """
+    Yield simpler candidates for a value, simplest first.
+
+    :param value: The value to shrink.
+    :return: An iterator of candidate values.
+    """
+    if isinstance(value, bool):
+        return
+
+    if isinstance(value, int):
+        if value != 0:
+            yield 0
+            yield value // 2
+            yield value - (1 if value > 0 else -1)
+        return
+
+    if isinstance(value, float):
+        if value != 0:
+            yield 0.0
+            if value != round(value):
+                yield float(round(value))
+            yield value / 2
+        return
+
+    if isinstance(value, str | list | tuple):
+        if not value:
+            return
+        empty = value[:0]
+        yield empty
+        half = len(value) // 2
+        if half:
+            yield value[:half]
+            yield value[half:]
+        for i in range(len(value)):
+            yield value[:i] + value[i + 1 :]
+        if isinstance(value, str):
+            return
+        for i, element in enumerate(value):
+            for candidate in shrink_value(element):
+                replacement = [candidate] if isinstance(value, list) else (candidate,)
+                yield value[:i] + replacement + value[i + 1 :]
+        return
+
+    if isinstance(value, np.ndarray) and value.ndim >= 1 and len(value) > 1:
+        yield value[: len(value) // 2].copy()
+        yield value[1:].copy()
+
+
+def shrink_args(args: tuple) -> Iterator[tuple]:
+    """
+    Yield candidate argument tuples with one argument shrunk.
+
+    :param args: The positional arguments to shrink.
+    :return: An iterator of candidate argument tuples.
+    """
+    for i, arg in enumerate(args):
+        for candidate in shrink_value(arg):
+            yield (*args[:i], candidate, *args[i + 1 :])
+
+
+def _no_shrink(args: tuple) -> Iterator[tuple]:
+    yield from ()
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """
+    Dataclass representing how to generate random inputs for a question.
+
+    Attributes:
+        generate: Builds the positional arguments of one input from a random number
+            generator and a size hint.
+        shrink: Yields simpler candidate inputs for a failing input.
+        is_valid: Whether an input (usually a shrink candidate) is a legal input to
+            the question.
+        size: The default size hint passed to `generate`.
+    """
+
+    generate: Callable[[random.Random, int], tuple]
+    _: KW_ONLY
+    shrink: Callable[[tuple], Iterator[tuple]] = shrink_args
+    is_valid: Callable[[tuple], bool] = _always_valid
+    size: int = DEFAULT_SIZE
+
+    def example(self, seed: int, index: int, size: int | None = None) -> tuple:
+        """
+        Generate the input at `index` of a seeded run.
+
+        :param seed: The seed of the whole run.
+        :param index: The index of the input within the run.
+        :param size: The size hint (default: the strategy's size).
+        :return: The positional arguments of the input.
+        """
+        return self.generate(
+            seeded_rng(seed, index), self.size if size is None else size
+        )
+
+
+def _random_text(rng: random.Random, length: int, alphabet: str) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def _generate_string(rng: random.Random, size: int) -> tuple:
+    alphabet = string.ascii_letters + string.digits + " !?"
+    return (_random_text(rng, rng.randint(0, 2 * size), alphabet),)
+
+
+def _generate_password(rng: random.Random, size: int) -> tuple:
+    # Small alphabets make repeated characters (and so boundary cases) common
+    alphabet = rng.choice(
+        (
+            string.ascii_lowercase[:5],
+            string.ascii_letters,
+            string.ascii_letters + "0123",
+        )
+    )
+    return (_random_text(rng, rng.randint(0, max(12, size)), alphabet),)
+
+
+def _generate_celsius(rng: random.Random, size: int) -> tuple:
+    # The size hint bounds the number of elements, not the length of each axis
+    shape = []
+    for _ in range(rng.randint(1, 3)):
+        length = rng.randint(1, max(1, size))
+        shape.append(length)
+        size //= length
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    return (np.round(np_rng.uniform(-100, 100, shape), 2),)
+
+
+def _generate_students(rng: random.Random, size: int) -> tuple:
+    n = rng.randint(3, max(3, size))
+    ids = list(range(1, n + 1))
+    student_ids = ids.copy()
+    rng.shuffle(student_ids)
+    students = pd.DataFrame(
+        {
+            "id": ids,
+            "fname": [rng.choice(_FIRST_NAMES) for _ in ids],
+            "lname": [rng.choice(_LAST_NAMES) for _ in ids],
+        }
+    )
+    # Scores are distinct so that the top three are unambiguous
+    test_results = pd.DataFrame(
+        {"id": ids, "studentid": student_ids, "score": rng.sample(range(101), n)}
+    )
+    return students, test_results
+
+
+def _generate_objects(rng: random.Random, size: int) -> tuple:
+    return (rng.randint(1, 100 * size),)
+
+
+def _format_time(hour_24: int) -> str:
+    period = "PM" if hour_24 >= 12 else "AM"
+    return f"{(hour_24 - 1) % 12 + 1}:00 {period}"
+
+
+def _parse_time(time: str) -> int | None:
+    try:
+        clock, period = time.split(" ")
+        hour, minutes = clock.split(":")
+        hour = int(hour)
+    except ValueError:
+        return None
+    if minutes != "00" or period not in {"AM", "PM"} or not 1 <= hour <= 12:
+        return None
+    return hour % 12 + (12 if period == "PM" else 0)
+
+
+def _generate_times(rng: random.Random, size: int) -> tuple:
+    start = rng.randint(0, 23)
+    end = rng.randint(start, 23)
+    return _format_time(start), _format_time(end)
+
+
+def _valid_times(args: tuple) -> bool:
+    start, end = (_parse_time(time) for time in args)
+    return start is not None and end is not None and start <= end
+
+
+def _shrink_times(args: tuple) -> Iterator[tuple]:
+    # Shrinking the strings themselves never yields a valid time, so walk the
+    # 24-hour values towards midnight instead
+    start, end = (_parse_time(time) for time in args)
+    for new_start, new_end in (
+        (0, end - start),
+        (start - 1, end - 1),
+        (start, end - 1),
+    ):
+        if 0 <= new_start <= new_end:
+            yield _format_time(new_start), _format_time(new_end)
+
+
+def _generate_factorial_candidate(rng: random.Random, size: int) -> tuple:
+    factorial = math.factorial(rng.randint(0, size + 5))
+    return (max(1, factorial + rng.choice((0, 0, -1, 1, rng.randint(-10, 10)))),)
+
+
+def _valid_positive_int(args: tuple) -> bool:
+    return args[0] >= 1
+
+
+def _generate_points(rng: random.Random, size: int) -> tuple:
+    radius = rng.randint(0, 10)
+    center_x = rng.randint(-10, 10)
+    center_y = rng.randint(-10, 10)
+    points = []
+    for _ in range(rng.randint(0, size)):
+        if rng.random() < 0.3:
+            # Points exactly on the edge of the circle
+            dx, dy = rng.choice(((radius, 0), (0, -radius), (-radius, 0)))
+            points.append((center_x + dx, center_y + dy))
+        else:
+            points.append((rng.randint(-20, 20), rng.uniform(-20, 20)))
+    return points, center_x, center_y, radius
+
+
+def _valid_circle(args: tuple) -> bool:
+    return args[3] >= 0
+
+
+def _generate_reversible_int(rng: random.Random, size: int) -> tuple:
+    x = rng.choice(
+        (
+            rng.randint(-1000, 1000),
+            rng.randint(INT32_MIN, INT32_MAX),
+            rng.randint(10**8, INT32_MAX),  # Reversal often overflows
+            rng.randint(INT32_MAX - 10, INT32_MAX + 10),
+            rng.randint(INT32_MIN - 10, INT32_MIN + 10),
+            rng.randint(1, 9) * 10 ** rng.randint(0, 12),
+        )
+    )
+    return (x,)
+
+
+def _has_unique_top_pair(transactions: list[list[str]]) -> bool:
+    if any(len(set(transaction)) != len(transaction) for transaction in transactions):
+        return False
+    counts = Counter(
+        pair
+        for transaction in transactions
+        for pair in combinations(sorted(transaction), 2)
+    ).most_common(2)
+    return bool(counts) and (len(counts) == 1 or counts[0][1] > counts[1][1])
+
+
+def _generate_transactions(rng: random.Random, size: int) -> tuple:
+    items = list(_ITEMS)
+    transactions = [
+        rng.sample(items, rng.randint(1, 4)) for _ in range(rng.randint(1, size))
+    ]
+    # Plant a popular pair until the most common pair is unique
+    planted = rng.sample(items, 2)
+    while not _has_unique_top_pair(transactions):
+        transactions.append(
+            [*planted, *rng.sample(sorted(set(items) - set(planted)), 1)]
+        )
+    return (transactions,)
+
+
+def _valid_transactions(args: tuple) -> bool:
+    return _has_unique_top_pair(args[0])
+
+
+def _generate_fibonacci_index(rng: random.Random, size: int) -> tuple:
+    return (rng.randint(-5, 10 * size),)
+
+
+def _generate_correlated(rng: random.Random, size: int) -> tuple:
+    n = rng.randint(2, max(2, size))
+    slope = rng.uniform(-3, 3)
+    x = [rng.uniform(-10, 10) for _ in range(n)]
+    y = [slope * xi + rng.gauss(0, 2) for xi in x]
+    if rng.random() < 0.1:
+        y.pop()
+    return x, y
+
+
+def _valid_correlated(args: tuple) -> bool:
+    x, y = args
+    if len(x) != len(y):
+        return True
+    min_length = 2
+    return len(x) >= min_length and len(set(x)) > 1 and len(set(y)) > 1
+
+
+@dataclass(frozen=True)
+class LinearGradient:
+    """
+    Picklable gradient function `slope * x + intercept` of a quadratic loss.
+
+    Attributes:
+        slope: The slope of the gradient, which must be positive for a minimum.
+        intercept: The intercept of the gradient.
+    """
+
+    slope: float
+    intercept: float
+
+    def __call__(self, x: float) -> float:
+        return self.slope * x + self.intercept
+
+
+def _generate_descent(rng: random.Random, size: int) -> tuple:
+    gradient = LinearGradient(rng.uniform(0.5, 4), rng.uniform(-10, 10))
+    # Keep `lr * slope < 1` so that every trajectory converges
+    lr = rng.uniform(0.001, 0.99) / gradient.slope
+    return gradient, rng.uniform(-50, 50), lr, rng.randint(0, 10 * size)
+
+
+def _valid_descent(args: tuple) -> bool:
+    gradient, _, lr, n_iters = args
+    return n_iters >= 0 and 0 <= lr * gradient.slope < 1
+
+
+def _generate_regression(rng: random.Random, size: int) -> tuple:
+    p = rng.randint(1, 2)
+    n = rng.randint(p + 2, max(p + 2, size))
+    coefficients = [rng.uniform(-10, 10) for _ in range(p + 1)]
+    X = [[round(rng.uniform(-10, 10), 2) for _ in range(p)] for _ in range(n)]
+    y = [
+        coefficients[0]
+        + sum(b * x for b, x in zip(coefficients[1:], row, strict=True))
+        + rng.gauss(0, 1)
+        for row in X
+    ]
+    return X, y
+
+
+def _valid_regression(args: tuple) -> bool:
+    X, y = args
+    if not X or len(X) != len(y) or len({len(row) for row in X}) != 1:
+        return False
+    p = len(X[0])
+    if not 1 <= p <= 2 or len(X) <= p + 1:
+        return False
+    # Reject (near) collinear designs, where the normal equations are singular
+    design = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=float)])
+    return np.linalg.cond(design) < 1e6
+
+
+def _shrink_regression(args: tuple) -> Iterator[tuple]:
+    X, y = args
+    for i in range(len(X)):
+        yield X[:i] + X[i + 1 :], y[:i] + y[i + 1 :]
+    for i, row in enumerate(X):
+        rounded = [float(round(value)) for value in row]
+        if rounded != row:
+            yield [*X[:i], rounded, *X[i + 1 :]], y
+
+
+STRATEGIES: dict[int, Strategy] = {
+    0: Strategy(_generate_string),
+    1: Strategy(_generate_password),
+    2: Strategy(_generate_password),
+    3: Strategy(_generate_celsius, size=5),
+    4: Strategy(_generate_students, shrink=_no_shrink),
+    5: Strategy(_generate_objects, is_valid=_valid_positive_int),
+    6: Strategy(_generate_times, shrink=_shrink_times, is_valid=_valid_times),
+    7: Strategy(_generate_factorial_candidate, is_valid=_valid_positive_int),
+    8: Strategy(_generate_points, is_valid=_valid_circle),
+    9: Strategy(_generate_reversible_int),
+    10: Strategy(_generate_transactions, is_valid=_valid_transactions),
+    11: Strategy(_generate_fibonacci_index),
+    12: Strategy(_generate_correlated, is_valid=_valid_correlated),
+    13: Strategy(_generate_descent, is_valid=_valid_descent),
+    14: Strategy(
+        _generate_regression, shrink=_shrink_regression, is_valid=_valid_regression
+    ),
+}
+
+
+def large_points(
+    seed: int, size: int, queries: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Generate a large input for batched point-in-circle counting.
+
+    A tenth of the points are on an integer lattice and every circle has an integer
+    center and radius, so many points are exactly on the edges of circles.
+
+    :param seed: The random seed.
+    :param size: The number of points.
+    :param queries: The number of circles.
+    :return: A 4-tuple of the points as an array of shape (size, 2), and the x
+        coordinates of the centers, y coordinates of the centers, and radii of the
+        circles.
+    """
+    np_rng = np.random.default_rng(seed)
+    points = np_rng.uniform(-1000, 1000, (size, 2))
+    lattice = size // 10
+    points[:lattice] = np_rng.integers(-1000, 1001, (lattice, 2))
+    center_x, center_y = np_rng.integers(-1000, 1001, (2, queries)).astype(np.float64)
+    radius = np_rng.integers(0, 101, queries).astype(np.float64)
+    return points, center_x, center_y, radius
+
+
+def large_transactions(seed: int, size: int, items: int = 1000) -> list[list[str]]:
+    """
+    Generate a large input for frequent-pair counting.
+
+    Item popularity follows Zipf's law, as in real shopping baskets, so a few pairs
+    are common and most are rare. Transactions may repeat an item.
+
+    :param seed: The random seed.
+    :param size: The number of transactions.
+    :param items: The number of distinct items (default: 1000)
+    :return: The transactions, each a list of 1 to 8 item names.
+    """
+    np_rng = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, items + 1)
+    names = np.array([f"item_{i:05d}" for i in np_rng.permutation(items)], dtype=object)
+    lengths = np_rng.integers(1, 9, size)
+    flat = names[
+        np_rng.choice(items, int(lengths.sum()), p=popularity / popularity.sum())
+    ].tolist()
+    ends = np.cumsum(lengths).tolist()
+    return [flat[end - length : end] for end, length in zip(ends, lengths.tolist())]
+
+
+def large_correlated(seed: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate a large input for one-pass correlation.
+
+    The values are far from zero relative to their spread, where accumulating raw
+    sums of squares loses every significant digit.
+
+    :param seed: The random seed.
+    :param size: The number of pairs.
+    :return: A 2-tuple of the x and y values.
+    """
+    np_rng = np.random.default_rng(seed)
+    x = np_rng.normal(1e6, 10, size)
+    y = np_rng.uniform(-3, 3) * x + np_rng.normal(0, 20, size)
+    return x, y
+
+
+def large_regression(
+    seed: int, size: int, features: int = 20
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate a large input for least-squares regression.
+
+    Features have means far from zero and are correlated with each other, so the
+    design matrix is poorly conditioned, as real data often is.
+
+    :param seed: The random seed.
+    :param size: The number of rows.
+    :param features: The number of features (default: 20)
+    :return: A 2-tuple of the features, a C-contiguous array of shape
+        (size, features), and the targets.
+    """
+    np_rng = np.random.default_rng(seed)
+    mixing = np.eye(features) + np_rng.uniform(-0.5, 0.5, (features, features))
+    X = np_rng.normal(0, 1, (size, features)) @ mixing + np_rng.uniform(
+        -100, 100, features
+    )
+    coefficients = np_rng.uniform(-10, 10, features + 1)
+    y = coefficients[0] + X @ coefficients[1:] + np_rng.normal(0, 1, size)
+    return np.ascontiguousarray(X), y
+
+
+def large_descent(
+    seed: int, size: int
+) -> tuple[LinearGradient, np.ndarray, np.ndarray]:
+    """
+    Generate a large sweep of starting points and learning rates for gradient descent.
+
+    :param seed: The random seed.
+    :param size: The number of trajectories.
+    :return: A 3-tuple of the gradient function, and the starting point and learning
+        rate of each trajectory, every one of which converges.
+    """
+    np_rng = np.random.default_rng(seed)
+    gradient = LinearGradient(
+        float(np_rng.uniform(0.5, 4)), float(np_rng.uniform(-10, 10))
+    )
+    x_0 = np_rng.uniform(-50, 50, size)
+    lr = np_rng.uniform(0.001, 0.99, size) / gradient.slope
+    return gradient, x_0, lr
+
+
+def large_times(seed: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate a large input for bulk hours between 12-hour times.
+
+    :param seed: The random seed.
+    :param size: The number of pairs of times.
+    :return: A 2-tuple of the start times and the end times, none before its start.
+    """
+    np_rng = np.random.default_rng(seed)
+    start = np_rng.integers(0, 24, size)
+    end = np_rng.integers(start, 24)
+    formatted = np.array([_format_time(hour) for hour in range(24)], dtype=object)
+    return formatted[start], formatted[end]
+
+
+def large_reversible_ints(seed: int, size: int) -> np.ndarray:
+    """
+    Generate a large input for bulk digit reversal.
+
+    Like `_generate_reversible_int` the integers mix small values, values whose
+    reversal often overflows, values at and beyond the 32-bit bounds, and powers of
+    ten times a digit.
+
+    :param seed: The random seed.
+    :param size: The number of integers.
+    :return: The integers.
+    """
+    np_rng = np.random.default_rng(seed)
+    kinds = (
+        np_rng.integers(-1000, 1001, size),
+        np_rng.integers(INT32_MIN, INT32_MAX, size, endpoint=True),
+        np_rng.integers(10**8, INT32_MAX, size, endpoint=True),
+        np_rng.integers(INT32_MAX - 10, INT32_MAX + 10, size, endpoint=True),
+        np_rng.integers(INT32_MIN - 10, INT32_MIN + 10, size, endpoint=True),
+        np_rng.integers(1, 10, size) * 10 ** np_rng.integers(0, 13, size),
+    )
+    return np.choose(np_rng.integers(0, len(kinds), size), kinds)
@@ -5,11 +5,19 @@ import os
 import re
 import traceback as tb
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from compare import GENERATED_SIZE, ROUNDS, SolutionError, compare
 from examples_local import examples
 from marker import Marker, Result
+from profiling import Profiler
+from value_diff import find_mismatch, short_repr
 
-marker = Marker()
+if TYPE_CHECKING:
+    from marker import TestCaseOutput
+
+# Only keep what the first call of each test prints, not the timed calls
+marker = Marker(discard_timed_output=True)
 
 GREEN = "\33[32m"
 RED = "\033[91m"
@@ -28,20 +36,24 @@ def red_print(text: str) -> None:
     print_colour(text, RED)
 
 
-def main(arguments: list[str] | None = None) -> None:
-    # argparser
-    parser = argparse.ArgumentParser()
-    parser.add_argument("question", help="The question to test")
-    args = parser.parse_args(arguments)
+def print_output(test_case_result: TestCaseOutput) -> None:
+    """Print the tail of what the solution printed while it was marked."""
+    if test_case_result.stdout:
+        print(f"Printed output:\n{test_case_result.stdout}")
+    if test_case_result.stderr:
+        print(f"Printed errors:\n{test_case_result.stderr}")
 
-    # get user entered question
-    q = args.question
 
-    # grab the question from examples based on question number
-    question = examples[int(q)]
+def find_solution_file(question: int | str, folder: str = "solutions") -> Path:
+    """
+    Find the solution file for a question.
 
-    folder = "solutions"
-    pattern = re.compile("team_(.+)_question_" + q + ".py")
+    :param question: The question number.
+    :param folder: The folder containing the solution files (default: solutions)
+    :return: The path to the solution file.
+    :raises FileNotFoundError: If there is no solution file for the question.
+    """
+    pattern = re.compile(f"team_(.+)_question_{question}.py")
     filename = None
     for file in os.listdir(folder):
         if pattern.fullmatch(file):
@@ -53,10 +65,90 @@ def main(arguments: list[str] | None = None) -> None:
             "Make sure you have a file at solutions/team_{team_name}_question_{q}.py."
         )
         raise FileNotFoundError(msg)
+    return filename
+
+
+def main(arguments: list[str] | None = None) -> None:
+    # argparser
+    parser = argparse.ArgumentParser()
+    parser.add_argument("question", help="The question to test")
+    parser.add_argument(
+        "--profile",
+        metavar="FOLDER",
+        help="Save a profile of the timed calls of each passing test to FOLDER",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=[profiler.value for profiler in Profiler],
+        default=Profiler.SAMPLING.value,
+        help="The profiler to use with --profile",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="Instead of marking, compare the speed of FILE against the solution",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=ROUNDS, help="Pairs of samples with --compare"
+    )
+    parser.add_argument(
+        "--generated",
+        type=int,
+        default=0,
+        help="Also compare on this many large generated inputs with --compare",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=GENERATED_SIZE,
+        help="The size of generated inputs with --compare",
+    )
+    args = parser.parse_args(arguments)
+
+    # get user entered question
+    q = args.question
+
+    # grab the question from examples based on question number
+    question = examples[int(q)]
+
+    filename = find_solution_file(q)
+
+    if args.compare is not None:
+        print(f"Comparing {args.compare} (B) against {filename} (A)\n")
+        try:
+            comparisons = compare(
+                question,
+                filename,
+                args.compare,
+                rounds=args.rounds,
+                generated=args.generated,
+                generated_size=args.size,
+            )
+        except SolutionError as error:
+            red_print(f"{error.label}: FAIL (solution {error.solution})")
+            if len(error.input_args) == 1:
+                (input_args,) = error.input_args
+            else:
+                input_args = error.input_args
+            print(f"Input: {short_repr(input_args)}")
+            tb.print_exception(error.__cause__)
+            return
+        for comparison in comparisons:
+            print_colour(str(comparison), GREEN if comparison.outputs_match else RED)
+        return
 
     # mark the question
     print(f"Testing question {q}\n")
-    results = marker.mark(question, filename)
+    test_marker = (
+        marker
+        if args.profile is None
+        else Marker(
+            profile_dir=args.profile,
+            profiler=args.profiler,
+            discard_timed_output=True,
+        )
+    )
+    results = test_marker.mark(question, filename)
 
     for i, test_case_result in enumerate(results.test_case_results):
         if test_case_result.result == Result.FAILED:
@@ -66,17 +158,26 @@ def main(arguments: list[str] | None = None) -> None:
                 (input_args,) = test_case.input_args
             else:
                 input_args = test_case.input_args
-            print(f"Input: {input_args}")
-            print(f"Expected output: {test_case.expected_output}")
-            print(f"Received output: {test_case_result.output}")
+            print(f"Input: {short_repr(input_args)}")
+            if test_case_result.exception:
+                print(f"Expected output: {short_repr(test_case.expected_output)}")
+            else:
+                print(find_mismatch(test_case.expected_output, test_case_result.output))
+
+            print_output(test_case_result)
 
             if isinstance(test_case_result.message, Exception):
                 tb.print_exception(test_case_result.message)
             else:
                 print(f"Message: {test_case_result.message}")
+            if test_case_result.hot_frames:
+                print(f"Where the time went:\n{test_case_result.hot_frames}")
 
         else:
             green_print(f"Test {i+1}: PASS")
+            print_output(test_case_result)
+            if test_case_result.profile:
+                print(f"Profile: {test_case_result.profile}.pstats")
             print("\n")
 
 
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from batch import Job, mark_tiered, select_contenders
+from marker import BonusResult, Results
+
+
+def _marked(runtimes: dict[str, float | None]) -> list[tuple[Job, Results]]:
+    """Results of question 0 for each team, which failed if its runtime is None."""
+    return [
+        (
+            Job(team, 0, Path(f"team_{team}_question_0.py")),
+            Results([], BonusResult.NA, 0 if runtime is None else 1, runtime or 0),
+        )
+        for team, runtime in runtimes.items()
+    ]
+
+
+def _teams(jobs: list[Job]) -> list[str]:
+    return [job.team for job in jobs]
+
+
+def test_the_fastest_passing_submissions_are_contenders() -> None:
+    marked = _marked({"a": 4.0, "b": 1.0, "c": None, "d": 3.0, "e": 2.0})
+    assert _teams(select_contenders(marked, top_k=2, within=0)) == ["b", "e"]
+
+
+def test_submissions_close_to_the_fastest_are_contenders() -> None:
+    marked = _marked({"a": 1.0, "b": 1.05, "c": 1.1, "d": 1.2})
+    assert _teams(select_contenders(marked, top_k=1, within=0.1)) == ["a", "b", "c"]
+
+
+def test_contenders_are_selected_per_question() -> None:
+    marked = [
+        *_marked({"a": 1.0, "b": 2.0}),
+        (
+            Job("b", 1, Path("team_b_question_1.py")),
+            Results([], BonusResult.NA, 1, 5.0),
+        ),
+    ]
+    contenders = select_contenders(marked, top_k=1, within=0)
+    assert [(job.team, job.question_number) for job in contenders] == [
+        ("a", 0),
+        ("b", 1),
+    ]
+
+
+def test_only_contenders_are_re_timed(tmp_path: Path) -> None:
+    sources = {
+        "fast": "def Solution(string):\n    return string[::-1]\n",
+        "slow": "import time\n\n\ndef Solution(string):\n"
+        "    time.sleep(0.005)\n    return string[::-1]\n",
+        "wrong": "def Solution(string):\n    return string\n",
+    }
+    jobs = []
+    for team, source in sources.items():
+        filepath = tmp_path / f"team_{team}_question_0.py"
+        filepath.write_text(source)
+        jobs.append(Job(team, 0, filepath))
+
+    marked, contenders = mark_tiered(jobs, top_k=1, within=0.1)
+    assert _teams(contenders) == ["fast"]
+    assert [job for job, _ in marked] == jobs
+    assert [results.points > 0 for _, results in marked] == [True, True, False]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks import (
+    BENCHMARKS,
+    Benchmark,
+    find_regressions,
+    load_baseline,
+    runner,
+    save_baseline,
+    time_callable,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_time_callable_measures_a_call() -> None:
+    seconds = time_callable(lambda: time.sleep(0.001), repeats=2)
+    assert seconds >= 0.001
+
+
+def test_baselines_are_merged(tmp_path: Path) -> None:
+    path = tmp_path / "baseline" / "baseline.json"
+    save_baseline({"a[1]": 1.0, "b[1]": 2.0}, path)
+    save_baseline({"b[1]": 3.0, "c[1]": 4.0}, path)
+    assert load_baseline(path) == {"a[1]": 1.0, "b[1]": 3.0, "c[1]": 4.0}
+
+
+def test_regressions_beyond_the_threshold_are_found_worst_first() -> None:
+    baseline = {"a[1]": 1.0, "b[1]": 1.0, "c[1]": 1.0, "d[1]": 1.0}
+    timings = {"a[1]": 1.1, "b[1]": 1.5, "c[1]": 3.0, "d[1]": 0.5, "new[1]": 9.0}
+    regressions = find_regressions(timings, baseline, threshold=0.2)
+    assert [regression.key for regression in regressions] == ["c[1]", "b[1]"]
+    assert regressions[0].slowdown == pytest.approx(2)
+
+
+def test_every_benchmark_runs_at_its_smallest_size() -> None:
+    for bench in BENCHMARKS.values():
+        bench.setup(min(bench.sizes))()
+
+
+def test_a_slower_run_fails_against_the_saved_baseline(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    size = 1_000
+    bench = Benchmark("loop", lambda _: lambda: sum(range(size)))
+    monkeypatch.setattr(runner, "BENCHMARKS", {"loop": bench})
+    baseline = tmp_path / "baseline.json"
+    # A wide threshold, so only the tenfold slowdown is a regression
+    arguments = ["--baseline", str(baseline), "--repeats", "2", "--threshold", "2"]
+
+    assert runner.main([*arguments, "--save"]) == 0
+    assert set(load_baseline(baseline)) == {"loop[1]"}
+    assert runner.main(arguments) == 0
+    size = 10_000
+    assert runner.main(arguments) == 1
+    assert "1 regression(s)" in capsys.readouterr().out
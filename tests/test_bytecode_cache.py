@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from types import CodeType
+from typing import TYPE_CHECKING
+
+import pytest
+
+import bytecode_cache
+from bytecode_cache import BytecodeCache, source_hash
+from marker import Marker
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+_SOURCE = b"def Solution(x):\n    def double(y):\n        return 2 * y\n    return double(x)\n"
+
+
+def _run(code: object) -> int:
+    namespace = {}
+    exec(code, namespace)  # noqa: S102
+    return namespace["Solution"](21)
+
+
+def _filenames(code: CodeType) -> Iterator[str]:
+    yield code.co_filename
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _filenames(const)
+
+
+def _no_compiling(monkeypatch: pytest.MonkeyPatch) -> None:
+    def compile(*args: object, **kwargs: object) -> None:
+        pytest.fail("The source was compiled again")
+
+    monkeypatch.setattr(bytecode_cache, "compile", compile, raising=False)
+
+
+def test_a_miss_compiles_and_a_hit_does_not(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = BytecodeCache(tmp_path / "cache")
+    assert _run(cache.get_code(_SOURCE, "a.py")) == 42
+    entries = list(cache.directory.iterdir())
+    assert entries == [cache.path_for(source_hash(_SOURCE))]
+
+    _no_compiling(monkeypatch)
+    assert _run(cache.get_code(_SOURCE, "a.py")) == 42
+    assert _run(BytecodeCache(cache.directory).get_code(_SOURCE, "a.py")) == 42
+
+
+def test_identical_source_at_another_path_shares_the_entry(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = BytecodeCache(tmp_path)
+    cache.get_code(_SOURCE, "a.py")
+    _no_compiling(monkeypatch)
+    code = cache.get_code(_SOURCE, "b.py")
+    # Tracebacks point at the file being loaded, inside nested functions too
+    assert set(_filenames(code)) == {"b.py"}
+    assert set(_filenames(cache.get_code(_SOURCE, "a.py"))) == {"a.py"}
+
+
+def test_changed_source_misses(tmp_path: Path) -> None:
+    cache = BytecodeCache(tmp_path)
+    cache.get_code(_SOURCE, "a.py")
+    changed = _SOURCE.replace(b"2 * y", b"3 * y")
+    assert _run(cache.get_code(changed, "a.py")) == 63
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_a_corrupt_entry_is_compiled_again(tmp_path: Path) -> None:
+    cache = BytecodeCache(tmp_path)
+    path = cache.path_for(source_hash(_SOURCE))
+    path.write_bytes(b"\x00not marshal")
+    assert _run(cache.get_code(_SOURCE, "a.py")) == 42
+    assert path.read_bytes() != b"\x00not marshal"
+
+
+def test_marker_loads_edited_files_afresh(tmp_path: Path) -> None:
+    filepath = tmp_path / "team_a_question_0.py"
+    cache = BytecodeCache(tmp_path / "cache")
+    for source, expected in (_SOURCE, 42), (_SOURCE.replace(b"2 *", b"4 *"), 84):
+        filepath.write_bytes(source)
+        module = Marker._import_module_from_file(
+            "solution", filepath, bytecode_cache=cache
+        )
+        assert module.Solution(21) == expected
+    assert len(list(cache.directory.iterdir())) == 2
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from typing import TYPE_CHECKING
+
+from batch import Job, mark_batch
+from calibration import CALIBRATION_INTERVAL, WORKLOADS, Calibration, calibrate
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_calibration_times_every_workload() -> None:
+    calibration = calibrate(repeats=1)
+    assert set(calibration.timings) == set(WORKLOADS)
+    assert all(timing > 0 for timing in calibration.timings.values())
+    assert calibration.speed_factor > 0
+    assert not calibration.is_stale
+
+
+def test_calibration_goes_stale() -> None:
+    calibration = Calibration(1.0, measured_at=time.monotonic())
+    assert not calibration.is_stale
+    calibration = dataclasses.replace(
+        calibration, measured_at=time.monotonic() - CALIBRATION_INTERVAL - 1
+    )
+    assert calibration.is_stale
+
+
+def test_calibrated_batches_record_the_speed_factor(tmp_path: Path) -> None:
+    filepath = tmp_path / "team_a_question_0.py"
+    filepath.write_text("def Solution(string):\n    return string[::-1]\n")
+    jobs = [Job("a", 0, filepath)]
+
+    ((_, results),) = mark_batch(jobs, marker_options={"min_timing_time": 0.001})
+    assert results.speed_factor == 1
+    ((_, results),) = mark_batch(
+        jobs, marker_options={"min_timing_time": 0.001}, calibrated=True
+    )
+    assert results.speed_factor != 1
+    assert results.normalized_runtime == results.runtime / results.speed_factor
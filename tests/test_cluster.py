@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from batch import Job
+from cluster import Coordinator, _receive, _send, serve_worker
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class _Buffer:
+    """Stands in for a stream writer, collecting what is written."""
+
+    def __init__(self) -> None:
+        self.data = b""
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+
+def _round_trip(message: tuple, sent_with: bytes, received_with: bytes) -> tuple:
+    async def run() -> tuple:
+        buffer = _Buffer()
+        await _send(buffer, message, sent_with)
+        reader = asyncio.StreamReader()
+        reader.feed_data(buffer.data)
+        reader.feed_eof()
+        return await _receive(reader, received_with)
+
+    return asyncio.run(run())
+
+
+def test_frames_signed_with_the_secret_are_received() -> None:
+    message = ("result", 3, {"points": 1.0})
+    assert _round_trip(message, b"secret", b"secret") == message
+
+
+def test_frames_signed_with_another_secret_are_rejected() -> None:
+    with pytest.raises(ConnectionError):
+        _round_trip(("hello", "worker", 1), b"other", b"secret")
+
+
+class _WorkerThread(threading.Thread):
+    """Runs a worker daemon for one batch, keeping what it raised."""
+
+    def __init__(self, port: int, secret: bytes) -> None:
+        super().__init__(daemon=True)
+        self.port = port
+        self.secret = secret
+        self.error: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            serve_worker(
+                "127.0.0.1",
+                self.port,
+                secret=self.secret,
+                capacity=1,
+                marker_options={"min_timing_time": 0.001},
+                heartbeat_interval=0.2,
+                once=True,
+            )
+        except BaseException as exc:  # noqa: BLE001
+            self.error = exc
+
+
+def _jobs(folder: Path) -> list[Job]:
+    sources = {
+        "fast": "def Solution(string):\n    return string[::-1]\n",
+        "slow": "import time\n\n\ndef Solution(string):\n"
+        "    time.sleep(0.01)\n    return string[::-1]\n",
+        "wrong": "def Solution(string):\n    return string\n",
+        "broken": "def Solution(string):\n    raise ValueError(string)\n",
+    }
+    jobs = []
+    for team, source in sources.items():
+        filepath = folder / f"team_{team}_question_0.py"
+        filepath.write_text(source)
+        jobs.append(Job(team, 0, filepath))
+    return jobs
+
+
+def test_two_workers_mark_every_job(tmp_path: Path) -> None:
+    jobs = _jobs(tmp_path)
+    coordinator = Coordinator(jobs, secret=b"secret", port=0)
+    _, port = coordinator.start()
+    workers = [_WorkerThread(port, b"secret") for _ in range(2)]
+    for worker in workers:
+        worker.start()
+
+    marked = dict(coordinator.results())
+    for worker in workers:
+        worker.join(10)
+    assert {job.team: results.points > 0 for job, results in marked.items()} == {
+        "fast": True,
+        "slow": True,
+        "wrong": False,
+        "broken": False,
+    }
+    assert all(results.speed_factor != 1 for results in marked.values())
+    assert not any(worker.is_alive() for worker in workers)
+
+
+def test_a_worker_with_another_secret_gets_no_jobs(tmp_path: Path) -> None:
+    jobs = _jobs(tmp_path)[:1]
+    coordinator = Coordinator(jobs, secret=b"secret", port=0)
+    _, port = coordinator.start()
+
+    impostor = _WorkerThread(port, b"guess")
+    impostor.start()
+    impostor.join(10)
+    # The coordinator hangs up on the first frame it cannot verify
+    assert isinstance(impostor.error, asyncio.IncompleteReadError | ConnectionError)
+    assert coordinator._results.empty()
+
+    worker = _WorkerThread(port, b"secret")
+    worker.start()
+    ((job, results),) = coordinator.results()
+    worker.join(10)
+    assert job == jobs[0]
+    assert results.points > 0
+    assert worker.error is None
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from compare import SolutionError, compare
+from examples_local import examples
+from question import Question, TestCase
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_a_failing_solution_is_reported_with_its_input(tmp_path: Path) -> None:
+    working = tmp_path / "working.py"
+    working.write_text("def Solution(password):\n    return True\n")
+    failing = tmp_path / "failing.py"
+    failing.write_text("def Solution(password):\n    raise ValueError(password)\n")
+
+    with pytest.raises(SolutionError) as raised:
+        compare(examples[1], working, failing, rounds=2)
+    error = raised.value
+    assert (error.solution, error.label) == ("B", "Test 1")
+    assert error.input_args == examples[1].test_cases[0].input_args
+    assert isinstance(error.__cause__, ValueError)
+
+
+def test_timed_calls_do_not_modify_the_test_case(tmp_path: Path) -> None:
+    reference = tmp_path / "reference.py"
+    reference.write_text(
+        "def Solution(celsius_temps):\n    return celsius_temps * 9 / 5 + 32\n"
+    )
+    in_place = tmp_path / "in_place.py"
+    in_place.write_text(
+        "def Solution(celsius_temps):\n"
+        "    celsius_temps *= 9 / 5\n"
+        "    celsius_temps += 32\n"
+        "    return celsius_temps\n"
+    )
+    question = Question(3)
+    question.add_test_case(
+        TestCase(
+            input_args=(np.array([0, -40, 100.0]),),
+            expected_output=np.array([32, -40, 212.0]),
+        )
+    )
+
+    (comparison,) = compare(question, reference, in_place, rounds=2)
+    assert comparison.outputs_match
+    assert question.test_cases[0].input_args[0].tolist() == [0, -40, 100]
+
+
+def test_a_solution_failing_while_timed_is_reported(tmp_path: Path) -> None:
+    working = tmp_path / "working.py"
+    working.write_text("def Solution(password):\n    return True\n")
+    # Passes the first call, which is checked, then fails when timed
+    flaky = tmp_path / "flaky.py"
+    flaky.write_text(
+        "calls = []\n"
+        "def Solution(password):\n"
+        "    calls.append(password)\n"
+        "    if len(calls) > 1:\n"
+        "        raise RuntimeError\n"
+        "    return True\n"
+    )
+
+    with pytest.raises(SolutionError) as raised:
+        compare(examples[1], working, flaky, rounds=2)
+    error = raised.value
+    assert (error.solution, error.label) == ("B", "Test 1")
+    assert isinstance(error.__cause__, RuntimeError)
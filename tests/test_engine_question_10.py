@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+from itertools import combinations
+from typing import TYPE_CHECKING
+
+import pytest
+
+from engines.question_10 import PairCounter, Solution, count_pairs, read_baskets
+from references.question_10 import Solution as reference
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _reference_counts(transactions: list[list[str]]) -> list:
+    return Counter(
+        pair
+        for transaction in transactions
+        for pair in combinations(sorted(set(transaction)), 2)
+    ).most_common()
+
+
+def _random_transactions(seed: int, size: int) -> list[list[str]]:
+    # Few distinct items, so most pairs tie with others
+    rng = random.Random(seed)
+    items = ["apple", "bread", "cheese", "dates", "eggs", "figs"]
+    return [rng.choices(items, k=rng.randint(0, 5)) for _ in range(size)]
+
+
+# Every pair occurs once, so the ranking is decided by ties alone
+_TIES = [["b", "a"], ["d", "c"], ["a", "c"], ["c", "b", "a"]]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1_000])
+@pytest.mark.parametrize(
+    "transactions", [_TIES, _random_transactions(0, 50), _random_transactions(1, 200)]
+)
+def test_counts_and_ties_match_counter(
+    transactions: list[list[str]], chunk_size: int
+) -> None:
+    counter = count_pairs(transactions, chunk_size=chunk_size)
+    assert counter.transactions == len(transactions)
+    assert counter.most_common() == _reference_counts(transactions)
+    assert counter.most_common(2) == _reference_counts(transactions)[:2]
+
+
+def test_updates_with_new_and_known_pairs() -> None:
+    counter = PairCounter()
+    counter.update([["x", "y"]])
+    counter.update([])
+    counter.update([["z"], ["y", "x", "x"], ["y", "z"]])
+    assert counter.most_common() == [(("x", "y"), 2), (("y", "z"), 1)]
+
+
+@pytest.mark.parametrize("transactions", [[], [[]], [["a"], ["b"]], [["a", "a"]]])
+def test_no_pairs(transactions: list[list[str]]) -> None:
+    assert count_pairs(transactions).most_common() == []
+
+
+def test_solution_matches_the_reference() -> None:
+    for seed in range(5):
+        transactions = _random_transactions(seed, 30)
+        assert Solution(transactions) == reference(transactions)
+    assert Solution(_TIES) == reference(_TIES)
+
+
+def test_read_baskets(tmp_path: Path) -> None:
+    path = tmp_path / "baskets.csv"
+    path.write_text("b,a\n\nc,a,b\n", encoding="utf-8")
+    assert list(read_baskets(path)) == [["b", "a"], [], ["c", "a", "b"]]
+    assert count_pairs(read_baskets(path), chunk_size=1).most_common() == [
+        (("a", "b"), 2),
+        (("a", "c"), 1),
+        (("b", "c"), 1),
+    ]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+import random
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from engines.question_12 import CorrelationAccumulator, Solution, accumulate
+from references.question_12 import Solution as reference
+
+
+def _correlated(seed: int, size: int, offset: float = 0) -> tuple[list, list]:
+    rng = random.Random(seed)
+    x = [offset + rng.gauss(0, 1) for _ in range(size)]
+    y = [offset + xi * 0.5 + rng.gauss(0, 1) for xi in x]
+    return x, y
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 10, 11, 1_000])
+@pytest.mark.parametrize("offset", [0, 1e6])
+def test_chunked_correlation_matches_the_reference(
+    chunk_size: int, offset: float
+) -> None:
+    x, y = _correlated(0, 10, offset)
+    expected = reference(x, y)
+    for values_x, values_y in [(x, y), (np.array(x), np.array(y)), (iter(x), iter(y))]:
+        accumulator = accumulate(values_x, values_y, chunk_size=chunk_size)
+        assert accumulator.count == len(x)
+        assert math.isclose(accumulator.correlation, expected, rel_tol=1e-9)
+
+
+def test_merged_parts_match_the_reference() -> None:
+    x, y = _correlated(1, 100, 1e3)
+    bounds = [0, 1, 17, 17, 60, 100]
+    parts = [
+        CorrelationAccumulator.of(x[start:end], y[start:end])
+        for start, end in pairwise(bounds)
+    ]
+    expected = reference(x, y)
+    forwards = CorrelationAccumulator()
+    for part in parts:
+        forwards = forwards.merge(part)
+    backwards = CorrelationAccumulator()
+    for part in reversed(parts):
+        backwards = part.merge(backwards)
+    for merged in forwards, backwards:
+        assert merged.count == len(x)
+        assert math.isclose(merged.mean_x, sum(x) / len(x), rel_tol=1e-12)
+        assert math.isclose(merged.correlation, expected, rel_tol=1e-9)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4, 1_000])
+@pytest.mark.parametrize("lengths", [(4, 5), (5, 4), (0, 1), (1, 0)])
+def test_different_lengths_give_none(lengths: tuple[int, int], chunk_size: int) -> None:
+    x, y = [float(i) for i in range(lengths[0])], [float(i) for i in range(lengths[1])]
+    assert accumulate(x, y, chunk_size=chunk_size) is None
+    assert accumulate(iter(x), iter(y), chunk_size=chunk_size) is None
+    assert Solution(x, y) is None
+
+
+def test_no_values() -> None:
+    accumulator = accumulate([], [])
+    assert accumulator == CorrelationAccumulator()
+    with pytest.raises(ZeroDivisionError):
+        _ = accumulator.correlation
+    with pytest.raises(ZeroDivisionError):
+        reference([], [])
+
+
+def test_solution_matches_the_reference() -> None:
+    x, y = _correlated(2, 50)
+    assert math.isclose(Solution(x, y), reference(x, y), rel_tol=1e-12)
+    assert math.isclose(Solution([1.0, 2.0], [2.0, 1.0]), -1.0)
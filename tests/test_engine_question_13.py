@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from engines.question_13 import Solution, descend
+from references.question_13 import Solution as reference
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_STARTS = [-3.0, -0.5, 0.0, 1.0, 2.5, 10.0]
+_RATES = [0.01, 0.1, 0.5]
+
+_GRADIENTS = {
+    "array": lambda x: 2 * (x - 1),
+    "scalar only": lambda x: math.atan(x - 1),
+    # Accepts arrays, but combines their elements
+    "mixes elements": lambda x: x - np.mean(x),
+    "sums elements": lambda x: x + np.sum(x) - x,
+}
+
+
+@pytest.mark.parametrize("name", _GRADIENTS)
+def test_trajectories_match_the_reference(name: str) -> None:
+    gradient_func: Callable = _GRADIENTS[name]
+    x_0, lr = np.meshgrid(_STARTS, _RATES)
+    descent = descend(gradient_func, x_0, lr, 50)
+    assert descent.x.shape == x_0.shape
+    assert descent.x.tolist() == [
+        [reference(gradient_func, start, rate, 50) for start in _STARTS]
+        for rate in _RATES
+    ]
+
+
+def test_functions_mixing_elements_are_called_per_position() -> None:
+    # The first starting point is the mean, so its gradient alone is right
+    def gradient_func(x: float) -> float:
+        return x - np.mean(x)
+
+    starts = [1.0, 0.0, 2.0]
+    descent = descend(gradient_func, starts, 0.1, 5)
+    assert descent.x.tolist() == [
+        reference(gradient_func, start, 0.1, 5) for start in starts
+    ]
+
+
+def test_converged_trajectories_stop_early() -> None:
+    descent = descend(lambda x: x - 1, [1.0, 5.0], 1.0, 10)
+    assert descent.x.tolist() == [1.0, 1.0]
+    assert descent.iterations.tolist() == [1, 2]
+    assert descent.converged.tolist() == [True, True]
+
+
+def test_tolerance_stops_trajectories_that_barely_move() -> None:
+    descent = descend(lambda x: x, [1.0], 0.001, 1_000, tolerance=1e-3)
+    assert descent.iterations[0] < 1_000
+    assert descent.converged[0]
+
+
+@pytest.mark.parametrize("n_iters", [0, 1, 7])
+def test_solution_matches_the_reference(n_iters: int) -> None:
+    for gradient_func in _GRADIENTS.values():
+        assert Solution(gradient_func, 2.0, 0.1, n_iters) == reference(
+            gradient_func, 2.0, 0.1, n_iters
+        )
+
+
+def test_no_starting_points() -> None:
+    descent = descend(lambda x: x, [], 0.1, 10)
+    assert descent.x.shape == (0,)
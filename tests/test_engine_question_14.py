@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from engines.question_14 import (
+    NormalEquations,
+    Solution,
+    accumulate,
+    least_squares,
+)
+from references.question_14 import Solution as reference
+
+
+def _regression(seed: int, size: int, features: int) -> tuple[list, list]:
+    rng = random.Random(seed)
+    coefficients = [rng.uniform(-3, 3) for _ in range(features + 1)]
+    X = [[rng.uniform(-10, 10) for _ in range(features)] for _ in range(size)]
+    y = [
+        coefficients[0]
+        + sum(c * x for c, x in zip(coefficients[1:], row, strict=True))
+        + rng.gauss(0, 1)
+        for row in X
+    ]
+    return X, y
+
+
+@pytest.mark.parametrize("features", [1, 2])
+@pytest.mark.parametrize("size", [3, 4, 10, 500])
+def test_least_squares_matches_the_reference(size: int, features: int) -> None:
+    X, y = _regression(size, size, features)
+    np.testing.assert_allclose(least_squares(X, y), reference(X, y), rtol=1e-9)
+
+
+def test_one_dimensional_features() -> None:
+    X, y = _regression(0, 20, 1)
+    flat = [row[0] for row in X]
+    np.testing.assert_allclose(least_squares(flat, y), least_squares(X, y))
+
+
+def test_rank_deficient_designs_fall_back_to_lstsq() -> None:
+    # A repeated feature, and fewer rows than coefficients
+    X, y = _regression(1, 30, 1)
+    repeated = [[x, x] for (x,) in X]
+    for features, targets in (repeated, y), (X[:1], y[:1]):
+        design = np.column_stack([np.ones(len(features)), features])
+        np.testing.assert_allclose(
+            least_squares(features, targets),
+            np.linalg.lstsq(design, targets, rcond=None)[0],
+            atol=1e-9,
+        )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 1_000])
+@pytest.mark.parametrize("offset", [0, 1e6])
+def test_streamed_equations_match_the_reference(chunk_size: int, offset: float) -> None:
+    X, y = _regression(2, 64, 2)
+    # The reference's normal equations lose precision with large offsets, so
+    # compare the streamed equations with the QR solution
+    X = [[x + offset for x in row] for row in X]
+    expected = least_squares(X, y)
+    if not offset:
+        np.testing.assert_allclose(expected, reference(X, y), rtol=1e-9)
+    for values_x, values_y in [(X, y), (np.array(X), np.array(y)), (iter(X), iter(y))]:
+        equations = accumulate(values_x, values_y, chunk_size=chunk_size)
+        assert equations.gram[0, 0] == len(X)
+        np.testing.assert_allclose(equations.solve(), expected, rtol=1e-9)
+
+
+def test_merged_parts_match_the_reference() -> None:
+    X, y = _regression(3, 100, 2)
+    bounds = [0, 1, 17, 60, 100]
+    parts = [
+        NormalEquations.of(X[start:end], y[start:end])
+        for start, end in pairwise(bounds)
+    ]
+    forwards = parts[0]
+    for part in parts[1:]:
+        forwards = forwards.merge(part)
+    backwards = parts[-1]
+    for part in reversed(parts[:-1]):
+        backwards = part.merge(backwards)
+    for merged in forwards, backwards:
+        assert merged.gram[0, 0] == len(X)
+        np.testing.assert_allclose(merged.solve(), reference(X, y), rtol=1e-9)
+
+
+@pytest.mark.parametrize(("rows_x", "rows_y"), [(4, 5), (5, 4), (0, 0)])
+def test_different_numbers_of_rows_raise(rows_x: int, rows_y: int) -> None:
+    X, y = _regression(4, 5, 1)
+    with pytest.raises(ValueError):
+        accumulate(X[:rows_x], y[:rows_y], chunk_size=2)
+    if rows_x != rows_y:
+        with pytest.raises(ValueError):
+            least_squares(X[:rows_x], y[:rows_y])
+
+
+def test_solution_matches_the_reference() -> None:
+    X, y = _regression(5, 50, 2)
+    np.testing.assert_allclose(Solution(X, y), reference(X, y), rtol=1e-9)
+    assert isinstance(Solution(X, y), list)
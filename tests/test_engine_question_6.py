@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from engines.question_6 import Solution, hours_between, to_24_hour
+from references.question_6 import Solution as reference
+
+_TIMES = [f"{hour}:00 {period}" for period in ("AM", "PM") for hour in range(1, 13)]
+
+
+def test_every_pair_of_times_matches_the_reference() -> None:
+    start, end = np.meshgrid(_TIMES, _TIMES)
+    assert hours_between(start, end).tolist() == [
+        [reference(s, e) for s, e in zip(row_start, row_end, strict=True)]
+        for row_start, row_end in zip(start, end, strict=True)
+    ]
+
+
+def test_midnight_and_noon() -> None:
+    assert to_24_hour(["12:00 AM", "12:00 PM", "1:00 AM", "11:00 PM"]).tolist() == [
+        0,
+        12,
+        1,
+        23,
+    ]
+
+
+def test_repeated_and_equal_times() -> None:
+    start = ["3:00 PM"] * 4 + ["9:00 AM"]
+    end = ["3:00 PM", "5:00 PM", "3:00 PM", "1:00 AM", "9:00 AM"]
+    assert hours_between(start, end).tolist() == [
+        reference(s, e) for s, e in zip(start, end, strict=True)
+    ]
+
+
+@pytest.mark.parametrize("times", [[], ["7:00 AM"]])
+def test_empty_and_single_inputs(times: list[str]) -> None:
+    hours = hours_between(times, times)
+    assert hours.shape == (len(times),)
+    assert hours.tolist() == [0] * len(times)
+
+
+@pytest.mark.parametrize(
+    ("start", "end"), [("11:00 PM", "1:00 AM"), ("12:00 AM", "12:00 PM")]
+)
+def test_solution_matches_the_reference(start: str, end: str) -> None:
+    assert Solution(start, end) == reference(start, end)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from engines.question_8 import PointIndex, Solution
+from references.question_8 import Solution as reference
+
+
+def _random_points(seed: int, size: int) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    return [(rng.uniform(-10, 10), rng.uniform(-5, 5)) for _ in range(size)]
+
+
+# Integer points, many exactly on the edge of circles with integer radii
+_GRID_POINTS = [(x, y) for x in range(-6, 7) for y in range(-6, 7)]
+_CIRCLES = [
+    (0, 0, 5),
+    (0, 0, 0),
+    (3, 4, 5),
+    (0.5, -0.5, 2.5),
+    (-100, 100, 1),
+    (0, 0, 1_000),
+    (1, 1, -3),
+]
+
+
+@pytest.mark.parametrize("points_per_cell", [1, 4, 16, 1_000])
+@pytest.mark.parametrize("points", [_GRID_POINTS, _random_points(0, 500)])
+def test_counts_match_the_reference(
+    points: list[tuple[float, float]], points_per_cell: int
+) -> None:
+    index = PointIndex(points, points_per_cell=points_per_cell)
+    for center_x, center_y, radius in _CIRCLES:
+        expected = reference(points, center_x, center_y, radius)
+        assert index.count(center_x, center_y, radius) == expected
+        assert Solution(points, center_x, center_y, radius) == expected
+
+    center_x, center_y, radius = np.array(_CIRCLES, dtype=np.float64).T
+    assert index.count_many(center_x, center_y, radius).tolist() == [
+        reference(points, *circle) for circle in _CIRCLES
+    ]
+
+
+@pytest.mark.parametrize(
+    "points", [[], [(1.0, 2.0)], [(1.0, 2.0)] * 5, [(0.0, y) for y in range(10)]]
+)
+def test_degenerate_point_sets(points: list[tuple[float, float]]) -> None:
+    index = PointIndex(points)
+    assert len(index) == len(points)
+    for center_x, center_y, radius in _CIRCLES:
+        expected = reference(points, center_x, center_y, radius)
+        assert index.count(center_x, center_y, radius) == expected
+
+
+def test_count_many_broadcasts_and_keeps_the_shape() -> None:
+    index = PointIndex(_GRID_POINTS)
+    counts = index.count_many(0, 0, [[1, 2], [3, 4]])
+    assert counts.shape == (2, 2)
+    assert counts.tolist() == [
+        [reference(_GRID_POINTS, 0, 0, radius) for radius in row]
+        for row in [[1, 2], [3, 4]]
+    ]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from engines.question_9 import INT32_MAX, INT32_MIN, Solution, reverse_digits
+from references.question_9 import Solution as reference
+
+_EDGE_CASES = [
+    0,
+    1,
+    -1,
+    7,
+    10,
+    120,
+    -120,
+    1_000_000_000,
+    123_456_789,
+    1_463_847_412,
+    1_563_847_412,
+    -1_463_847_412,
+    -1_563_847_412,
+    INT32_MAX,
+    INT32_MIN,
+    INT32_MAX + 1,
+    INT32_MIN - 1,
+    10**12,
+    -(10**12),
+]
+
+
+def test_edge_cases_match_the_reference() -> None:
+    assert reverse_digits(_EDGE_CASES).tolist() == [reference(x) for x in _EDGE_CASES]
+
+
+def test_integers_too_big_for_int64() -> None:
+    values = [12, 10**30, -(10**30), -34]
+    assert reverse_digits(values).tolist() == [reference(x) for x in values]
+
+
+def test_repeated_values() -> None:
+    values = [21, 12, 21, 21, 12]
+    assert reverse_digits(values).tolist() == [12, 21, 12, 12, 21]
+
+
+def test_empty_input() -> None:
+    assert reverse_digits([]).tolist() == []
+
+
+@pytest.mark.parametrize("x", _EDGE_CASES)
+def test_solution_matches_the_reference(x: int) -> None:
+    assert Solution(x) == reference(x)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from examples_local import examples
+from marker import Marker, Result
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Slow on the first call with each input, then a dictionary lookup
+_MEMOIZING = """
+import functools
+import time
+
+
+@functools.cache
+def Solution(string):
+    time.sleep(0.05)
+    return string[::-1]
+"""
+
+
+def _write(folder: Path) -> Path:
+    filepath = folder / "team_a_question_0.py"
+    filepath.write_text(_MEMOIZING)
+    return filepath
+
+
+def test_cold_calls_cannot_reuse_cached_results(tmp_path: Path) -> None:
+    marker = Marker(fair_timing=True, min_timing_time=0.01)
+    results = marker.mark(examples[0], _write(tmp_path))
+    (test_case_result,) = results.test_case_results
+    assert test_case_result.result == Result.PASSED
+    assert test_case_result.runtime < 0.01
+    assert test_case_result.cold_runtime >= 0.05
+    assert results.cold_runtime == test_case_result.cold_runtime
+
+
+def test_cold_calls_are_only_timed_with_fair_timing(tmp_path: Path) -> None:
+    marker = Marker(min_timing_time=0.01)
+    results = marker.mark(examples[0], _write(tmp_path))
+    (test_case_result,) = results.test_case_results
+    assert test_case_result.cold_runtime == ""
+    assert results.cold_runtime == 0
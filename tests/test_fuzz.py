@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from func_timeout import FunctionTimedOut
+from fuzz import fuzz
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _submission(folder: Path, body: str) -> Path:
+    filepath = folder / "team_a_question_0.py"
+    filepath.write_text(f"def Solution(string):\n    {body}\n")
+    return filepath
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_a_matching_submission_passes(tmp_path: Path, workers: int) -> None:
+    filepath = _submission(tmp_path, "return string[::-1]")
+    report = fuzz(0, filepath, cases=300, workers=workers)
+    assert report.passed
+    assert report.cases_run == 300
+    assert report.timed_out_index is None
+
+
+def test_counterexamples_are_shrunk(tmp_path: Path) -> None:
+    filepath = _submission(tmp_path, "return string[::-1] if len(string) < 5 else ''")
+    report = fuzz(0, filepath, cases=100, workers=1, max_counterexamples=2)
+    assert not report.passed
+    assert len(report.counterexamples) == 2
+    for counterexample in report.counterexamples:
+        (shrunk,) = counterexample.shrunk_args
+        assert len(shrunk) == 5
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_fuzzing_stops_at_the_first_timeout(tmp_path: Path, workers: int) -> None:
+    filepath = _submission(tmp_path, "while True:\n        pass")
+    report = fuzz(0, filepath, cases=1_000, workers=workers, time_limit=0.1)
+    assert report.timed_out_index == 0
+    assert report.cases_run == 1
+    assert report.failing_indices == [0]
+    (counterexample,) = report.counterexamples
+    assert isinstance(counterexample.output, FunctionTimedOut)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from batch import Job, mark_batch
+from journal import Journal
+from marker import BonusResult, Results
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _results(points: float) -> Results:
+    return Results([], BonusResult.NA, points, 0.5)
+
+
+def test_a_torn_record_is_dropped_on_resume(tmp_path: Path) -> None:
+    path = tmp_path / "journal"
+    with Journal(path) as journal:
+        journal.record(("a", 1, "hash a"), _results(1))
+    complete = path.stat().st_size
+    with Journal(path) as journal:
+        journal.record(("b", 1, "hash b"), _results(2))
+    # Crash partway through writing the second record
+    with path.open("r+b") as file:
+        file.truncate(complete + 10)
+
+    with Journal(path) as journal:
+        assert journal.completed == {("a", 1, "hash a"): _results(1)}
+        assert path.stat().st_size == complete
+        journal.record(("c", 1, "hash c"), _results(3))
+    with Journal(path) as journal:
+        assert list(journal.completed) == [("a", 1, "hash a"), ("c", 1, "hash c")]
+
+
+def test_a_resumed_batch_only_marks_unfinished_jobs(tmp_path: Path) -> None:
+    first, second = tmp_path / "team_a_question_0.py", tmp_path / "team_b_question_0.py"
+    first.write_text("def Solution(string):\n    return string[::-1]\n")
+    second.write_text("def Solution(string):\n    raise ValueError\n")
+    jobs = [Job("a", 0, first), Job("b", 0, second)]
+    path = tmp_path / "journal"
+    with Journal(path) as journal:
+        journal.record(jobs[1].key, _results(7))
+
+    with Journal(path) as journal:
+        marked = dict(
+            mark_batch(jobs, marker_options={"min_timing_time": 0.001}, journal=journal)
+        )
+        # The failing solution is not run again, or it would score no points
+        assert marked[jobs[1]] == _results(7)
+        assert marked[jobs[0]].points > 0
+        assert set(journal.completed) == {job.key for job in jobs}
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from examples_local import examples
+from mutation import mutation_test
+from question import Question, TestCase
+
+
+def _question_1(cases: list[tuple[str, bool]]) -> Question:
+    question = Question(1)
+    for password, expected_output in cases:
+        question.add_test_case(
+            TestCase(input_args=(password,), expected_output=expected_output)
+        )
+    return question
+
+
+def test_more_test_cases_kill_more_mutants() -> None:
+    (one_case,) = mutation_test([_question_1([("Password1234", True)])], workers=1)
+    boundaries = _question_1(
+        [
+            ("Password1234", True),
+            ("abcdefg", False),
+            ("abcdefgh", True),
+            ("abcdefff", True),
+            ("abcdeeee", False),
+        ]
+    )
+    (more_cases,) = mutation_test([boundaries], workers=2)
+
+    assert one_case.mutants == more_cases.mutants
+    assert more_cases.killed > one_case.killed
+    assert not more_cases.survivors
+
+
+def test_unpicklable_test_cases_with_workers() -> None:
+    # Question 13's test case passes a lambda, which cannot be sent to a worker
+    (report,) = mutation_test([examples[13]], workers=2)
+    assert report.mutants
+    assert not report.survivors
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from output_capture import RingBuffer
+
+
+def test_a_write_larger_than_the_limit_keeps_only_its_tail() -> None:
+    buffer = RingBuffer(10)
+    buffer.write("x" * 1_000_000 + "0123456789")
+    assert buffer._size == 10
+    assert sum(map(len, buffer._chunks)) == 10
+    assert buffer.getvalue() == "0123456789"
+    assert buffer.tail() == "[... 1000000 characters truncated]\n0123456789"
+
+
+def test_small_writes_are_trimmed_to_the_limit() -> None:
+    buffer = RingBuffer(10)
+    for text in ["abcdef", "ghijkl", "m", "nopqrstuvw", "xyz"]:
+        buffer.write(text)
+        assert buffer._size == sum(map(len, buffer._chunks)) <= 10
+    assert buffer.getvalue() == "qrstuvwxyz"
+    assert buffer.written == 26
+
+
+def test_output_within_the_limit_is_kept_whole() -> None:
+    buffer = RingBuffer(10)
+    buffer.write("abc")
+    buffer.write("def")
+    assert buffer.getvalue() == "abcdef"
+    assert not buffer.truncated
+    assert buffer.tail() == "abcdef"
+
+
+def test_a_limit_of_zero_discards_everything() -> None:
+    buffer = RingBuffer(0)
+    buffer.write("abc")
+    assert buffer.getvalue() == ""
+    assert buffer.written == 3
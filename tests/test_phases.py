@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from examples_local import examples
+from marker import BonusResult, Marker, Results
+from phases import (
+    AUTORANGE,
+    COMPARE,
+    FIRST_CALL,
+    IMPORT,
+    PHASES,
+    RECURSION_LIMIT,
+    TEARDOWN,
+    PhaseTimer,
+    aggregate_phases,
+    format_phase_report,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_marking_records_each_phase(tmp_path: Path) -> None:
+    filepath = tmp_path / "team_a_question_0.py"
+    filepath.write_text("def Solution(string):\n    return string[::-1]\n")
+    results = Marker(min_timing_time=0.001).mark(examples[0], filepath)
+    assert list(results.phases) == [
+        RECURSION_LIMIT,
+        IMPORT,
+        FIRST_CALL,
+        TEARDOWN,
+        COMPARE,
+        AUTORANGE,
+    ]
+    assert set(results.phases) <= set(PHASES)
+    assert all(nanoseconds >= 0 for nanoseconds in results.phases.values())
+    assert results.phases[AUTORANGE] > 0
+
+
+def test_phase_timer_accumulates() -> None:
+    timer = PhaseTimer()
+    timer.add(IMPORT, 5)
+    with timer.phase(COMPARE):
+        pass
+    timer.add(IMPORT, 7)
+    assert list(timer.phases) == [IMPORT, COMPARE]
+    assert timer.phases[IMPORT] == 12
+
+
+def test_report_sorts_phases_by_time_spent() -> None:
+    results = [
+        Results([], BonusResult.NA, 1, 0, phases={IMPORT: 1_000_000, COMPARE: 3_000}),
+        Results([], BonusResult.NA, 1, 0, phases={IMPORT: 3_000_000}),
+    ]
+    assert aggregate_phases(results) == {IMPORT: 4_000_000, COMPARE: 3_000}
+    header, first, second, total = format_phase_report(results).splitlines()
+    assert header.split() == ["Phase", "Total", "(s)", "Mean", "(ms)", "Share"]
+    assert first.split() == [IMPORT, "0.004", "2.000", "99.9%"]
+    assert second.split() == [COMPARE, "0.000", "0.002", "0.1%"]
+    assert total.split() == ["total", "0.004", "2.002", "100.0%"]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pstats
+from typing import TYPE_CHECKING
+
+import pytest
+
+from examples_local import examples
+from func_timeout import FunctionTimedOut
+from marker import Marker, Result
+from profiling import Profiler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Slow enough for the sampling profiler to catch it in `reverse`
+_SOLUTION = """
+def reverse(string):
+    for _ in range(20_000):
+        reversed_string = string[::-1]
+    return reversed_string
+
+
+def Solution(string):
+    return reverse(string)
+"""
+
+
+@pytest.mark.parametrize("profiler", list(Profiler))
+def test_profiles_of_timed_calls_are_saved(tmp_path: Path, profiler: Profiler) -> None:
+    filepath = tmp_path / "team_a_question_0.py"
+    filepath.write_text(_SOLUTION)
+    marker = Marker(
+        profile_dir=tmp_path / "profiles", profiler=profiler, min_timing_time=0.05
+    )
+    (test_case_result,) = marker.mark(examples[0], filepath).test_case_results
+    assert test_case_result.result == Result.PASSED
+
+    path = tmp_path / "profiles" / "team_a_question_0_test_1"
+    assert test_case_result.profile == str(path)
+    stats = pstats.Stats(f"{path}.pstats")
+    assert "reverse" in {name for _, _, name in stats.stats}
+    stacks = path.with_name(f"{path.name}.collapsed").read_text().splitlines()
+    assert any("Solution" in stack and "reverse" in stack for stack in stacks)
+    assert all(int(stack.rpartition(" ")[2]) >= 0 for stack in stacks)
+
+
+def test_a_timed_out_call_reports_where_it_was_spinning(tmp_path: Path) -> None:
+    filepath = tmp_path / "team_a_question_0.py"
+    filepath.write_text(
+        "def spin():\n"
+        "    while True:\n"
+        "        pass\n"
+        "\n"
+        "\n"
+        "def Solution(string):\n"
+        "    spin()\n"
+    )
+    marker = Marker()
+    (test_case_result,) = marker.mark(
+        examples[0], filepath, time_limit=0.3
+    ).test_case_results
+    assert test_case_result.result == Result.FAILED
+    assert isinstance(test_case_result.message, FunctionTimedOut)
+    hottest = test_case_result.hot_frames.splitlines()[0]
+    assert hottest.split()[1].startswith("spin")
+    assert "Solution" in hottest
+
+
+def test_a_passing_call_reports_no_hot_frames(tmp_path: Path) -> None:
+    filepath = tmp_path / "team_a_question_0.py"
+    filepath.write_text(_SOLUTION)
+    (test_case_result,) = Marker().mark(examples[0], filepath).test_case_results
+    assert test_case_result.result == Result.PASSED
+    assert test_case_result.hot_frames == ""
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+import marker
+from marker import BonusResult, Result, Results
+from results_store import ResultsStore, SubmissionRecord
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+def _results(runtime: float, *, speed_factor: float = 1.0) -> Results:
+    if runtime:
+        test_case_results = [marker.TestCaseOutput(Result.PASSED, runtime=runtime)]
+        return Results(
+            test_case_results, BonusResult.NA, 1, runtime, speed_factor=speed_factor
+        )
+    test_case_results = [
+        marker.TestCaseOutput(Result.FAILED, message=ValueError("bad"), exception=True)
+    ]
+    return Results(test_case_results, BonusResult.NA, 0, 0, speed_factor=speed_factor)
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[ResultsStore]:
+    with ResultsStore(tmp_path / "results.sqlite3") as store:
+        first = store.record_batch(
+            [
+                ("a", 1, "a1", _results(0.5)),
+                ("b", 1, "b1", _results(0)),
+                ("a", 2, "a2", _results(0.2, speed_factor=2)),
+            ],
+            label="first",
+        )
+        second = store.record_batch(
+            [("b", 1, "b2", _results(0.4)), ("c", 1, "c1", _results(0))]
+        )
+        assert second > first
+        yield store
+
+
+def test_latest_results_are_the_last_of_each_team(store: ResultsStore) -> None:
+    assert store.latest_results() == [
+        SubmissionRecord("a", 1, "a1", 1, 1, "", 0.5),
+        SubmissionRecord("b", 1, "b2", 2, 1, "", 0.4),
+        SubmissionRecord("c", 1, "c1", 2, 0, "", 0),
+        SubmissionRecord("a", 2, "a2", 1, 1, "", 0.2, 2),
+    ]
+    assert [record.team for record in store.latest_results(1)] == ["a", "b", "c"]
+    (record,) = store.latest_results(2)
+    assert record.normalized_runtime == 0.1
+    assert store.latest_results(3) == []
+
+
+def test_runtime_history_is_oldest_first(store: ResultsStore) -> None:
+    history = store.runtime_history("b", 1)
+    assert [(run, source_hash) for run, _, source_hash, *_ in history] == [
+        (1, "b1"),
+        (2, "b2"),
+    ]
+    assert [entry[3:] for entry in history] == [(0, 0, 0), (1, 0.4, 0.4)]
+    assert store.runtime_history("a", 2)[0][4:] == (0.2, 0.1)
+
+
+def test_pass_rates_use_the_latest_results(store: ResultsStore) -> None:
+    assert store.pass_rates() == {1: pytest.approx(2 / 3), 2: 1}
+
+
+def test_test_case_results_are_stored(store: ResultsStore) -> None:
+    rows = store.connection.execute(
+        "SELECT s.team, t.test_number, t.result, t.runtime, t.message "
+        "FROM test_case_results AS t JOIN submissions AS s ON s.id = t.submission_id "
+        "WHERE s.question = 1 ORDER BY s.id"
+    ).fetchall()
+    assert rows == [
+        ("a", 1, "Pass", 0.5, ""),
+        ("b", 1, "Fail", None, "ValueError: bad"),
+        ("b", 1, "Pass", 0.4, ""),
+        ("c", 1, "Fail", None, "ValueError: bad"),
+    ]
+
+
+def test_a_failed_batch_records_nothing(store: ResultsStore) -> None:
+    broken = _results(0.1)
+    broken.test_case_results = [None]
+    with pytest.raises(AttributeError):
+        store.record_batch([("d", 1, "d1", _results(0.1)), ("e", 1, "e1", broken)])
+    assert {record.team for record in store.latest_results()} == {"a", "b", "c"}
+    (runs,) = store.connection.execute("SELECT COUNT(*) FROM runs").fetchone()
+    assert runs == 2
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch import Job, mark_batch
+from marker import Marker, Result
+from question import Question, TestCase
+from shared_inputs import SharedArray, SharedFrame, SharedInputs, attach
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _celsius_question() -> Question:
+    question = Question(3)
+    question.add_test_case(
+        TestCase(
+            input_args=(np.array([0, -40, 100.0]),),
+            expected_output=np.array([32, -40, 212.0]),
+        )
+    )
+    return question
+
+
+def test_shared_values_round_trip() -> None:
+    frame = pd.DataFrame(
+        {
+            "id": np.arange(200),
+            "name": [f"name {i}" for i in range(200)],
+            "score": np.linspace(0, 1, 200),
+        },
+        index=np.arange(200) * 2,
+    )
+    array = np.arange(600, dtype=np.int16).reshape(20, 30)
+    question = Question(3)
+    question.add_test_case(
+        TestCase(
+            input_args=(array, "small", np.arange(3)),
+            input_kwargs={"frame": frame},
+            expected_output=array.T.copy(),
+        )
+    )
+
+    with SharedInputs(min_bytes=1_000) as shared_inputs:
+        (shared,) = shared_inputs.share([question])
+        test_case = shared.test_cases[0]
+        big, small, tiny = test_case.input_args
+        assert isinstance(big, SharedArray)
+        assert small == "small"
+        assert isinstance(tiny, np.ndarray)
+        assert isinstance(test_case.input_kwargs["frame"], SharedFrame)
+
+        (attached,) = attach([shared])
+        test_case = attached.test_cases[0]
+        assert Marker._values_match(
+            test_case.input_args, question.test_cases[0].input_args
+        )
+        assert test_case.input_args[0].dtype == np.int16
+        pd.testing.assert_frame_equal(test_case.input_kwargs["frame"], frame)
+        assert Marker._values_match(test_case.expected_output, array.T)
+        segments = [segment.name for segment in shared_inputs._segments]
+        assert len(segments) == 4
+
+    for name in segments:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
+
+
+def test_attached_arrays_are_writable_and_private() -> None:
+    with SharedInputs(min_bytes=0) as shared_inputs:
+        (question,) = shared_inputs.share([_celsius_question()])
+        (handle,) = question.test_cases[0].input_args
+        assert isinstance(handle, SharedArray)
+
+        array = handle.attach()
+        array *= 2
+        assert array.tolist() == [0, -80, 200]
+        segment = shared_memory.SharedMemory(handle.segment)
+        try:
+            shared = np.ndarray(handle.shape, handle.dtype, buffer=segment.buf)
+            assert shared.tolist() == [0, -40, 100]
+            del shared
+        finally:
+            segment.close()
+
+
+@pytest.mark.parametrize(("workers", "share_min_bytes"), [(1, 0), (2, 0), (2, 1 << 20)])
+def test_solutions_modifying_their_input_pass_on_every_path(
+    tmp_path: Path, workers: int, share_min_bytes: int
+) -> None:
+    filepath = tmp_path / "team_a_question_3.py"
+    filepath.write_text(
+        "def Solution(celsius_temps):\n"
+        "    celsius_temps *= 9 / 5\n"
+        "    celsius_temps += 32\n"
+        "    return celsius_temps\n"
+    )
+
+    ((_, results),) = mark_batch(
+        [Job("a", 3, filepath)],
+        workers=workers,
+        marker_options={"min_timing_time": 0.001},
+        questions=[_celsius_question()],
+        share_min_bytes=share_min_bytes,
+    )
+    assert [result.result for result in results.test_case_results] == [Result.PASSED]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from batch import Job
+from similarity import FingerprintCache, find_clusters
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_ORIGINAL = '''
+import numpy as np
+
+
+def Solution(transactions):
+    """Count the pairs of items bought together."""
+    counts = {}
+    for transaction in transactions:
+        items = sorted(set(transaction))
+        for i in range(len(items)):
+            for j in range(i + 1, len(items)):
+                pair = (items[i], items[j])
+                counts[pair] = counts.get(pair, 0) + 1
+    # Most common first
+    ranked = sorted(counts.items(), key=lambda item: -item[1])
+    return [pair for pair, count in ranked[:10] if count > np.int64(1)]
+'''
+
+# The same code with every variable renamed, other constants, and other comments
+_RENAMED = """
+import numpy as np
+
+
+def Solution(baskets):
+    # Pairs bought together
+    tally = {}
+    for basket in baskets:
+        products = sorted(set(basket))
+        for a in range(len(products)):
+            for b in range(a + 1, len(products)):
+                key = (products[a], products[b])
+                tally[key] = tally.get(key, 0) + 1
+    ordered = sorted(tally.items(), key=lambda entry: -entry[1])
+    return [key for key, total in ordered[:25] if total > np.int64(1)]
+"""
+
+_DIFFERENT = """
+from collections import Counter
+from itertools import combinations
+
+
+def Solution(transactions):
+    counter = Counter()
+    for transaction in transactions:
+        counter.update(combinations(sorted(set(transaction)), 2))
+    return [pair for pair, count in counter.most_common(10) if count > 1]
+"""
+
+
+def _jobs(folder: Path, submissions: dict[tuple[str, int], str]) -> list[Job]:
+    jobs = []
+    for (team, question_number), source in submissions.items():
+        filepath = folder / f"team_{team}_question_{question_number}.py"
+        filepath.write_text(source, encoding="utf-8")
+        jobs.append(Job(team, question_number, filepath))
+    return jobs
+
+
+def test_renamed_copies_are_clustered(tmp_path: Path) -> None:
+    original, renamed, different, other_question, short, broken = _jobs(
+        tmp_path,
+        {
+            ("a", 10): _ORIGINAL,
+            ("b", 10): _RENAMED,
+            ("c", 10): _DIFFERENT,
+            ("d", 11): _RENAMED,
+            ("e", 10): "def Solution(x):\n    return x\n",
+            ("f", 10): _ORIGINAL.replace("):", ")", 1),
+        },
+    )
+    jobs = [original, renamed, different, other_question, short, broken]
+
+    for cache in None, FingerprintCache(tmp_path / "cache"):
+        (cluster,) = find_clusters(jobs, cache=cache)
+        assert cluster.question_number == 10
+        assert set(cluster.jobs) == {original, renamed}
+        assert cluster.similarity >= 0.8
+
+
+def test_every_copy_joins_one_cluster(tmp_path: Path) -> None:
+    sources = {
+        ("a", 10): _ORIGINAL,
+        ("b", 10): _RENAMED,
+        ("c", 10): _ORIGINAL.replace("counts", "frequencies"),
+        ("d", 10): _DIFFERENT,
+        ("e", 10): _DIFFERENT.replace("counter", "c"),
+    }
+    clusters = find_clusters(_jobs(tmp_path, sources))
+    assert sorted(sorted(job.team for job in cluster.jobs) for cluster in clusters) == [
+        ["a", "b", "c"],
+        ["d", "e"],
+    ]
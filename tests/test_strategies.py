@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import pytest
+
+from strategies import STRATEGIES
+
+
+@pytest.mark.parametrize("size", [1, 10, 1_000])
+def test_celsius_arrays_have_at_most_size_elements(size: int) -> None:
+    for index in range(200):
+        (celsius_temps,) = STRATEGIES[3].example(0, index, size)
+        assert 1 <= celsius_temps.size <= size
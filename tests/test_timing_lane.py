@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import threading
+
+import pytest
+
+from timing_lane import CAN_PIN, TimingLane, parse_cpus
+
+
+@pytest.mark.parametrize(
+    ("cpus", "expected"),
+    [("3", {3}), ("2,3", {2, 3}), ("4-7", {4, 5, 6, 7}), ("0,2-3,2", {0, 2, 3})],
+)
+def test_parse_cpus(cpus: str, expected: set[int]) -> None:
+    assert parse_cpus(cpus) == expected
+
+
+@pytest.mark.parametrize("cpus", ["", "a", "1-", "1,,2"])
+def test_malformed_cpus_are_rejected(cpus: str) -> None:
+    with pytest.raises(ValueError):
+        parse_cpus(cpus)
+
+
+@pytest.mark.skipif(not CAN_PIN, reason="CPU affinity is not supported")
+def test_timed_calls_are_pinned_to_the_lane() -> None:
+    previous = os.sched_getaffinity(0)
+    lane = TimingLane.last_cpu()
+    assert lane.cpus == {max(previous)}
+
+    inherited = []
+    with lane.timing():
+        assert os.sched_getaffinity(0) == lane.cpus
+        # Like the thread `func_timeout` runs each timed call on
+        thread = threading.Thread(
+            target=lambda: inherited.append(os.sched_getaffinity(0))
+        )
+        thread.start()
+        thread.join()
+    assert inherited == [lane.cpus]
+    assert os.sched_getaffinity(0) == previous
+
+
+@pytest.mark.skipif(not CAN_PIN, reason="CPU affinity is not supported")
+def test_affinity_is_restored_when_a_timed_call_raises() -> None:
+    previous = os.sched_getaffinity(0)
+    with pytest.raises(RuntimeError), TimingLane.last_cpu().timing():
+        raise RuntimeError
+    assert os.sched_getaffinity(0) == previous
+
+
+def test_timed_runs_hold_the_lanes_lock() -> None:
+    lock = threading.Lock()
+    lane = TimingLane(os.sched_getaffinity(0) if CAN_PIN else set(), lock)
+    with lane.timing():
+        assert lock.locked()
+    assert not lock.locked()
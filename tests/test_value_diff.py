@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from marker import Marker
+from value_diff import Mismatch, find_mismatch
+
+_FRAME = pd.DataFrame({"id": [1, 2, 3], "name": ["a", None, "c"], "x": [0.5, None, 2]})
+
+_PAIRS = [
+    (1.0, 1.0 + 1e-9),
+    (1.0, 1.1),
+    (1, 1.0),
+    (True, 1),
+    ("abc", "abc"),
+    ("abc", "abd"),
+    (None, None),
+    ([1, [2, 3]], [1, [2, 3]]),
+    ([1, [2, 3]], [1, [2, 4]]),
+    ([1, 2], (1, 2)),
+    ([1, 2], [1, 2, 3]),
+    ([1, 2, 3], [1, 2]),
+    ([1, 2], [1, "2"]),
+    ([], []),
+    (np.arange(5), np.arange(5)),
+    (np.arange(5), np.arange(1, 6)),
+    (np.arange(5), np.arange(5.0)),
+    (np.arange(6).reshape(2, 3), np.arange(6).reshape(3, 2)),
+    (np.linspace(0, 1, 7), np.linspace(0, 1, 7) + 1e-12),
+    (np.linspace(0, 1, 7), np.linspace(0, 1, 7) + 1e-3),
+    (np.array([1.0, np.nan]), np.array([1.0, np.nan])),
+    (np.array(2.0), np.array(3.0)),
+    (np.array([], dtype=int), np.array([], dtype=int)),
+    (np.arange(3), [0, 1, 2]),
+    (_FRAME, _FRAME.copy()),
+    (_FRAME, _FRAME.set_axis([5, 6, 7])),
+    (_FRAME, _FRAME.assign(x=[0.5, None, 3])),
+    (_FRAME, _FRAME.assign(name=["a", "b", "c"])),
+    (_FRAME, _FRAME.assign(id=[1.0, 2.0, 3.0])),
+    (_FRAME, _FRAME[["name", "id", "x"]]),
+    (_FRAME, _FRAME.iloc[:2]),
+    (_FRAME, _FRAME.to_dict()),
+]
+
+
+@pytest.mark.parametrize(("expected", "actual"), _PAIRS)
+def test_agrees_with_values_match(expected: Any, actual: Any) -> None:
+    mismatch = find_mismatch(expected, actual)
+    assert (mismatch is None) == Marker._values_match(expected, actual)
+
+
+def test_reports_the_first_differing_element() -> None:
+    expected = list(range(100))
+    actual = [*range(40), -1, *range(41, 100)]
+    mismatch = find_mismatch([expected], [actual])
+    assert mismatch == Mismatch((0, 40), "values differ", "40", "-1")
+
+    array = np.arange(1_000_000).reshape(1000, 1000)
+    changed = array.copy()
+    changed[500, 2] = -1
+    changed[700, 0] = -1
+    mismatch = find_mismatch(array, changed)
+    assert mismatch.path == (500, 2)
+    assert mismatch.reason == "2 of 1000000 elements differ"
+    # Only the neighbours along the row are shown
+    assert mismatch.actual.startswith("[500000, 500001,     -1, 500003, 500004")
+    assert mismatch.actual.endswith("... (from index 0)")
+
+
+def test_reports_where_lengths_start_to_differ() -> None:
+    mismatch = find_mismatch([1, 2, 3, 4], [1, 2, 9])
+    assert mismatch.path == ()
+    assert mismatch.reason == "length 3, expected 4"
+    assert "(from index 0)" in mismatch.expected
+
+
+def test_reports_the_first_differing_row_of_a_frame() -> None:
+    mismatch = find_mismatch(_FRAME, _FRAME.assign(x=[0.5, None, 3]))
+    assert mismatch.path == (2, "x")
+    assert "3.0" in mismatch.actual
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import contextlib
+import gc
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+    from multiprocessing.synchronize import Lock
+
+# A measurement is noisy if the process was on a CPU for less than this fraction of
+# the wall-clock time it took, e.g. because it was descheduled
+MIN_CPU_SHARE = 0.8
+
+# CPU affinity is only available on some platforms (e.g. Linux)
+CAN_PIN = hasattr(os, "sched_setaffinity")
+
+
+def parse_cpus(cpus: str) -> set[int]:
+    """
+    Parse a list of CPUs like `2,3` or `4-7`.
+
+    :param cpus: Comma separated CPU numbers and inclusive ranges.
+    :return: The CPU numbers.
+    :raises ValueError: If the list is malformed.
+    """
+    parsed = set()
+    for part in cpus.split(","):
+        first, dash, last = part.partition("-")
+        parsed.update(range(int(first), int(last if dash else first) + 1))
+    return parsed
+
+
+class TimingLane:
+    """
+    CPUs reserved for timed calls, shared by the marking processes of a batch.
+
+    Each pool worker calls `reserve` to keep the rest of its marking off the lane's
+    CPUs, and times calls inside `timing`, which holds the lane's lock and pins the
+    calling thread to the lane, so timed runs are serialised onto quiet CPUs
+    instead of competing with each other. Threads started inside `timing`, like
+    the one `func_timeout` runs each call on, inherit the pinning.
+
+    Where CPU affinity is not supported the lane still serialises timed runs.
+    """
+
+    def __init__(self, cpus: Iterable[int], lock: Lock | None = None) -> None:
+        """
+        Create a timing lane.
+
+        :param cpus: The CPUs to time calls on.
+        :param lock: A lock shared by every process using the lane, e.g. a
+            `multiprocessing.Lock` passed to pool workers (default: None)
+        """
+        self.cpus = set(cpus)
+        self.lock = lock
+
+    def reserve(self) -> None:
+        """
+        Move this process off the lane's CPUs, if any others are available.
+
+        This narrows the CPUs of the whole process for good, so only call it from
+        the initializer of a pool worker, never from the process running a batch.
+        """
+        if not CAN_PIN:
+            return
+        others = os.sched_getaffinity(0) - self.cpus
+        if others:
+            os.sched_setaffinity(0, others)
+
+    @classmethod
+    def last_cpu(cls) -> TimingLane | None:
+        """
+        Get a lane on the last CPU this process may run on.
+
+        It has no lock, so it is only for timing calls in this process alone.
+
+        :return: The lane, or None if CPU affinity is not supported.
+        """
+        if not CAN_PIN:
+            return None
+        return cls({max(os.sched_getaffinity(0))})
+
+    @contextlib.contextmanager
+    def timing(self) -> Generator[None, None, None]:
+        """
+        Run timed calls on the lane.
+
+        Garbage is collected on entry, so every measurement starts from the same
+        heap state; `timeit` then keeps the collector off while calls are timed.
+        """
+        with self.lock or contextlib.nullcontext():
+            previous = os.sched_getaffinity(0) if CAN_PIN else None
+            if previous is not None:
+                os.sched_setaffinity(0, self.cpus)
+            gc.collect()
+            try:
+                yield
+            finally:
+                if previous is not None:
+                    os.sched_setaffinity(0, previous)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import reprlib
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from marker import FLOAT_DIFF_TOLERANCE
+
+# The number of elements or rows shown either side of a mismatch
+WINDOW = 3
+
+_repr = reprlib.Repr()
+_repr.maxlist = _repr.maxtuple = 2 * WINDOW + 1
+_repr.maxstring = _repr.maxother = 80
+
+
+def short_repr(value: Any) -> str:
+    """
+    Get a repr of a value that is bounded in length however large the value is.
+
+    :param value: The value.
+    :return: The shortened repr.
+    """
+    if isinstance(value, np.ndarray):
+        with np.printoptions(threshold=2 * WINDOW + 1, edgeitems=WINDOW):
+            return repr(value)
+    if isinstance(value, pd.DataFrame):
+        return value.to_string(max_rows=2 * WINDOW + 1, max_cols=8)
+    return _repr.repr(value)
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    """
+    Dataclass representing where and how a received value differs from the expected.
+
+    Attributes:
+        path: The indexes (or column names) leading from the top-level value to
+            the mismatch.
+        reason: Why the values differ.
+        expected: The expected values around the mismatch.
+        actual: The received values around the mismatch.
+    """
+
+    path: tuple = ()
+    reason: str = ""
+    expected: str = ""
+    actual: str = ""
+
+    def __str__(self) -> str:
+        location = "".join(f"[{index!r}]" for index in self.path) or "top level"
+        return (
+            f"Mismatch at {location}: {self.reason}\n"
+            f"Expected: {self.expected}\n"
+            f"Received: {self.actual}"
+        )
+
+
+def _window(values: Any, index: int) -> str:
+    start = max(index - WINDOW, 0)
+    stop = index + WINDOW + 1
+    prefix = "... " if start else ""
+    suffix = " ..." if stop < len(values) else ""
+    if isinstance(values, np.ndarray):
+        items = np.array2string(values[start:stop], separator=", ")[1:-1]
+    else:
+        items = ", ".join(short_repr(value) for value in values[start:stop])
+    return f"{prefix}[{items}]{suffix} (from index {start})"
+
+
+def _first_true(mask: np.ndarray) -> int | None:
+    flat = mask.ravel()
+    index = int(flat.argmax()) if flat.size else 0
+    return index if flat.size and flat[index] else None
+
+
+def _sequence_mismatch(
+    expected: list | tuple, actual: list | tuple, path: tuple
+) -> Mismatch | None:
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        mismatch = find_mismatch(e, a, path=(*path, i))
+        if mismatch is not None:
+            if len(expected) == len(actual):
+                return mismatch
+            break
+    else:
+        if len(expected) == len(actual):
+            return None
+        i = min(len(expected), len(actual))
+    # Report a length difference where the sequences start to differ
+    reason = f"length {len(actual)}, expected {len(expected)}"
+    return Mismatch(path, reason, _window(expected, i), _window(actual, i))
+
+
+def _array_mismatch(
+    expected: np.ndarray, actual: np.ndarray, path: tuple
+) -> Mismatch | None:
+    if expected.shape != actual.shape:
+        reason = f"shape {actual.shape}, expected {expected.shape}"
+        return Mismatch(path, reason, short_repr(expected), short_repr(actual))
+    if expected.dtype != actual.dtype:
+        reason = f"dtype {actual.dtype}, expected {expected.dtype}"
+        return Mismatch(path, reason, short_repr(expected), short_repr(actual))
+
+    # Find every differing element at once, as `_values_match` compares them
+    if expected.dtype == float:
+        different = ~np.isclose(expected, actual)
+    else:
+        different = expected != actual
+    flat_index = _first_true(np.asarray(different))
+    if flat_index is None:
+        return None
+    if expected.ndim == 0:
+        return Mismatch(path, "values differ", repr(expected), repr(actual))
+    index = np.unravel_index(flat_index, expected.shape)
+    # Show the neighbours along the last axis
+    row = (*index[:-1],) if expected.ndim > 1 else ()
+    reason = f"{int(np.count_nonzero(different))} of {expected.size} elements differ"
+    return Mismatch(
+        (*path, *(int(i) for i in index)),
+        reason,
+        _window(expected[row], int(index[-1])),
+        _window(actual[row], int(index[-1])),
+    )
+
+
+def _frame_mismatch(
+    expected: pd.DataFrame, actual: pd.DataFrame, path: tuple
+) -> Mismatch | None:
+    expected = expected.reset_index(drop=True)
+    actual = actual.reset_index(drop=True)
+    if expected.shape != actual.shape:
+        reason = f"shape {actual.shape}, expected {expected.shape}"
+        return Mismatch(path, reason, short_repr(expected), short_repr(actual))
+    if not expected.columns.equals(actual.columns):
+        reason = "columns differ"
+        return Mismatch(
+            path,
+            reason,
+            short_repr(list(expected.columns)),
+            short_repr(list(actual.columns)),
+        )
+    dtypes_differ = expected.dtypes != actual.dtypes
+    if dtypes_differ.any():
+        column = dtypes_differ.idxmax()
+        reason = f"dtype {actual[column].dtype}, expected {expected[column].dtype}"
+        return Mismatch(
+            (*path, column),
+            reason,
+            short_repr(expected[column]),
+            short_repr(actual[column]),
+        )
+
+    # Find the first differing row of each column, treating NaNs as equal like
+    # `DataFrame.equals` does
+    first_row = None
+    for column in expected.columns:
+        e = expected[column].to_numpy()
+        a = actual[column].to_numpy()
+        different = ~((e == a) | (pd.isna(e) & pd.isna(a)))
+        row = _first_true(np.asarray(different, dtype=bool))
+        if row is not None and (first_row is None or row < first_row[0]):
+            first_row = (row, column)
+    if first_row is None:
+        return None
+    row, column = first_row
+    rows = slice(max(row - WINDOW, 0), row + WINDOW + 1)
+    return Mismatch(
+        (*path, row, column),
+        "values differ",
+        "\n" + expected.iloc[rows].to_string(),
+        "\n" + actual.iloc[rows].to_string(),
+    )
+
+
+def find_mismatch(expected: Any, actual: Any, *, path: tuple = ()) -> Mismatch | None:
+    """
+    Find the first place a received value differs from the expected value.
+
+    Values are compared by the same rules as `Marker._values_match`, but arrays and
+    DataFrames are searched with vectorized comparisons and only a small window
+    around the mismatch is kept, so the cost of reporting does not grow with the
+    size of the output.
+
+    :param expected: The expected value.
+    :param actual: The actual value obtained.
+    :param path: The path to these values from the top-level value (default: ())
+    :return: The first mismatch, or None if the values match.
+    """
+    if isinstance(expected, float) and isinstance(actual, float):
+        if abs(expected - actual) < FLOAT_DIFF_TOLERANCE:
+            return None
+        return Mismatch(path, "values differ", repr(expected), repr(actual))
+
+    if isinstance(expected, list | tuple) and isinstance(actual, list | tuple):
+        return _sequence_mismatch(expected, actual, path)
+
+    if isinstance(expected, np.ndarray) and isinstance(actual, np.ndarray):
+        return _array_mismatch(expected, actual, path)
+
+    if isinstance(expected, pd.DataFrame) and isinstance(actual, pd.DataFrame):
+        return _frame_mismatch(expected, actual, path)
+
+    if (
+        isinstance(expected, float | int)
+        and isinstance(actual, float | int)
+        or type(expected) is type(actual)
+    ):
+        if expected == actual:
+            return None
+        return Mismatch(path, "values differ", short_repr(expected), short_repr(actual))
+
+    reason = f"type {type(actual).__name__}, expected {type(expected).__name__}"
+    return Mismatch(path, reason, short_repr(expected), short_repr(actual))